@@ -1,3 +1,6 @@
 from django.contrib import admin
+from .models import CGPATotals, SemesterRecord
 
 # Register your models here.
+admin.site.register(SemesterRecord)
+admin.site.register(CGPATotals)
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CgcalculatorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'CgCalculator'
+
+    def ready(self):
+        import CgCalculator.signals  # noqa: F401
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CGPATotals',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='cgpa_totals', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('weighted_sum', models.FloatField(default=0)),
+                ('total_credits', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SemesterRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('semester', models.PositiveSmallIntegerField()),
+                ('sgpa', models.FloatField()),
+                ('credits', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='semester_records', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['semester'],
+                'constraints': [models.UniqueConstraint(fields=('user', 'semester'), name='unique_semester_per_user')],
+            },
+        ),
+    ]
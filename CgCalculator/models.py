@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.db import models
+
+
+class SemesterRecord(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='semester_records')
+    semester = models.PositiveSmallIntegerField()
+    sgpa = models.FloatField()
+    credits = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['semester']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'semester'], name='unique_semester_per_user'),
+        ]
+
+    def __str__(self):
+        return f"Semester {self.semester}: {self.sgpa} ({self.credits} credits)"
+
+
+class CGPATotals(models.Model):
+    """Running totals of a user's semester records.
+
+    Kept up to date by the signals in ``signals.py`` on every insert, update
+    and delete, so the current CGPA is one row read instead of a pass over
+    every semester.
+    """
+
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='cgpa_totals')
+    weighted_sum = models.FloatField(default=0)
+    total_credits = models.PositiveIntegerField(default=0)
+
+    @property
+    def cgpa(self):
+        if not self.total_credits:
+            return None
+        return round(self.weighted_sum / self.total_credits, 2)
+
+    def __str__(self):
+        return f"CGPA {self.cgpa} over {self.total_credits} credits"
@@ -0,0 +1,59 @@
+"""Memoised solver for required-SGPA what-if scenarios.
+
+Students try many combinations of target CGPA and remaining credit loads
+against the same completed semesters. Completed history is keyed as a
+tuple of ``(sgpa, credits)`` pairs and its totals are computed once per
+history. Solved scenarios are cached as well, so repeated what-ifs cost
+nothing.
+"""
+
+from functools import lru_cache
+
+
+def history_key(semesters):
+    return tuple((semester['sgpa'], semester['credits']) for semester in semesters)
+
+
+@lru_cache(maxsize=4096)
+def completed_totals(history):
+    """Return ``(sum of sgpa * credits, total credits)`` for ``history``."""
+    weighted_sum, credits = 0.0, 0
+    for sgpa, semester_credits in history:
+        weighted_sum += sgpa * semester_credits
+        credits += semester_credits
+    return weighted_sum, credits
+
+
+@lru_cache(maxsize=16384)
+def required_sgpa(history, target_cgpa, future_credits, total_program_credits=None):
+    """SGPA needed over ``future_credits`` to finish at ``target_cgpa``.
+
+    ``total_program_credits`` defaults to the completed credits plus
+    ``future_credits``. The result is not rounded.
+    """
+    weighted_sum, completed_credits = completed_totals(history)
+    if total_program_credits is None:
+        total_program_credits = completed_credits + future_credits
+    return (target_cgpa * total_program_credits - weighted_sum) / future_credits
+
+
+def plan_scenarios(history, target_cgpas, credit_plans):
+    """Solve every ``target_cgpa`` x ``credit_plan`` combination.
+
+    A credit plan lists the credits of each remaining semester; the answer
+    is the SGPA to keep in each of them. A target the completed semesters
+    already secure needs an SGPA of 0 and is flagged ``already_secured``.
+    """
+    scenarios = []
+    for credit_plan in credit_plans:
+        future_credits = sum(credit_plan)
+        for target_cgpa in target_cgpas:
+            sgpa = required_sgpa(history, target_cgpa, future_credits)
+            scenarios.append({
+                'target_cgpa': target_cgpa,
+                'credit_plan': credit_plan,
+                'required_sgpa': round(max(sgpa, 0), 2),
+                'achievable': sgpa <= 10,
+                'already_secured': sgpa <= 0,
+            })
+    return scenarios
@@ -1,4 +1,11 @@
+from django.conf import settings
 from rest_framework import serializers
+from .models import SemesterRecord
+
+# Shared with the fast-path validator in validators.py
+SGPA_RANGE_MESSAGE = "SGPA must be between 0 and 10."
+CREDITS_POSITIVE_MESSAGE = "Credits must be a positive integer."
+LOW_SGPA_HIGH_CREDITS_MESSAGE = "Low SGPA with high credits seems invalid."
 
 class SGPAInputSerializer(serializers.Serializer):
     sgpa = serializers.FloatField(error_messages={
@@ -12,17 +19,17 @@ class SGPAInputSerializer(serializers.Serializer):
 
     def validate_sgpa(self,value):
         if value < 0 or value > 10:
-           raise serializers.ValidationError("SGPA must be between 0 and 10.")
+           raise serializers.ValidationError(SGPA_RANGE_MESSAGE)
         return  value
     
     def validate_credits(self,value):
         if value <= 0:
-            raise serializers.ValidationError("Credits must be a positive integer.")
+            raise serializers.ValidationError(CREDITS_POSITIVE_MESSAGE)
         return value
     
     def validate(self, data):
         if data['sgpa'] < 4 and data['credits'] > 30:
-            raise serializers.ValidationError("Low SGPA with high credits seems invalid.")
+            raise serializers.ValidationError(LOW_SGPA_HIGH_CREDITS_MESSAGE)
         return data
 
 
@@ -34,6 +41,50 @@ class CGPACalculatorSerializer(serializers.Serializer):
     )
 
 
+class SemesterRecordSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SemesterRecord
+        fields = ['id', 'semester', 'sgpa', 'credits', 'created_at', 'updated_at']
+        read_only_fields = ['created_at', 'updated_at']
+
+    def validate_semester(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("Semester must be a positive integer.")
+        return value
+
+    def validate_sgpa(self, value):
+        if value < 0 or value > 10:
+            raise serializers.ValidationError(SGPA_RANGE_MESSAGE)
+        return value
+
+    def validate_credits(self, value):
+        if value <= 0:
+            raise serializers.ValidationError(CREDITS_POSITIVE_MESSAGE)
+        return value
+
+    def validate(self, data):
+        sgpa = data.get('sgpa', getattr(self.instance, 'sgpa', None))
+        credits = data.get('credits', getattr(self.instance, 'credits', None))
+        if sgpa is not None and credits is not None and sgpa < 4 and credits > 30:
+            raise serializers.ValidationError(LOW_SGPA_HIGH_CREDITS_MESSAGE)
+        return data
+
+
+class CGPABatchSerializer(serializers.Serializer):
+    # Each student is validated separately so one bad entry doesn't fail the batch
+    students = serializers.ListField(child=serializers.DictField(), allow_empty=False, error_messages={
+        'required': "The 'students' field is required.",
+    },
+    )
+
+    def validate_students(self, value):
+        if len(value) > settings.CGPA_BATCH_MAX_STUDENTS:
+            raise serializers.ValidationError(
+                f"A batch cannot contain more than {settings.CGPA_BATCH_MAX_STUDENTS} students."
+            )
+        return value
+
+
 from rest_framework import serializers
 
 class CompletedSemesterSerializer(serializers.Serializer):
@@ -41,7 +92,42 @@ class CompletedSemesterSerializer(serializers.Serializer):
     credits = serializers.IntegerField()
 
 class RequiredSGPASerializer(serializers.Serializer):
-    completed_semesters = serializers.ListField(child=CompletedSemesterSerializer())
-    total_program_credits = serializers.IntegerField()
-    future_semester_credits = serializers.IntegerField()
-    expected_cgpa = serializers.FloatField()
+    """Either a single scenario (``expected_cgpa`` over
+    ``future_semester_credits``) or a grid of ``target_cgpas`` x
+    ``credit_plans``, where each plan lists the credits of every remaining
+    semester."""
+
+    SINGLE_FIELDS = ('total_program_credits', 'future_semester_credits', 'expected_cgpa')
+
+    completed_semesters = serializers.ListField(
+        child=CompletedSemesterSerializer(), max_length=settings.REQUIRED_SGPA_MAX_SEMESTERS
+    )
+    total_program_credits = serializers.IntegerField(required=False)
+    future_semester_credits = serializers.IntegerField(required=False)
+    expected_cgpa = serializers.FloatField(required=False)
+    target_cgpas = serializers.ListField(child=serializers.FloatField(), required=False, allow_empty=False)
+    credit_plans = serializers.ListField(
+        child=serializers.ListField(
+            child=serializers.IntegerField(min_value=1),
+            allow_empty=False,
+            max_length=settings.REQUIRED_SGPA_MAX_SEMESTERS,
+        ),
+        required=False,
+        allow_empty=False,
+    )
+
+    def validate(self, data):
+        if 'target_cgpas' in data or 'credit_plans' in data:
+            missing = [name for name in ('target_cgpas', 'credit_plans') if name not in data]
+            if missing:
+                raise serializers.ValidationError({name: ['This field is required.'] for name in missing})
+            scenarios = len(data['target_cgpas']) * len(data['credit_plans'])
+            if scenarios > settings.REQUIRED_SGPA_MAX_SCENARIOS:
+                raise serializers.ValidationError(
+                    f"At most {settings.REQUIRED_SGPA_MAX_SCENARIOS} scenarios can be planned at once."
+                )
+            return data
+        missing = [name for name in self.SINGLE_FIELDS if name not in data]
+        if missing:
+            raise serializers.ValidationError({name: ['This field is required.'] for name in missing})
+        return data
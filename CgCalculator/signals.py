@@ -0,0 +1,63 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from studybudy.counters import apply_counter_delta, remember_loaded_values
+
+from .models import CGPATotals, SemesterRecord
+
+
+def _contribution(sgpa, credits):
+    return sgpa * credits, credits
+
+
+def _apply_delta(user_id, weighted_sum, credits, create=True):
+    apply_counter_delta(
+        CGPATotals, {'user_id': user_id}, create=create, weighted_sum=weighted_sum, total_credits=credits
+    )
+
+
+def _stored_contribution(record):
+    return (record.user_id,) + _contribution(record.sgpa, record.credits)
+
+
+# What each row currently contributes to the stored totals
+remember_loaded_values(SemesterRecord, '_stored_contribution', ('sgpa', 'credits'), _stored_contribution)
+
+
+@receiver(post_save, sender=SemesterRecord)
+def add_semester_to_totals(sender, instance, created, **kwargs):
+    stored = None if created else getattr(instance, '_stored_contribution', None)
+    if not created and stored is None:
+        # Loaded with deferred fields; the old values are no longer known
+        recompute_totals(instance.user_id)
+    else:
+        weighted_sum, credits = _contribution(instance.sgpa, instance.credits)
+        if stored is not None and stored[0] != instance.user_id:
+            _apply_delta(stored[0], -stored[1], -stored[2], create=False)
+        elif stored is not None:
+            weighted_sum -= stored[1]
+            credits -= stored[2]
+        _apply_delta(instance.user_id, weighted_sum, credits)
+    instance._stored_contribution = _stored_contribution(instance)
+
+
+@receiver(post_delete, sender=SemesterRecord)
+def remove_semester_from_totals(sender, instance, **kwargs):
+    # Subtract what the stored row contributed, not unsaved in-memory edits
+    stored = getattr(instance, '_stored_contribution', None)
+    if stored is None:
+        stored = _stored_contribution(instance)
+    user_id, weighted_sum, credits = stored
+    # Never create totals here: the user may be being deleted along with it
+    _apply_delta(user_id, -weighted_sum, -credits, create=False)
+
+
+def recompute_totals(user_id):
+    """Rebuild a user's totals from their semester records."""
+    weighted_sum, credits = 0.0, 0
+    for sgpa, semester_credits in SemesterRecord.objects.filter(user_id=user_id).values_list('sgpa', 'credits'):
+        weighted_sum += sgpa * semester_credits
+        credits += semester_credits
+    CGPATotals.objects.update_or_create(
+        user_id=user_id,
+        defaults={'weighted_sum': weighted_sum, 'total_credits': credits},
+    )
@@ -1,3 +1,226 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from studybudy.models import CustomUser
+from .calculations import weighted_averages
+from .models import CGPATotals, SemesterRecord
+from .planning import completed_totals, required_sgpa
+from .serializers import CGPACalculatorSerializer
+from .signals import recompute_totals
+from .validators import validate_semesters
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class CgCalculatorTestCase(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(email='a@example.com', password='pw12345!', username='alice')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+
+class BatchCGPATests(CgCalculatorTestCase):
+    def test_weighted_averages(self):
+        students = [
+            [{'sgpa': 8.0, 'credits': 20}, {'sgpa': 9.0, 'credits': 20}],
+            [{'sgpa': 7.5, 'credits': 18}],
+            [{'sgpa': 6.0, 'credits': 0}],
+        ]
+        self.assertEqual(weighted_averages(students), [8.5, 7.5, None])
+
+    def test_batch_matches_single_requests(self):
+        students = [
+            {'id': f's{i}', 'semesters': [{'sgpa': 5 + (i * j) % 50 / 10, 'credits': 15 + j} for j in range(8)]}
+            for i in range(20)
+        ]
+        response = self.client.post('/api/calculate-cgpa/batch/', {'students': students}, format='json')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        for student, result in zip(students, results):
+            single = self.client.post('/api/calculate-cgpa/', {'semesters': student['semesters']}, format='json')
+            self.assertEqual(result, {'index': students.index(student), 'id': student['id'], 'cgpa': single.json()['cgpa']})
+
+    def test_invalid_students_fail_alone(self):
+        students = [
+            {'id': 'ok', 'semesters': [{'sgpa': 8, 'credits': 20}]},
+            {'id': 'range', 'semesters': [{'sgpa': 11, 'credits': 20}]},
+            {'id': 'missing'},
+        ]
+        results = self.client.post('/api/calculate-cgpa/batch/', {'students': students}, format='json').json()['results']
+        self.assertEqual(results[0]['cgpa'], 8.0)
+        self.assertEqual(results[1]['error']['details']['semesters']['0']['sgpa'], ['SGPA must be between 0 and 10.'])
+        self.assertIn('semesters', results[2]['error']['details'])
+
+    @override_settings(CGPA_BATCH_MAX_STUDENTS=2)
+    def test_batch_size(self):
+        student = {'semesters': [{'sgpa': 8, 'credits': 20}]}
+        for students in ([], [student] * 3):
+            response = self.client.post('/api/calculate-cgpa/batch/', {'students': students}, format='json')
+            self.assertEqual(response.status_code, 400)
+
+
+class FastPathValidatorTests(TestCase):
+    PAYLOADS = [
+        {'semesters': [{'sgpa': 8.5, 'credits': 20}, {'sgpa': 9, 'credits': 22}]},
+        {'semesters': [{'sgpa': 11, 'credits': 20}, {'sgpa': 8, 'credits': 0}]},
+        {'semesters': [{'sgpa': -1, 'credits': -5}]},
+        {'semesters': [{'sgpa': 3.5, 'credits': 31}]},
+        {'semesters': [{'sgpa': '8.5', 'credits': '20'}]},
+        {'semesters': [{'sgpa': None, 'credits': 20}]},
+        {'semesters': [{'sgpa': 8}]},
+        {'semesters': [{'sgpa': True, 'credits': 20}]},
+        {'semesters': [{'sgpa': 8, 'credits': 20.5}]},
+        {'semesters': []},
+        {'semesters': 'none'},
+        {},
+        [],
+    ]
+
+    def test_matches_the_serializer(self):
+        for payload in self.PAYLOADS:
+            with self.subTest(payload=payload):
+                serializer = CGPACalculatorSerializer(data=payload)
+                if serializer.is_valid():
+                    expected = ([dict(semester) for semester in serializer.validated_data['semesters']], None)
+                else:
+                    expected = (None, serializer.errors)
+                semesters, errors = validate_semesters(payload)
+                semesters = semesters and [dict(semester) for semester in semesters]
+                self.assertEqual((semesters, errors), expected)
+
+
+class CGPACalculatorTests(CgCalculatorTestCase):
+    def test_cgpa(self):
+        response = self.client.post(
+            '/api/calculate-cgpa/', {'semesters': [{'sgpa': 8, 'credits': 20}, {'sgpa': 9, 'credits': 20}]}, format='json'
+        )
+        self.assertEqual(response.json(), {'cgpa': 8.5})
+
+    def test_validation_errors(self):
+        response = self.client.post('/api/calculate-cgpa/', {'semesters': [{'sgpa': 12, 'credits': 20}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['error']['details'], {'semesters': {'0': {'sgpa': ['SGPA must be between 0 and 10.']}}})
+
+
+class RequiredSGPATests(CgCalculatorTestCase):
+    HISTORY = [{'sgpa': 8, 'credits': 20}, {'sgpa': 7, 'credits': 22}]
+
+    def post(self, **data):
+        return self.client.post('/api/required-sgpa/', {'completed_semesters': self.HISTORY, **data}, format='json')
+
+    def test_single_scenario(self):
+        response = self.post(total_program_credits=160, future_semester_credits=118, expected_cgpa=8)
+        self.assertEqual(response.json(), {'required_sgpa': round((8 * 160 - 314) / 118, 2)})
+
+    def test_scenario_grid(self):
+        response = self.post(target_cgpas=[7.5, 8, 9.9], credit_plans=[[20, 20], [22, 24, 24]])
+        scenarios = response.json()['scenarios']
+        self.assertEqual(len(scenarios), 6)
+        self.assertEqual(scenarios[0], {
+            'target_cgpa': 7.5,
+            'credit_plan': [20, 20],
+            'required_sgpa': round((7.5 * 82 - 314) / 40, 2),
+            'achievable': True,
+            'already_secured': False,
+        })
+        self.assertFalse(scenarios[2]['achievable'])
+
+    def test_secured_and_unreachable_targets(self):
+        self.HISTORY = [{'sgpa': 9.0, 'credits': 20}] * 8
+        scenarios = self.post(target_cgpas=[5.0, 9.1, 12], credit_plans=[[20]]).json()['scenarios']
+        flags = [(s['required_sgpa'], s['achievable'], s['already_secured']) for s in scenarios]
+        self.assertEqual(flags[0], (0, True, True))
+        self.assertEqual(flags[1][1:], (True, False))
+        self.assertEqual(flags[2][1:], (False, False))
+
+    def test_missing_fields(self):
+        self.assertEqual(set(self.post().json()), {'total_program_credits', 'future_semester_credits', 'expected_cgpa'})
+        self.assertEqual(set(self.post(target_cgpas=[8]).json()), {'credit_plans'})
+        response = self.post(total_program_credits=160, future_semester_credits=0, expected_cgpa=8)
+        self.assertEqual(response.status_code, 400)
+
+    @override_settings(REQUIRED_SGPA_MAX_SCENARIOS=4)
+    def test_grid_size_is_bounded(self):
+        self.assertEqual(self.post(target_cgpas=[7, 8, 9], credit_plans=[[20], [22]]).status_code, 400)
+
+    def test_history_length_is_bounded(self):
+        self.HISTORY = [{'sgpa': 8, 'credits': 20}] * 41
+        self.assertEqual(self.post(target_cgpas=[8], credit_plans=[[20]]).status_code, 400)
+        self.HISTORY = self.HISTORY[:1]
+        self.assertEqual(self.post(target_cgpas=[8], credit_plans=[[1] * 41]).status_code, 400)
+
+    def test_long_histories_do_not_recurse(self):
+        self.assertEqual(completed_totals(((8.0, 1),) * 5000), (40000.0, 5000))
+
+    def test_scenarios_are_memoised(self):
+        required_sgpa.cache_clear()
+        self.post(target_cgpas=[8], credit_plans=[[20]])
+        self.post(target_cgpas=[8], credit_plans=[[20]])
+        self.assertEqual(required_sgpa.cache_info().hits, 1)
+
+
+class SemesterRecordTests(CgCalculatorTestCase):
+    def totals(self):
+        totals = CGPATotals.objects.get(user=self.user)
+        return totals.weighted_sum, totals.total_credits
+
+    def assertTotalsMatchRecords(self):
+        stored = self.totals()
+        recompute_totals(self.user.pk)
+        self.assertEqual(stored, self.totals())
+
+    def test_stored_cgpa_is_one_read(self):
+        self.assertEqual(self.client.post('/api/calculate-cgpa/', {}, format='json').status_code, 400)
+        for semester, sgpa, credits in ((1, 8, 20), (2, 7, 22)):
+            response = self.client.post('/api/semesters/', {'semester': semester, 'sgpa': sgpa, 'credits': credits}, format='json')
+            self.assertEqual(response.status_code, 201, response.content)
+        with self.assertNumQueries(1):
+            response = self.client.post('/api/calculate-cgpa/', {}, format='json')
+        self.assertEqual(response.json(), {'cgpa': round(314 / 42, 2), 'total_credits': 42})
+        listing = self.client.get('/api/semesters/').json()
+        self.assertEqual((listing['cgpa'], len(listing['semesters'])), (round(314 / 42, 2), 2))
+
+    def test_records_are_validated(self):
+        self.client.post('/api/semesters/', {'semester': 1, 'sgpa': 8, 'credits': 20}, format='json')
+        for data in (
+            {'semester': 1, 'sgpa': 7, 'credits': 22},
+            {'semester': 2, 'sgpa': 3, 'credits': 40},
+            {'semester': 0, 'sgpa': 7, 'credits': 22},
+        ):
+            self.assertEqual(self.client.post('/api/semesters/', data, format='json').status_code, 400)
+        self.assertEqual(self.totals(), (160, 20))
+
+    def test_totals_follow_updates_and_deletes(self):
+        self.client.post('/api/semesters/', {'semester': 1, 'sgpa': 8, 'credits': 20}, format='json')
+        self.client.post('/api/semesters/', {'semester': 2, 'sgpa': 7, 'credits': 22}, format='json')
+        self.assertEqual(self.client.patch('/api/semesters/2/', {'sgpa': 9}, format='json').status_code, 200)
+        self.assertEqual(self.totals(), (358, 42))
+        self.assertEqual(self.client.put('/api/semesters/2/', {'semester': 1, 'sgpa': 9, 'credits': 22}, format='json').status_code, 400)
+        self.assertEqual(self.client.delete('/api/semesters/1/').status_code, 204)
+        self.assertEqual(self.totals(), (198, 22))
+        self.assertTotalsMatchRecords()
+
+    def test_updates_use_the_loaded_values(self):
+        SemesterRecord.objects.create(user=self.user, semester=1, sgpa=8, credits=20)
+        record = SemesterRecord.objects.get()
+        record.sgpa = 9
+        # The update itself and one F() update of the totals
+        with self.assertNumQueries(2):
+            record.save()
+        self.assertEqual(self.totals(), (180, 20))
+
+    def test_deferred_fields_are_recomputed(self):
+        SemesterRecord.objects.create(user=self.user, semester=1, sgpa=8, credits=20)
+        record = SemesterRecord.objects.only('id').get()
+        record.sgpa = 5
+        record.save()
+        self.assertEqual(self.totals(), (100, 20))
+
+    def test_delete_subtracts_the_stored_values(self):
+        SemesterRecord.objects.create(user=self.user, semester=1, sgpa=8, credits=20)
+        SemesterRecord.objects.create(user=self.user, semester=2, sgpa=6, credits=10)
+        record = SemesterRecord.objects.get(semester=2)
+        record.sgpa, record.credits = 10, 99
+        record.delete()
+        self.assertEqual(self.totals(), (160, 20))
+        self.assertTotalsMatchRecords()
@@ -0,0 +1,97 @@
+"""Fast-path validation for CGPA ``semesters`` payloads.
+
+``CGPACalculatorSerializer`` runs a nested ``SGPAInputSerializer`` per
+semester, and most of a request's time goes into DRF field machinery.
+``validate_semesters`` applies the same rules in a tight loop for the usual
+JSON payload (a list of objects with numeric ``sgpa``/``credits``).
+
+Anything else, such as strings, nulls, missing keys, non-list payloads or
+form data, is handed to ``CGPACalculatorSerializer`` unchanged. Type and
+structure errors therefore come from DRF itself, and the fast path only has
+to reproduce the range and cross-field rules, using the serializer's own
+messages.
+"""
+
+from rest_framework.exceptions import ErrorDetail
+from rest_framework.settings import api_settings
+
+from .serializers import (
+    CREDITS_POSITIVE_MESSAGE,
+    LOW_SGPA_HIGH_CREDITS_MESSAGE,
+    SGPA_RANGE_MESSAGE,
+    CGPACalculatorSerializer,
+)
+
+
+class _Fallback(Exception):
+    """The payload needs DRF's full field handling."""
+
+
+def _number(value):
+    # Exactly the values FloatField and IntegerField accept unchanged.
+    if type(value) is float:
+        return value
+    if type(value) is int:
+        try:
+            return float(value)
+        except OverflowError:
+            raise _Fallback
+    raise _Fallback
+
+
+def _check_semester(item):
+    if type(item) is not dict or "sgpa" not in item or "credits" not in item:
+        raise _Fallback
+    sgpa = _number(item["sgpa"])
+    credits = item["credits"]
+    if type(credits) is not int:
+        raise _Fallback
+
+    errors = {}
+    if sgpa < 0 or sgpa > 10:
+        errors["sgpa"] = [ErrorDetail(SGPA_RANGE_MESSAGE, code="invalid")]
+    if credits <= 0:
+        errors["credits"] = [ErrorDetail(CREDITS_POSITIVE_MESSAGE, code="invalid")]
+    if not errors and sgpa < 4 and credits > 30:
+        errors[api_settings.NON_FIELD_ERRORS_KEY] = [
+            ErrorDetail(LOW_SGPA_HIGH_CREDITS_MESSAGE, code="invalid")
+        ]
+    return {"sgpa": sgpa, "credits": credits}, errors
+
+
+def _validate_fast(data):
+    if type(data) is not dict:
+        raise _Fallback
+    semesters = data.get("semesters")
+    if type(semesters) is not list or not semesters:
+        raise _Fallback
+
+    validated = []
+    errors = {}
+    for index, item in enumerate(semesters):
+        semester, item_errors = _check_semester(item)
+        if item_errors:
+            errors[index] = item_errors
+        else:
+            validated.append(semester)
+    if errors:
+        return None, {"semesters": errors}
+    return validated, None
+
+
+def validate_semesters(data):
+    """Validate a ``{"semesters": [...]}`` payload.
+
+    Returns ``(semesters, None)`` on success, where ``semesters`` is a list
+    of ``{"sgpa": float, "credits": int}`` dicts, or ``(None, errors)`` with
+    the same error structure and messages as
+    ``CGPACalculatorSerializer.errors``.
+    """
+    try:
+        return _validate_fast(data)
+    except _Fallback:
+        pass
+    serializer = CGPACalculatorSerializer(data=data)
+    if serializer.is_valid():
+        return serializer.validated_data["semesters"], None
+    return None, serializer.errors
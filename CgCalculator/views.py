@@ -1,15 +1,20 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .serializers import CGPACalculatorSerializer
+from .validators import validate_semesters
+from .models import CGPATotals
+from studybudy.authentication import StatelessJWTAuthentication
 from rest_framework.exceptions import APIException
 
 class CGPACalculatorView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+
     def post(self, request):
+        if isinstance(request.data, dict) and 'semesters' not in request.data:
+            return self.stored_cgpa(request)
         try:
-            serializer = CGPACalculatorSerializer(data=request.data)
-            if serializer.is_valid():
-                semesters = serializer.validated_data['semesters']
+            semesters, errors = validate_semesters(request.data)
+            if errors is None:
                 total_credits = 0
                 weighted_sum = 0
 
@@ -28,44 +33,154 @@ class CGPACalculatorView(APIView):
             return Response({
                 "error": {
                     "message": "Validation failed",
-                    "details": serializer.errors,
+                    "details": errors,
                 }
             },
             status=status.HTTP_400_BAD_REQUEST,
             )
         except Exception as e:
             raise APIException(f"An unexpected error occured : {str(e)}")
+
+    def stored_cgpa(self, request):
+        # Without a payload, answer from the user's saved semester records
+        totals = CGPATotals.objects.filter(user_id=request.user.id).first()
+        if totals is None or not totals.total_credits:
+            return Response({'error': 'No semesters given and none are saved.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response({'cgpa': totals.cgpa, 'total_credits': totals.total_credits},
+                        status=status.HTTP_200_OK)
         
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from .serializers import RequiredSGPASerializer
+from .planning import history_key, plan_scenarios, required_sgpa
 
 class RequiredSGPAView(APIView):
     def post(self, request):
         serializer = RequiredSGPASerializer(data=request.data)
         if serializer.is_valid():
             data = serializer.validated_data
-            completed_semesters = data['completed_semesters']
+            history = history_key(data['completed_semesters'])
+
+            if 'credit_plans' in data:
+                scenarios = plan_scenarios(history, data['target_cgpas'], data['credit_plans'])
+                return Response({'scenarios': scenarios}, status=status.HTTP_200_OK)
+
             total_program_credits = data['total_program_credits']
             future_semester_credits = data['future_semester_credits']
             expected_cgpa = data['expected_cgpa']
 
-            # Calculate Required SGPA
-            total_completed_credits = sum(sem['credits'] for sem in completed_semesters)
-            total_weighted_sgpa = sum(sem['sgpa'] * sem['credits'] for sem in completed_semesters)
-
-            required_cgpa_sum = expected_cgpa * total_program_credits
-            required_weighted_sum = required_cgpa_sum - total_weighted_sgpa
-
             if future_semester_credits <= 0:
                 return Response({'error': 'Future semester credits must be greater than zero.'},
                                 status=status.HTTP_400_BAD_REQUEST)
 
-            required_sgpa = required_weighted_sum / future_semester_credits
-            return Response({'required_sgpa': round(required_sgpa, 2)}, status=status.HTTP_200_OK)
+            sgpa = required_sgpa(history, expected_cgpa, future_semester_credits, total_program_credits)
+            return Response({'required_sgpa': round(sgpa, 2)}, status=status.HTTP_200_OK)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+from django.db import IntegrityError, transaction
+from django.shortcuts import get_object_or_404
+from .calculations import weighted_averages
+from .models import SemesterRecord
+from .serializers import SemesterRecordSerializer
+from .serializers import CGPABatchSerializer
+
+class CGPABatchView(APIView):
+    def post(self, request):
+        serializer = CGPABatchSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({
+                "error": {
+                    "message": "Validation failed",
+                    "details": serializer.errors,
+                }
+            },
+            status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = []
+        valid_semesters = []
+        valid_results = []
+        for index, student in enumerate(serializer.validated_data['students']):
+            result = {'index': index, 'id': student.get('id')}
+            results.append(result)
+            student_data = {key: student[key] for key in ('semesters',) if key in student}
+            semesters, errors = validate_semesters(student_data)
+            if errors is not None:
+                result['error'] = {
+                    "message": "Validation failed",
+                    "details": errors,
+                }
+                continue
+            valid_semesters.append(semesters)
+            valid_results.append(result)
+
+        # One vectorised pass over every valid student's semesters
+        for result, cgpa in zip(valid_results, weighted_averages(valid_semesters)):
+            if cgpa is None:
+                result['error'] = {'message': 'Total credits cannot be zero.'}
+            else:
+                result['cgpa'] = cgpa
+
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+
+class SemesterRecordListView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+
+    def get(self, request):
+        records = SemesterRecord.objects.filter(user_id=request.user.id)
+        totals = CGPATotals.objects.filter(user_id=request.user.id).first()
+        return Response({
+            'cgpa': totals.cgpa if totals else None,
+            'total_credits': totals.total_credits if totals else 0,
+            'semesters': SemesterRecordSerializer(records, many=True).data,
+        }, status=status.HTTP_200_OK)
+
+    def post(self, request):
+        serializer = SemesterRecordSerializer(data=request.data)
+        if serializer.is_valid():
+            try:
+                with transaction.atomic():
+                    serializer.save(user_id=request.user.id)
+            except IntegrityError:
+                return Response({'semester': ['This semester is already saved.']},
+                                status=status.HTTP_400_BAD_REQUEST)
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class SemesterRecordDetailView(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
+
+    def get_record(self, request, semester):
+        return get_object_or_404(SemesterRecord, user_id=request.user.id, semester=semester)
+
+    def get(self, request, semester):
+        return Response(SemesterRecordSerializer(self.get_record(request, semester)).data)
+
+    def put(self, request, semester):
+        return self.update(request, semester, partial=False)
+
+    def patch(self, request, semester):
+        return self.update(request, semester, partial=True)
+
+    def update(self, request, semester, partial):
+        serializer = SemesterRecordSerializer(self.get_record(request, semester), data=request.data, partial=partial)
+        if serializer.is_valid():
+            try:
+                with transaction.atomic():
+                    serializer.save()
+            except IntegrityError:
+                return Response({'semester': ['This semester is already saved.']},
+                                status=status.HTTP_400_BAD_REQUEST)
+            return Response(serializer.data, status=status.HTTP_200_OK)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    def delete(self, request, semester):
+        self.get_record(request, semester).delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
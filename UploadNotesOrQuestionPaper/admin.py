@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Notes,QuestionPaper
+from .models import Notes,QuestionPaper,UploadUsage
 
 admin.site.register(Notes)
-admin.site.register(QuestionPaper)
\ No newline at end of file
+admin.site.register(QuestionPaper)
+admin.site.register(UploadUsage)
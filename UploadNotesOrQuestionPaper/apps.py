@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class UploadnotesorquestionpaperConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'UploadNotesOrQuestionPaper'
+
+    def ready(self):
+        import UploadNotesOrQuestionPaper.signals  # noqa: F401
@@ -0,0 +1,33 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import NotFound, ValidationError
+
+from studybudy.authentication import async_jwt_required
+
+from .models import Notes, QuestionPaper
+from .pagination import KeysetPagination, filter_uploads
+from .serializers import NotesSerializer, QuestionPaperSerializer
+
+
+async def _paginated_listing(request, queryset, serializer_class):
+    paginator = KeysetPagination()
+    try:
+        page = await paginator.apaginate_queryset(filter_uploads(queryset, request), request)
+    except ValidationError as exc:
+        return JsonResponse(exc.detail, status=400)
+    except NotFound as exc:
+        return JsonResponse({'detail': exc.detail}, status=404)
+    serializer = serializer_class(page, many=True)
+    return JsonResponse(paginator.get_paginated_data(serializer.data))
+
+
+@require_GET
+@async_jwt_required
+async def view_notes(request):
+    return await _paginated_listing(request, Notes.objects.all(), NotesSerializer)
+
+
+@require_GET
+@async_jwt_required
+async def get_question_paper(request):
+    return await _paginated_listing(request, QuestionPaper.objects.all(), QuestionPaperSerializer)
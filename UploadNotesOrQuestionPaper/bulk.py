@@ -0,0 +1,138 @@
+"""Creating many notes or question papers in one request.
+
+Every item is validated with the usual serializer. The valid files are then
+written to disk concurrently, before any transaction is opened, so no
+database lock is held during file I/O. The pool threads only write files:
+the ``StoredBlob`` lookups and inserts stay in the request thread, since
+SQLite allows one writer at a time. All the rows are inserted with one
+``bulk_create`` inside a single transaction.
+
+``bulk_create`` sends no model signals, so the hooks those signals would
+run (text extraction, search indexing, listing versions, usage counters)
+are called here explicitly for the new rows.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+from studybudy.conditional import bump_listing_version
+from .extraction import schedule_extraction
+from .models import Notes, QuestionPaper
+from .quota import apply_usage_delta
+from .search import index_uploads
+from .storage import content_digest
+
+LISTING_NAMES = {Notes: "notes", QuestionPaper: "question_papers"}
+
+
+def _store(field, file):
+    name = field.generate_filename(None, file.name)
+    return field.storage.save(name, file, max_length=field.max_length)
+
+
+def _write_file(field, file):
+    name = field.generate_filename(None, file.name)
+    name = field.storage.get_available_name(name, max_length=field.max_length)
+    return field.storage.write_file(name, file)
+
+
+def write_files(field, files):
+    """Write ``files`` to disk concurrently; return their names in order.
+
+    Nothing is recorded in the database. If any write fails, the files
+    already written are removed and the error is raised.
+    """
+    workers = min(settings.BULK_UPLOAD_WORKERS, len(files))
+    if workers <= 1:
+        names = []
+        try:
+            for file in files:
+                names.append(_write_file(field, file))
+        except Exception:
+            for name in names:
+                field.storage.delete_file(name)
+            raise
+        return names
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bulk-upload") as pool:
+        futures = [pool.submit(_write_file, field, file) for file in files]
+    failed = [future for future in futures if future.exception() is not None]
+    if failed:
+        for future in futures:
+            if future.exception() is None:
+                field.storage.delete_file(future.result())
+        raise failed[0].exception()
+    return [future.result() for future in futures]
+
+
+def save_files(field, files):
+    """Store ``files`` for ``field``; return their storage names.
+
+    Content that is already stored, or repeated within ``files``, only
+    takes a reference. If anything fails, the files and references taken
+    so far are released and the error is raised.
+    """
+    storage = field.storage
+    digests = [content_digest(file) for file in files]
+    names = [None] * len(files)
+    # digest -> index of the one file written for it
+    new = {}
+    written = {}
+    try:
+        for index, digest in enumerate(digests):
+            if digest not in new:
+                names[index] = storage.reuse(digest)
+                if names[index] is None:
+                    new[digest] = index
+        indexes = list(new.values())
+        written = dict(zip(indexes, write_files(field, [files[index] for index in indexes])))
+        for index, digest in enumerate(digests):
+            if names[index] is not None:
+                continue
+            if new[digest] == index:
+                names[index] = storage.record_blob(digest, written[index], files[index].size)
+                del written[index]
+            else:
+                # Repeated within this request; its first copy is recorded by now
+                names[index] = storage.reuse(digest) or _store(field, files[index])
+    except Exception:
+        for name in written.values():
+            storage.delete_file(name)
+        delete_files(field, [name for name in names if name is not None])
+        raise
+    return names
+
+
+def delete_files(field, names):
+    for name in names:
+        field.storage.delete(name)
+
+
+def bulk_create_uploads(model, user_id, items):
+    """Create one ``model`` row per validated item and return the rows.
+
+    ``items`` are serializer ``validated_data`` dicts with ``sem``, ``title``
+    and ``file``.
+    """
+    field = model._meta.get_field("file")
+    names = save_files(field, [item["file"] for item in items])
+    rows = [
+        model(
+            user_id=user_id, sem=item.get("sem", 1), title=item["title"], file=name,
+            file_size=item["file"].size,
+        )
+        for item, name in zip(items, names)
+    ]
+    try:
+        with transaction.atomic():
+            rows = model.objects.bulk_create(rows)
+            schedule_extraction(rows)
+            index_uploads(rows)
+            bump_listing_version(LISTING_NAMES[model])
+            apply_usage_delta(user_id, sum(row.file_size for row in rows), len(rows))
+    except Exception:
+        delete_files(field, names)
+        raise
+    return rows
@@ -0,0 +1,152 @@
+"""Serving note and question paper files to authenticated users.
+
+``MEDIA_SENDFILE_BACKEND`` picks how the bytes leave the server:
+
+- ``""`` (default): Django sends the file itself with ``FileResponse``. It
+  honours single ``Range`` requests, so interrupted downloads resume. Under
+  a WSGI server with ``wsgi.file_wrapper`` (e.g. gunicorn), the response
+  is handed to ``sendfile()`` and the bytes are copied by the kernel.
+- ``"x-accel-redirect"``: nginx serves the file from the internal location
+  ``MEDIA_SENDFILE_PREFIX`` and handles ranges itself.
+- ``"x-sendfile"``: Apache/lighttpd serve the file's absolute path.
+
+Functions
+- parse_range: Parse a ``Range`` header against a file size.
+- serve_file: Build the response for a stored file.
+"""
+
+import mimetypes
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponse
+from django.utils.http import content_disposition_header, http_date, parse_http_date_safe
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class FileRange:
+    """A read-only view of ``length`` bytes of ``file`` from ``start``.
+
+    Exposes ``fileno()`` and ``tell()`` so a WSGI server's file wrapper can
+    ``sendfile()`` the range; ``read()`` stops at the end of the range for
+    servers that iterate instead.
+    """
+
+    def __init__(self, file, start, length, name):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+        self.name = name
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def tell(self):
+        return self.file.tell()
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """Return ``(start, end)`` (inclusive) for a single-range ``Range`` header.
+
+    Returns None to serve the whole file (no header, a multi-range or
+    malformed header), or ``"unsatisfiable"`` if the range lies past the end
+    of the file.
+    """
+    match = _RANGE.match(header.strip()) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(size - length, 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size:
+        return "unsatisfiable"
+    if end < start:
+        return None
+    return start, end
+
+
+def _range_applies(request, last_modified):
+    # If-Range: resume only if the file is unchanged since the client's copy
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if not if_range:
+        return True
+    since = parse_http_date_safe(if_range)
+    return since is not None and int(last_modified.timestamp()) <= since
+
+
+def _filename(field_file):
+    return posixpath.basename(field_file.name)
+
+
+def _sendfile_response(field_file, backend):
+    filename = _filename(field_file)
+    content_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response = HttpResponse(content_type=content_type)
+    if backend == "x-accel-redirect":
+        prefix = settings.MEDIA_SENDFILE_PREFIX.rstrip("/")
+        response["X-Accel-Redirect"] = f"{prefix}/{quote(field_file.name)}"
+    else:
+        response["X-Sendfile"] = field_file.storage.path(field_file.name)
+    response["Content-Disposition"] = content_disposition_header(False, filename)
+    return response
+
+
+def serve_file(request, field_file, last_modified):
+    """Return a response that sends ``field_file`` to the client.
+
+    Args:
+        request: The download request (``Range``/``If-Range`` are honoured).
+        field_file: The row's ``FieldFile``.
+        last_modified: When the row last changed; sent as Last-Modified.
+    """
+    backend = settings.MEDIA_SENDFILE_BACKEND
+    if backend:
+        response = _sendfile_response(field_file, backend)
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+        return response
+
+    file = field_file.storage.open(field_file.name, "rb")
+    size = field_file.storage.size(field_file.name)
+    filename = _filename(field_file)
+    byte_range = None
+    if _range_applies(request, last_modified):
+        byte_range = parse_range(request.META.get("HTTP_RANGE"), size)
+
+    if byte_range == "unsatisfiable":
+        file.close()
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+    elif byte_range is None:
+        response = FileResponse(file, filename=filename)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = FileResponse(FileRange(file, start, length, filename), status=206, filename=filename)
+        response["Content-Length"] = str(length)
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Accept-Ranges"] = "bytes"
+    response["Last-Modified"] = http_date(last_modified.timestamp())
+    return response
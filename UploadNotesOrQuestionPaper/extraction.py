@@ -0,0 +1,213 @@
+"""Plain-text extraction from uploaded notes and question papers.
+
+When an upload is committed, a background thread pool reads its file and
+stores the text, zlib-compressed, in ``NoteText``/``QuestionPaperText``.
+Search and summarization read that text and never reparse the original
+PDF or DOCX.
+
+Text is streamed straight into the compressor, one PDF page or DOCX
+paragraph at a time, so a 500-page document never has its full text
+uncompressed in memory. PDFs are read with ``pypdf``; DOCX files are read
+with ``zipfile`` and an incremental XML parse. Legacy ``.doc`` files are
+recorded as unsupported.
+
+Functions
+- extract_text: Extract and compress the text of one file.
+- read_upload_text / store_upload_text: Extract an upload's text; store it.
+- extract_upload_text: Extract the text of one upload and store it.
+- schedule_extraction: Queue extraction of uploads once the transaction commits.
+"""
+
+import logging
+import posixpath
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree.ElementTree import iterparse
+from zipfile import BadZipFile, ZipFile
+
+from django.conf import settings
+from django.db import OperationalError, connection, transaction
+from pypdf import PdfReader
+
+from .models import ExtractedText, Notes, NoteText, QuestionPaper, QuestionPaperText
+
+logger = logging.getLogger(__name__)
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+# Upload model -> (text model, name of its one-to-one field)
+TEXT_MODELS = {
+    Notes: (NoteText, "note"),
+    QuestionPaper: (QuestionPaperText, "question_paper"),
+}
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.TEXT_EXTRACTION_WORKERS,
+    thread_name_prefix="upload-text-extraction",
+)
+
+
+class UnsupportedFormat(Exception):
+    """The file's format cannot be read."""
+
+
+def _pdf_pages(file):
+    reader = PdfReader(file)
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _docx_paragraphs(file):
+    try:
+        archive = ZipFile(file)
+        document = archive.open("word/document.xml")
+    except (BadZipFile, KeyError):
+        raise UnsupportedFormat("Not a valid .docx file.")
+    with archive, document:
+        parts = []
+        for _, element in iterparse(document, events=("end",)):
+            tag = element.tag
+            if tag == _W + "t":
+                parts.append(element.text or "")
+            elif tag == _W + "tab":
+                parts.append("\t")
+            elif tag in (_W + "br", _W + "cr"):
+                parts.append("\n")
+            elif tag == _W + "p":
+                yield "".join(parts)
+                parts = []
+                # Drop the finished paragraph so memory stays flat
+                element.clear()
+
+
+# Extension -> (reader, separator between its pieces, whether a piece is a page)
+_READERS = {
+    ".pdf": (_pdf_pages, "\n", True),
+    ".docx": (_docx_paragraphs, "\n\n", False),
+}
+
+
+def extract_text(name, file):
+    """Return ``(compressed text, page count, character count)`` for ``file``.
+
+    ``name`` picks the reader by extension. The page count is None for
+    formats without fixed pages. Raises ``UnsupportedFormat`` if the file
+    cannot be read.
+    """
+    extension = posixpath.splitext(name)[1].lower()
+    if extension not in _READERS:
+        raise UnsupportedFormat(f"Text cannot be extracted from {extension or 'extensionless'} files.")
+    reader, separator, paged = _READERS[extension]
+
+    compressor = zlib.compressobj()
+    chunks = []
+    pieces = 0
+    chars = 0
+    for piece in reader(file):
+        if pieces:
+            piece = separator + piece
+        pieces += 1
+        chars += len(piece)
+        chunks.append(compressor.compress(piece.encode("utf-8")))
+    chunks.append(compressor.flush())
+    return b"".join(chunks), pieces if paged else None, chars
+
+
+def read_upload_text(upload):
+    """Return the ``ExtractedText`` field values for ``upload``'s file."""
+    values = {"status": ExtractedText.Status.DONE, "error": ""}
+    try:
+        with upload.file.storage.open(upload.file.name, "rb") as file:
+            content, page_count, char_count = extract_text(upload.file.name, file)
+        values.update(content=content, page_count=page_count, char_count=char_count)
+    except UnsupportedFormat as error:
+        values.update(status=ExtractedText.Status.UNSUPPORTED, error=str(error))
+    except Exception as error:
+        logger.exception("Could not extract text from %s", upload.file.name)
+        values.update(status=ExtractedText.Status.FAILED, error=str(error) or error.__class__.__name__)
+    if values["status"] != ExtractedText.Status.DONE:
+        values.update(content=b"", page_count=None, char_count=0)
+    return values
+
+
+def store_upload_text(upload, values):
+    text_model, field = TEXT_MODELS[type(upload)]
+    # Every field is set, so save blindly (UPDATE, then INSERT if no row)
+    # instead of update_or_create: each statement commits on its own, and
+    # a transaction that reads before writing would fail at once on
+    # SQLite's write lock instead of waiting out the busy timeout
+    text = text_model(**{field: upload}, **values)
+    text.save()
+    return text
+
+
+def extract_upload_text(upload):
+    """Extract the text of a ``Notes`` or ``QuestionPaper`` and store it."""
+    return store_upload_text(upload, read_upload_text(upload))
+
+
+def _with_retries(func, *args):
+    # SQLite answers "database is locked" when another connection holds
+    # the write lock for longer than the busy timeout; back off and try again
+    retries = settings.TEXT_EXTRACTION_DB_RETRIES
+    for attempt in range(retries + 1):
+        try:
+            return func(*args)
+        except OperationalError:
+            if attempt == retries:
+                raise
+            time.sleep(settings.TEXT_EXTRACTION_DB_RETRY_DELAY * 2 ** attempt)
+
+
+def _mark_failed(model, pk, error):
+    text_model = TEXT_MODELS[model][0]
+    text_model.objects.filter(pk=pk, status=ExtractedText.Status.PENDING).update(
+        status=ExtractedText.Status.FAILED, error=str(error) or error.__class__.__name__
+    )
+
+
+def _extract_in_background(model, pk):
+    try:
+        upload = _with_retries(model.objects.filter(pk=pk).first)
+        # Deleted before its turn came
+        if upload is not None:
+            _with_retries(store_upload_text, upload, read_upload_text(upload))
+    except Exception as error:
+        logger.exception("Text extraction failed for %s %s", model.__name__, pk)
+        # Don't leave the row pending until someone reruns the command
+        try:
+            _with_retries(_mark_failed, model, pk, error)
+        except Exception:
+            logger.exception("Could not mark text of %s %s as failed", model.__name__, pk)
+    finally:
+        # Pool threads are reused; don't leave their connections open
+        connection.close()
+
+
+def schedule_extraction(uploads):
+    """Extract the text of ``uploads`` off the request path.
+
+    Marks their text as pending now and queues the extraction once the
+    surrounding transaction commits, so a rolled back upload is never read.
+    All uploads must be of the same model; bulk creates can pass every new
+    row at once.
+    """
+    uploads = [upload for upload in uploads if upload.file]
+    if not uploads:
+        return
+    model = type(uploads[0])
+    text_model, field = TEXT_MODELS[model]
+    pks = [upload.pk for upload in uploads]
+    text_model.objects.filter(pk__in=pks).update(
+        status=ExtractedText.Status.PENDING, content=b"", page_count=None, char_count=0, error=""
+    )
+    text_model.objects.bulk_create(
+        [text_model(**{f"{field}_id": pk}) for pk in pks], ignore_conflicts=True
+    )
+
+    def submit():
+        for pk in pks:
+            _executor.submit(_extract_in_background, model, pk)
+
+    transaction.on_commit(submit)
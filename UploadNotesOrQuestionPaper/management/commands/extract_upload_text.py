@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from UploadNotesOrQuestionPaper.extraction import TEXT_MODELS, extract_upload_text
+from UploadNotesOrQuestionPaper.models import ExtractedText
+
+
+class Command(BaseCommand):
+    help = "Extract the text of uploaded notes and question papers that have none yet."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-extract every upload, not only those without extracted text.",
+        )
+
+    def handle(self, *args, **options):
+        done = 0
+        for model, (text_model, field) in TEXT_MODELS.items():
+            uploads = model.objects.exclude(file="")
+            if not options["all"]:
+                # Pending rows were queued by a process that may have died
+                finished = text_model.objects.exclude(status=ExtractedText.Status.PENDING)
+                uploads = uploads.exclude(pk__in=finished.values("pk"))
+            for upload in uploads.only("id", "file").iterator():
+                text = extract_upload_text(upload)
+                if text.status != ExtractedText.Status.DONE:
+                    self.stderr.write(f"{upload.file.name}: {text.error}")
+                    continue
+                done += 1
+        self.stdout.write(f"Extracted text from {done} upload(s).")
@@ -0,0 +1,29 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from UploadNotesOrQuestionPaper.models import ChunkedUpload
+from UploadNotesOrQuestionPaper.uploads import discard
+
+
+class Command(BaseCommand):
+    help = "Delete chunked uploads that have not received a chunk recently."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--hours",
+            type=int,
+            default=24,
+            help="Remove uploads idle for at least this many hours (default: 24).",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+        stale = ChunkedUpload.objects.filter(updated_at__lt=cutoff)
+        count = 0
+        for upload in stale.iterator():
+            discard(upload)
+            upload.delete()
+            count += 1
+        self.stdout.write(f"Removed {count} stale chunked upload(s).")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from UploadNotesOrQuestionPaper.search import fts_available, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index of notes and question papers."
+
+    def handle(self, *args, **options):
+        if not fts_available():
+            self.stdout.write("This database has no search index; search matches titles directly.")
+            return
+        with transaction.atomic():
+            count = rebuild_index()
+        self.stdout.write(f"Indexed {count} upload(s).")
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('UploadNotesOrQuestionPaper', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notes',
+            index=models.Index(fields=['-created_at', '-id'], name='notes_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notes',
+            index=models.Index(fields=['sem', '-created_at', '-id'], name='notes_sem_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notes',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='notes_user_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionpaper',
+            index=models.Index(fields=['-created_at', '-id'], name='qpaper_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionpaper',
+            index=models.Index(fields=['sem', '-created_at', '-id'], name='qpaper_sem_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='questionpaper',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='qpaper_user_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:27
+
+import UploadNotesOrQuestionPaper.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('UploadNotesOrQuestionPaper', '0004_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(db_index=True, max_length=255)),
+                ('size', models.BigIntegerField()),
+                ('ref_count', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='notes',
+            name='file',
+            field=models.FileField(storage=UploadNotesOrQuestionPaper.storage.get_upload_storage, upload_to='notes/'),
+        ),
+        migrations.AlterField(
+            model_name='questionpaper',
+            name='file',
+            field=models.FileField(storage=UploadNotesOrQuestionPaper.storage.get_upload_storage, upload_to='question_papers/'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('UploadNotesOrQuestionPaper', '0005_storedblob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteText',
+            fields=[
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('unsupported', 'Unsupported format'), ('failed', 'Failed')], default='pending', max_length=12)),
+                ('content', models.BinaryField(default=b'')),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('char_count', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('note', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='extracted_text', serialize=False, to='UploadNotesOrQuestionPaper.notes')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='QuestionPaperText',
+            fields=[
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('done', 'Done'), ('unsupported', 'Unsupported format'), ('failed', 'Failed')], default='pending', max_length=12)),
+                ('content', models.BinaryField(default=b'')),
+                ('page_count', models.PositiveIntegerField(blank=True, null=True)),
+                ('char_count', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('question_paper', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='extracted_text', serialize=False, to='UploadNotesOrQuestionPaper.questionpaper')),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+import zlib
+
+from django.db import migrations
+
+# Kept in step with UploadNotesOrQuestionPaper.search
+KINDS = (
+    ('notes', 'Notes', 'NoteText', 0),
+    ('question_paper', 'QuestionPaper', 'QuestionPaperText', 1),
+)
+
+
+def create_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        # Other backends use the title-only fallback in search.py
+        return
+    schema_editor.execute(
+        "CREATE VIRTUAL TABLE upload_search USING fts5("
+        "title, body, sem, kind, tokenize = 'porter unicode61 remove_diacritics 2')"
+    )
+    for kind, model_name, text_model_name, tag in KINDS:
+        model = apps.get_model('UploadNotesOrQuestionPaper', model_name)
+        text_model = apps.get_model('UploadNotesOrQuestionPaper', text_model_name)
+        texts = dict(text_model.objects.filter(status='done').values_list('pk', 'content'))
+        for upload in model.objects.only('id', 'title', 'sem').iterator():
+            content = texts.get(upload.pk)
+            schema_editor.execute(
+                "INSERT INTO upload_search (rowid, title, body, sem, kind) VALUES (%s, %s, %s, %s, %s)",
+                [
+                    upload.pk * 2 + tag,
+                    upload.title,
+                    zlib.decompress(content).decode('utf-8') if content else '',
+                    str(upload.sem),
+                    kind,
+                ],
+            )
+
+
+def drop_search_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS upload_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('UploadNotesOrQuestionPaper', '0006_extracted_text'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_table, drop_search_table),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_usage(apps, schema_editor):
+    StoredBlob = apps.get_model('UploadNotesOrQuestionPaper', 'StoredBlob')
+    UploadUsage = apps.get_model('UploadNotesOrQuestionPaper', 'UploadUsage')
+    # Deduplicated files already have their size recorded
+    blob_sizes = dict(StoredBlob.objects.values_list('name', 'size'))
+    usage = {}
+    for model_name in ('Notes', 'QuestionPaper'):
+        model = apps.get_model('UploadNotesOrQuestionPaper', model_name)
+        storage = model._meta.get_field('file').storage
+        for upload in model.objects.only('id', 'user_id', 'file').iterator():
+            name = upload.file.name
+            size = blob_sizes.get(name)
+            if size is None and name:
+                try:
+                    size = storage.size(name)
+                except OSError:
+                    size = 0
+            if size:
+                model.objects.filter(pk=upload.pk).update(file_size=size)
+            bytes_used, file_count = usage.get(upload.user_id, (0, 0))
+            usage[upload.user_id] = (bytes_used + (size or 0), file_count + 1)
+    UploadUsage.objects.bulk_create(
+        UploadUsage(user_id=user_id, bytes_used=bytes_used, file_count=file_count)
+        for user_id, (bytes_used, file_count) in usage.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('UploadNotesOrQuestionPaper', '0007_upload_search'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadUsage',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='upload_usage', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('bytes_used', models.PositiveBigIntegerField(default=0)),
+                ('file_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='notes',
+            name='file_size',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='questionpaper',
+            name='file_size',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_usage, migrations.RunPython.noop),
+    ]
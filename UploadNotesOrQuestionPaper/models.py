@@ -1,14 +1,27 @@
+import uuid
+import zlib
+
 from django.db import models
 from django.conf import settings
 
+from .storage import get_upload_storage
+
 class Notes(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     sem = models.IntegerField(default=1)
     title = models.CharField(max_length=50)
-    file = models.FileField(upload_to='notes/')
+    file = models.FileField(upload_to='notes/', storage=get_upload_storage)
+    file_size = models.BigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='notes_created_id_idx'),
+            models.Index(fields=['sem', '-created_at', '-id'], name='notes_sem_created_id_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='notes_user_created_id_idx'),
+        ]
+
     def __str__(self):
         return self.title
     
@@ -16,10 +29,117 @@ class QuestionPaper(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     sem = models.IntegerField(default=1)
     title = models.CharField(max_length=50)
-    file = models.FileField(upload_to='question_papers/')
+    file = models.FileField(upload_to='question_papers/', storage=get_upload_storage)
+    file_size = models.BigIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='qpaper_created_id_idx'),
+            models.Index(fields=['sem', '-created_at', '-id'], name='qpaper_sem_created_id_idx'),
+            models.Index(fields=['user', '-created_at', '-id'], name='qpaper_user_created_id_idx'),
+        ]
+
     def __str__(self):
         return self.title
-    
\ No newline at end of file
+
+
+class UploadUsage(models.Model):
+    """Storage used by one user's notes and question papers (see ``quota.py``)."""
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, primary_key=True, related_name='upload_usage'
+    )
+    bytes_used = models.PositiveBigIntegerField(default=0)
+    file_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.bytes_used} bytes in {self.file_count} files"
+
+
+class ChunkedUpload(models.Model):
+    """An in-progress upload that is sent in several chunks.
+
+    The bytes received so far live in a staging file (see ``uploads.py``);
+    ``offset`` is how many of them have been committed, which is where the
+    client resumes after a dropped connection.
+    """
+
+    class Kind(models.TextChoices):
+        NOTES = 'notes', 'Notes'
+        QUESTION_PAPER = 'question_paper', 'Question paper'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    sem = models.IntegerField(default=1)
+    title = models.CharField(max_length=50)
+    filename = models.CharField(max_length=255)
+    total_size = models.BigIntegerField()
+    offset = models.BigIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.total_size})"
+
+
+class StoredBlob(models.Model):
+    """A stored upload file, shared by every row whose content hashes the same."""
+
+    digest = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, db_index=True)
+    size = models.BigIntegerField()
+    ref_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} refs)"
+
+
+class ExtractedText(models.Model):
+    """Plain text extracted from an uploaded file, zlib-compressed.
+
+    Filled in the background by ``extraction.py`` so search and
+    summarization never reparse the original PDF or DOCX.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        DONE = 'done', 'Done'
+        UNSUPPORTED = 'unsupported', 'Unsupported format'
+        FAILED = 'failed', 'Failed'
+
+    status = models.CharField(max_length=12, choices=Status.choices, default=Status.PENDING)
+    content = models.BinaryField(default=b'')
+    page_count = models.PositiveIntegerField(null=True, blank=True)
+    char_count = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def text(self):
+        if not self.content:
+            return ''
+        return zlib.decompress(self.content).decode('utf-8')
+
+
+class NoteText(ExtractedText):
+    note = models.OneToOneField(Notes, on_delete=models.CASCADE, primary_key=True, related_name='extracted_text')
+
+    def __str__(self):
+        return f"Text of note {self.note_id} ({self.status})"
+
+
+class QuestionPaperText(ExtractedText):
+    question_paper = models.OneToOneField(
+        QuestionPaper, on_delete=models.CASCADE, primary_key=True, related_name='extracted_text'
+    )
+
+    def __str__(self):
+        return f"Text of question paper {self.question_paper_id} ({self.status})"
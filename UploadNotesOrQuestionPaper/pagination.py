@@ -0,0 +1,130 @@
+"""Keyset pagination for the notes and question paper listings.
+
+Rows are ordered newest first on ``(created_at, id)`` and each page is
+fetched with a ``WHERE (created_at, id) < cursor`` predicate instead of an
+OFFSET, so the cost of a page does not grow with how deep the client has
+scrolled. The composite indexes on ``Notes``/``QuestionPaper`` back both
+the ordering and the optional ``sem``/``user`` filters.
+
+The helpers read ``request.GET`` rather than DRF's ``query_params`` so the
+async views, which receive a plain ``HttpRequest``, can share them.
+"""
+
+from base64 import b64decode, b64encode
+from binascii import Error as BinasciiError
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+UPLOAD_ORDERING = ("-created_at", "-id")
+UPLOAD_FILTERS = ("sem", "user")
+
+
+def filter_uploads(queryset, request):
+    """Apply the ``sem``/``user`` query parameters to an upload queryset."""
+    for name in UPLOAD_FILTERS:
+        value = request.GET.get(name)
+        if value in (None, ""):
+            continue
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValidationError({name: [f"'{name}' must be an integer."]})
+        queryset = queryset.filter(**{name: value})
+    return queryset
+
+
+def encode_cursor(created_at, pk):
+    raw = f"{created_at.isoformat()}|{pk}".encode("ascii")
+    return b64encode(raw, altchars=b"-_").decode("ascii")
+
+
+def decode_cursor(cursor):
+    """Return the ``(created_at, id)`` position encoded in ``cursor``.
+
+    Returns ``None`` if the cursor is malformed.
+    """
+    try:
+        raw = b64decode(cursor.encode("ascii"), altchars=b"-_").decode("ascii")
+        created_at, pk = raw.rsplit("|", 1)
+        created_at = parse_datetime(created_at)
+        pk = int(pk)
+    except (BinasciiError, UnicodeError, ValueError):
+        return None
+    if created_at is None:
+        return None
+    return created_at, pk
+
+
+def after_cursor(queryset, position):
+    """Restrict ``queryset`` to rows that sort after ``position``."""
+    created_at, pk = position
+    # The redundant created_at <= bound gives the planner a range to seek
+    # in the (created_at, id) indexes; the OR alone makes it scan them
+    return queryset.filter(
+        Q(created_at__lte=created_at),
+        Q(created_at__lt=created_at) | Q(id__lt=pk),
+    )
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size = 50
+    max_page_size = 200
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.GET[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def get_page_queryset(self, queryset, request):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*UPLOAD_ORDERING)
+
+        cursor = request.GET.get(self.cursor_query_param)
+        if cursor:
+            position = decode_cursor(cursor)
+            if position is None:
+                raise NotFound(self.invalid_cursor_message)
+            queryset = after_cursor(queryset, position)
+
+        # Fetch one extra row to find out whether there is a next page.
+        return queryset[: self.page_size + 1]
+
+    def set_page(self, rows):
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        return self.page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.set_page(list(self.get_page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request):
+        queryset = self.get_page_queryset(queryset, request)
+        return self.set_page([row async for row in queryset.aiterator()])
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        last = self.page[-1]
+        url = self.request.build_absolute_uri()
+        return replace_query_param(
+            url, self.cursor_query_param, encode_cursor(last.created_at, last.pk)
+        )
+
+    def get_paginated_data(self, data):
+        return {"next": self.get_next_link(), "results": data}
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
@@ -0,0 +1,75 @@
+"""Per-user storage usage and the upload quota.
+
+Each user's ``UploadUsage`` row holds the total ``file_size`` and number of
+their notes and question papers. It is kept current with ``F()`` updates
+from the signals in ``signals.py`` (and from ``bulk.py``, since
+``bulk_create`` sends no signals), so checking the quota on upload is one
+primary-key read instead of a sum over the user's rows.
+
+Sizes are counted per row: two uploads with the same content count twice
+against the user's quota even though storage keeps one copy.
+
+Functions
+- apply_usage_delta: Add bytes and files to a user's usage.
+- get_usage: Return a user's ``(bytes_used, file_count)``.
+- quota_exceeded: Return the 413 response for an upload over quota, if any.
+- recompute_usage: Rebuild a user's usage from their uploads.
+"""
+
+from django.conf import settings
+from django.db.models import Count, Sum
+from rest_framework import status
+from rest_framework.response import Response
+from studybudy.counters import apply_counter_delta
+
+from .models import Notes, QuestionPaper, UploadUsage
+
+
+def apply_usage_delta(user_id, size, count, create=True):
+    """Add ``size`` bytes and ``count`` files (either may be negative)."""
+    apply_counter_delta(UploadUsage, {'user_id': user_id}, create=create, bytes_used=size, file_count=count)
+
+
+def get_usage(user_id):
+    usage = UploadUsage.objects.filter(user_id=user_id).values_list('bytes_used', 'file_count').first()
+    return usage or (0, 0)
+
+
+def quota_exceeded(user_id, size):
+    """Return a 413 response if ``size`` more bytes would exceed the quota.
+
+    Returns None when the upload fits, or when ``UPLOAD_QUOTA_BYTES`` is None
+    (no quota).
+    """
+    quota = settings.UPLOAD_QUOTA_BYTES
+    if quota is None:
+        return None
+    bytes_used = get_usage(user_id)[0]
+    if bytes_used + size <= quota:
+        return None
+    return Response(
+        {
+            'error': 'Upload quota exceeded.',
+            'quota': quota,
+            'bytes_used': bytes_used,
+            'bytes_requested': size,
+        },
+        status=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    )
+
+
+def recompute_usage(user_id, create=True):
+    """Rebuild a user's usage from their notes and question papers.
+
+    With ``create=False`` a user without a usage row is left without one.
+    """
+    size, count = 0, 0
+    for model in (Notes, QuestionPaper):
+        totals = model.objects.filter(user_id=user_id).aggregate(size=Sum('file_size'), count=Count('id'))
+        size += totals['size'] or 0
+        count += totals['count']
+    values = {'bytes_used': size, 'file_count': count}
+    if create:
+        UploadUsage.objects.update_or_create(user_id=user_id, defaults=values)
+    else:
+        UploadUsage.objects.filter(user_id=user_id).update(**values)
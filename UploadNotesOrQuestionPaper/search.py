@@ -0,0 +1,183 @@
+"""Full-text search over notes and question papers.
+
+On SQLite, uploads are indexed in the FTS5 table ``upload_search`` (created
+by migration 0007) over their title and extracted text, and results are
+ranked with BM25. Each upload is one index row whose rowid encodes its kind
+and id, so an update or delete touches only that row. ``sem`` and ``kind``
+are indexed columns as well: filtering on them narrows the posting lists
+inside FTS5 rather than post-filtering matches, and they get no BM25 weight.
+
+The signals in ``signals.py`` keep the index current on save and delete of
+an upload or its extracted text. On other database backends, search falls
+back to matching every query word in the title, newest first.
+
+Functions
+- build_match_query: Turn free text into a safe FTS5 MATCH expression.
+- index_uploads: Add or refresh the index rows of some uploads.
+- unindex_uploads: Remove the index rows of some uploads.
+- search_uploads: Run a search and return ``(kind, upload, score)`` matches.
+- rebuild_index: Reindex every upload.
+"""
+
+import re
+import zlib
+
+from django.db import connection
+
+from .models import ExtractedText, Notes, NoteText, QuestionPaper, QuestionPaperText
+
+SEARCH_TABLE = "upload_search"
+
+# kind name -> (model, text model, rowid tag). rowid = pk * 2 + tag.
+KINDS = {
+    "notes": (Notes, NoteText, 0),
+    "question_paper": (QuestionPaper, QuestionPaperText, 1),
+}
+_KIND_OF_MODEL = {model: kind for kind, (model, _, _) in KINDS.items()}
+_KIND_OF_TAG = {tag: kind for kind, (_, _, tag) in KINDS.items()}
+
+# BM25 weights for (title, body, sem, kind)
+_BM25 = "bm25(upload_search, 10.0, 1.0, 0.0, 0.0)"
+_WORD = re.compile(r"\w+")
+
+
+def fts_available():
+    return connection.vendor == "sqlite"
+
+
+def query_words(query):
+    return _WORD.findall(query)
+
+
+def build_match_query(query, sem=None, kind=None):
+    """Return an FTS5 MATCH expression requiring every word of ``query``.
+
+    Each word is quoted, so FTS5 operators and syntax in the input are
+    searched for literally. Returns None if ``query`` has no words.
+    """
+    words = query_words(query)
+    if not words:
+        return None
+    terms = " ".join('"{}"'.format(word.replace('"', '""')) for word in words)
+    expression = f"{{title body}} : ({terms})"
+    if sem is not None:
+        expression += f' AND sem : "{int(sem)}"'
+    if kind is not None:
+        expression += f' AND kind : "{kind}"'
+    return expression
+
+
+def _rowid(kind, pk):
+    return pk * 2 + KINDS[kind][2]
+
+
+def index_uploads(uploads):
+    """Add or refresh the index rows of ``uploads`` (all of one model)."""
+    uploads = list(uploads)
+    if not uploads or not fts_available():
+        return
+    kind = _KIND_OF_MODEL[type(uploads[0])]
+    text_model = KINDS[kind][1]
+    texts = dict(
+        text_model.objects.filter(
+            pk__in=[upload.pk for upload in uploads], status=ExtractedText.Status.DONE
+        ).values_list("pk", "content")
+    )
+    rows = []
+    for upload in uploads:
+        content = texts.get(upload.pk)
+        body = zlib.decompress(content).decode("utf-8") if content else ""
+        rows.append((_rowid(kind, upload.pk), upload.title, body, str(upload.sem), kind))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(row[0],) for row in rows]
+        )
+        cursor.executemany(
+            f"INSERT INTO {SEARCH_TABLE} (rowid, title, body, sem, kind) VALUES (%s, %s, %s, %s, %s)",
+            rows,
+        )
+
+
+def unindex_uploads(model, pks):
+    if not pks or not fts_available():
+        return
+    kind = _KIND_OF_MODEL[model]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [(_rowid(kind, pk),) for pk in pks]
+        )
+
+
+def search_uploads(query, sem=None, kind=None, limit=20, offset=0):
+    """Return up to ``limit`` ``(kind, upload, score)`` matches for ``query``.
+
+    ``score`` is the BM25 relevance (higher is better), or None from the
+    fallback search.
+    """
+    if not query_words(query):
+        return []
+    if not fts_available():
+        return _fallback_search(query, sem, kind, limit, offset)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, {_BM25} AS score FROM {SEARCH_TABLE} "
+            f"WHERE {SEARCH_TABLE} MATCH %s ORDER BY score LIMIT %s OFFSET %s",
+            [build_match_query(query, sem, kind), limit, offset],
+        )
+        hits = cursor.fetchall()
+
+    # One query per kind for the matched rows, then restore the ranking
+    wanted = {}
+    for rowid, _ in hits:
+        wanted.setdefault(_KIND_OF_TAG[rowid % 2], []).append(rowid // 2)
+    found = {}
+    for kind_name, pks in wanted.items():
+        for upload in KINDS[kind_name][0].objects.filter(pk__in=pks):
+            found[kind_name, upload.pk] = upload
+    results = []
+    for rowid, score in hits:
+        kind_name = _KIND_OF_TAG[rowid % 2]
+        upload = found.get((kind_name, rowid // 2))
+        # bm25() is lower-is-better; flip it for clients
+        if upload is not None:
+            results.append((kind_name, upload, -score))
+    return results
+
+
+def _fallback_search(query, sem, kind, limit, offset):
+    results = []
+    for name, (model, _, _) in KINDS.items():
+        if kind is not None and name != kind:
+            continue
+        queryset = model.objects.all()
+        for word in query_words(query):
+            queryset = queryset.filter(title__icontains=word)
+        if sem is not None:
+            queryset = queryset.filter(sem=sem)
+        rows = queryset.order_by("-created_at", "-id")[: offset + limit]
+        results.extend((name, upload, None) for upload in rows)
+    results.sort(key=lambda result: (result[1].created_at, result[1].pk), reverse=True)
+    return results[offset:offset + limit]
+
+
+def rebuild_index(batch_size=1000):
+    """Drop and rebuild every index row; returns the number indexed."""
+    if not fts_available():
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    count = 0
+    for model, _, _ in KINDS.values():
+        batch = []
+        for upload in model.objects.only("id", "title", "sem").iterator(chunk_size=batch_size):
+            batch.append(upload)
+            if len(batch) == batch_size:
+                index_uploads(batch)
+                count += len(batch)
+                batch = []
+        index_uploads(batch)
+        count += len(batch)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+    return count
@@ -1,11 +1,37 @@
+from django.conf import settings
+from django.core.files import File
+from django.db import models
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Notes, QuestionPaper
+from .models import ChunkedUpload, Notes, QuestionPaper
+
+
+class DownloadURLFileField(serializers.FileField):
+    """Accepts an uploaded file and represents it by its ``download/`` URL.
+
+    That view requires a login and serves byte ranges; the ``/media/`` URL
+    of the file itself is never handed out.
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        url = reverse('download_upload', args=[self.parent.download_kind, value.instance.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+
+UPLOAD_FIELD_MAPPING = {**serializers.ModelSerializer.serializer_field_mapping, models.FileField: DownloadURLFileField}
+
 
 class NotesSerializer(serializers.ModelSerializer):
+    serializer_field_mapping = UPLOAD_FIELD_MAPPING
+    download_kind = ChunkedUpload.Kind.NOTES
+
     class Meta:
         model = Notes
-        fields = ['id', 'sem', 'title', 'file', 'created_at', 'updated_at']  
-        read_only_fields = ['created_at', 'updated_at']
+        fields = ['id', 'sem', 'title', 'file', 'file_size', 'created_at', 'updated_at']  
+        read_only_fields = ['file_size', 'created_at', 'updated_at']
         
     def validate_file(self, value):
         if not value.name.endswith(('.pdf', '.doc', '.docx')):
@@ -19,10 +45,13 @@ class NotesSerializer(serializers.ModelSerializer):
 
 
 class QuestionPaperSerializer(serializers.ModelSerializer):
+    serializer_field_mapping = UPLOAD_FIELD_MAPPING
+    download_kind = ChunkedUpload.Kind.QUESTION_PAPER
+
     class Meta:
         model = QuestionPaper
-        fields = ['id', 'sem', 'title', 'file', 'created_at', 'updated_at']  
-        read_only_fields = ['created_at', 'updated_at']
+        fields = ['id', 'sem', 'title', 'file', 'file_size', 'created_at', 'updated_at']  
+        read_only_fields = ['file_size', 'created_at', 'updated_at']
         
     def validate_file(self, value):
         if not value.name.endswith(('.pdf')):
@@ -33,3 +62,56 @@ class QuestionPaperSerializer(serializers.ModelSerializer):
         if len(value) < 5:
             raise serializers.ValidationError("Title must be at least 5 characters long.")
         return value
+
+
+class ChunkedUploadSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ChunkedUpload
+        fields = ['id', 'kind', 'sem', 'title', 'filename', 'total_size', 'offset', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'offset', 'created_at', 'updated_at']
+
+    def validate_total_size(self, value):
+        if value <= 0:
+            raise serializers.ValidationError("File size must be a positive integer.")
+        if value > settings.CHUNKED_UPLOAD_MAX_SIZE:
+            raise serializers.ValidationError(
+                f"File size cannot exceed {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes."
+            )
+        return value
+
+    def validate(self, data):
+        # Apply the same title and file-type rules the finished upload will
+        # be checked against, so a bad upload fails before any bytes are sent.
+        target = upload_serializer_for(data['kind'])()
+        errors = {}
+        try:
+            target.validate_title(data['title'])
+        except serializers.ValidationError as exc:
+            errors['title'] = exc.detail
+        try:
+            target.validate_file(File(None, name=data['filename']))
+        except serializers.ValidationError as exc:
+            errors['filename'] = exc.detail
+        if errors:
+            raise serializers.ValidationError(errors)
+        return data
+
+
+def upload_serializer_for(kind):
+    if kind == ChunkedUpload.Kind.QUESTION_PAPER:
+        return QuestionPaperSerializer
+    return NotesSerializer
+
+
+class UploadSearchSerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    sem = serializers.IntegerField(required=False)
+    kind = serializers.ChoiceField(choices=ChunkedUpload.Kind.choices, required=False)
+    page_size = serializers.IntegerField(min_value=1, max_value=50, default=20)
+    offset = serializers.IntegerField(min_value=0, max_value=1000, default=0)
+
+
+class BulkUploadSerializer(serializers.Serializer):
+    """The shared part of a bulk upload; the items are validated one by one."""
+
+    kind = serializers.ChoiceField(choices=ChunkedUpload.Kind.choices, default=ChunkedUpload.Kind.NOTES)
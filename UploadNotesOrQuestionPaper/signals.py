@@ -0,0 +1,149 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+
+from .extraction import schedule_extraction
+from .models import Notes, NoteText, QuestionPaper, QuestionPaperText
+from .quota import apply_usage_delta, recompute_usage
+from .search import index_uploads, unindex_uploads
+from studybudy.conditional import bump_listing_version
+from studybudy.counters import remember_loaded_values
+
+# Marks a file that was deferred when the row was loaded
+_NOT_LOADED = object()
+
+
+def _file_name(value):
+    # Freshly loaded rows hold the plain name until the field is accessed
+    return getattr(value, "name", value) or ""
+
+
+@receiver(post_delete, sender=Notes)
+@receiver(post_delete, sender=QuestionPaper)
+def release_upload_file(sender, instance, **kwargs):
+    # The storage keeps the file while other rows still share its content
+    if instance.file:
+        file = instance.file
+        transaction.on_commit(lambda: file.delete(save=False))
+
+
+@receiver(pre_save, sender=Notes)
+@receiver(pre_save, sender=QuestionPaper)
+def remember_replaced_file(sender, instance, **kwargs):
+    # A new file (even one deduplicated to the same name) holds its own
+    # reference, so the one held by the previous file has to be released
+    instance._replaced_file = None
+    if instance._state.adding or instance._loaded_file is _NOT_LOADED or "file" not in instance.__dict__:
+        return
+    file = instance.file
+    if instance._loaded_file and (not file._committed or file.name != instance._loaded_file):
+        instance._replaced_file = instance._loaded_file
+
+
+@receiver(post_save, sender=Notes)
+@receiver(post_save, sender=QuestionPaper)
+def release_replaced_file(sender, instance, **kwargs):
+    name = getattr(instance, "_replaced_file", None)
+    if name:
+        instance._replaced_file = None
+        storage = instance.file.storage
+        transaction.on_commit(lambda: storage.delete(name))
+
+
+@receiver(post_init, sender=Notes)
+@receiver(post_init, sender=QuestionPaper)
+def remember_upload_file(sender, instance, **kwargs):
+    # Lets saves tell whether the file changed without reading the row back;
+    # a deferred file is only loaded (and so changed) by assigning it
+    if "file" in instance.__dict__:
+        instance._loaded_file = _file_name(instance.__dict__["file"])
+    else:
+        instance._loaded_file = _NOT_LOADED
+
+
+def _stored_usage(upload):
+    return upload.user_id, upload.file_size
+
+
+# What each row currently counts towards its user's usage
+for _model in (Notes, QuestionPaper):
+    remember_loaded_values(_model, "_stored_usage", ("file_size",), _stored_usage)
+
+
+@receiver(pre_save, sender=Notes)
+@receiver(pre_save, sender=QuestionPaper)
+def record_file_size(sender, instance, **kwargs):
+    if not instance._state.adding and instance._loaded_file is _NOT_LOADED and "file" not in instance.__dict__:
+        return
+    if instance._state.adding or _file_name(instance.file) != instance._loaded_file:
+        # Read before the file is committed, so an upload's size is known
+        # without asking the storage
+        instance.file_size = instance.file.size if instance.file else 0
+
+
+@receiver(post_save, sender=Notes)
+@receiver(post_save, sender=QuestionPaper)
+def add_upload_to_usage(sender, instance, created, **kwargs):
+    stored = None if created else instance._stored_usage
+    if not created and stored is None:
+        # Loaded with deferred fields; the old size is no longer known
+        recompute_usage(instance.user_id)
+    elif created:
+        apply_usage_delta(instance.user_id, instance.file_size, 1)
+    elif stored[0] != instance.user_id:
+        apply_usage_delta(stored[0], -stored[1], -1, create=False)
+        apply_usage_delta(instance.user_id, instance.file_size, 1)
+    else:
+        apply_usage_delta(instance.user_id, instance.file_size - stored[1], 0)
+    instance._stored_usage = _stored_usage(instance)
+
+
+@receiver(post_delete, sender=Notes)
+@receiver(post_delete, sender=QuestionPaper)
+def remove_upload_from_usage(sender, instance, **kwargs):
+    # Never create usage here: the user may be being deleted along with it.
+    # Subtract what the stored row counted, not unsaved in-memory edits.
+    stored = getattr(instance, "_stored_usage", None)
+    if stored is not None:
+        apply_usage_delta(stored[0], -stored[1], -1, create=False)
+    else:
+        recompute_usage(instance.user_id, create=False)
+
+
+@receiver(post_save, sender=Notes)
+@receiver(post_save, sender=QuestionPaper)
+def queue_text_extraction(sender, instance, created, **kwargs):
+    if not created and instance._loaded_file is _NOT_LOADED and "file" not in instance.__dict__:
+        return
+    name = _file_name(instance.file)
+    if created or name != instance._loaded_file:
+        schedule_extraction([instance])
+    instance._loaded_file = name
+
+
+@receiver(post_save, sender=Notes)
+@receiver(post_save, sender=QuestionPaper)
+def index_upload(sender, instance, **kwargs):
+    index_uploads([instance])
+
+
+@receiver(post_save, sender=NoteText)
+@receiver(post_save, sender=QuestionPaperText)
+def index_extracted_text(sender, instance, **kwargs):
+    upload = instance.note if sender is NoteText else instance.question_paper
+    index_uploads([upload])
+
+
+@receiver(post_delete, sender=Notes)
+@receiver(post_delete, sender=QuestionPaper)
+def unindex_upload(sender, instance, **kwargs):
+    unindex_uploads(sender, [instance.pk])
+
+
+# Listing versions for conditional GET of view_notes/get_question_paper
+post_save.connect(partial(bump_listing_version, "notes"), sender=Notes, weak=False)
+post_delete.connect(partial(bump_listing_version, "notes"), sender=Notes, weak=False)
+post_save.connect(partial(bump_listing_version, "question_papers"), sender=QuestionPaper, weak=False)
+post_delete.connect(partial(bump_listing_version, "question_papers"), sender=QuestionPaper, weak=False)
@@ -0,0 +1,105 @@
+"""Content-addressed storage for uploaded notes and question papers.
+
+Every stored file is recorded as a ``StoredBlob`` keyed by the SHA-256 of
+its content. Saving content that is already stored returns the existing
+file name and bumps the blob's reference count instead of writing another
+copy, and deleting a name only removes the file once no row refers to it.
+
+Uploads arriving through the request are hashed while they stream in by the
+handlers in ``uploadhandlers.py``; anything else (staged chunked uploads,
+files created in code) is hashed here by reading it once in chunks.
+"""
+
+import hashlib
+
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+
+def content_digest(content):
+    digest = getattr(content, "content_hash", None)
+    if digest:
+        return digest
+    hasher = hashlib.sha256()
+    for chunk in content.chunks():
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+class DeduplicatingStorage(FileSystemStorage):
+    """Saving is split into steps so ``bulk.py`` can write files in threads
+    while keeping every database write in the request thread: ``reuse``
+    and ``record_blob`` touch only the database, ``write_file`` only the
+    disk.
+    """
+
+    def _save(self, name, content):
+        digest = content_digest(content)
+        existing = self.reuse(digest)
+        if existing is not None:
+            return existing
+        return self.record_blob(digest, self.write_file(name, content), content.size)
+
+    def write_file(self, name, content):
+        """Write ``content`` under ``name`` (or a free variant) and return it."""
+        return super()._save(name, content)
+
+    def delete_file(self, name):
+        """Remove a file that ``record_blob`` has not recorded yet."""
+        super().delete(name)
+
+    def record_blob(self, digest, name, size):
+        """Record the file just written under ``name``; return the name to use."""
+        from .models import StoredBlob
+
+        try:
+            with transaction.atomic():
+                StoredBlob.objects.create(digest=digest, name=name, size=size)
+        except IntegrityError:
+            # The same content was stored concurrently; keep that copy.
+            existing = self.reuse(digest)
+            if existing is not None:
+                self.delete_file(name)
+                return existing
+            raise
+        return name
+
+    def reuse(self, digest):
+        """Take a reference to the stored copy of ``digest``; return its name or None."""
+        from .models import StoredBlob
+
+        blob = StoredBlob.objects.filter(digest=digest).first()
+        if blob is None:
+            return None
+        if not self.exists(blob.name):
+            # The file was removed behind our back; store the content again.
+            blob.delete()
+            return None
+        # Conditional, so a blob that delete() removed in the meantime is
+        # never revived; the content is then stored again under a new name.
+        referenced = StoredBlob.objects.filter(pk=blob.pk, ref_count__gt=0).update(
+            ref_count=F("ref_count") + 1
+        )
+        return blob.name if referenced else None
+
+    def delete(self, name):
+        from .models import StoredBlob
+
+        # Conditional updates rather than a locked read: select_for_update()
+        # is a no-op on SQLite.
+        with transaction.atomic():
+            if StoredBlob.objects.filter(name=name, ref_count__gt=1).update(ref_count=F("ref_count") - 1):
+                return
+            removed, _ = StoredBlob.objects.filter(name=name, ref_count__lte=1).delete()
+            if not removed and StoredBlob.objects.filter(name=name).exists():
+                # A concurrent save took a reference after the first update
+                return
+        super().delete(name)
+
+
+upload_storage = DeduplicatingStorage()
+
+
+def get_upload_storage():
+    return upload_storage
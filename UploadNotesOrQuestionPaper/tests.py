@@ -1,3 +1,788 @@
-from django.test import TestCase
+import io
+import json
+import os
+import shutil
+import tempfile
+import zipfile
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from studybudy.models import CustomUser
+from . import extraction, views
+from .downloads import parse_range
+from .models import ChunkedUpload, Notes, NoteText, QuestionPaper, StoredBlob, UploadUsage
+from .quota import recompute_usage
+from .storage import DeduplicatingStorage, upload_storage
+
+
+def docx(paragraphs):
+    body = ''.join(f'<w:p><w:r><w:t>{text}</w:t></w:r></w:p>' for text in paragraphs)
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        archive.writestr('[Content_Types].xml', '<Types/>')
+        archive.writestr(
+            'word/document.xml',
+            '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+            f'<w:body>{body}</w:body></w:document>',
+        )
+    return buffer.getvalue()
+
+
+def pdf(pages):
+    """A minimal PDF with one line of Helvetica text per page."""
+    objects = {
+        1: '<< /Type /Catalog /Pages 2 0 R >>',
+        2: f"<< /Type /Pages /Kids [{' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages)))}] /Count {len(pages)} >>",
+        3: '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    }
+    for i, text in enumerate(pages):
+        stream = f'BT /F1 12 Tf 72 720 Td ({text}) Tj ET'
+        objects[4 + 2 * i] = (
+            '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>'
+        )
+        objects[5 + 2 * i] = f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream'
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = out.tell()
+        out.write(f'{number} 0 obj\n{objects[number]}\nendobj\n'.encode())
+    xref = out.tell()
+    out.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode())
+    for number in sorted(objects):
+        out.write(f'{offsets[number]:010d} 00000 n \n'.encode())
+    out.write(f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode())
+    return out.getvalue()
+
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class UploadTestCase(TestCase):
+    """Logged-in API client, with uploads stored in a temporary MEDIA_ROOT."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root, ignore_errors=True)
+        media_settings = override_settings(
+            MEDIA_ROOT=cls.media_root,
+            CHUNKED_UPLOAD_ROOT=os.path.join(cls.media_root, 'staging'),
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        )
+        media_settings.enable()
+        cls.addClassCleanup(media_settings.disable)
+        super().setUpClass()
+
+    def setUp(self):
+        # Listing versions and throttles live in the caches
+        for cache in caches.all():
+            cache.clear()
+        self.user = CustomUser.objects.create_user(email='a@example.com', password='pw12345!', username='alice')
+        self.client = self.client_for(self.user)
+        # Extract text in the test's thread, on the test's connection
+        for patch in (
+            mock.patch.object(extraction, '_executor', InlineExecutor()),
+            mock.patch.object(extraction, 'connection'),
+        ):
+            patch.start()
+            self.addCleanup(patch.stop)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+    def create_note(self, title='Lecture notes', sem=1, content=None, **fields):
+        content = content if content is not None else title.encode()
+        return Notes.objects.create(
+            user=self.user, sem=sem, title=title, file=SimpleUploadedFile('notes.pdf', content), **fields
+        )
+
+
+class KeysetPaginationTests(UploadTestCase):
+    def list_ids(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [row['id'] for row in response.json()['results']]
+            url = response.json()['next']
+        return ids
+
+    def test_pages_cover_every_row_newest_first(self):
+        notes = [self.create_note(f'Lecture {i}') for i in range(7)]
+        self.assertEqual(self.list_ids('/api/view_notes/?page_size=3'), [note.pk for note in reversed(notes)])
+
+    def test_ties_on_created_at_are_broken_by_id(self):
+        notes = [self.create_note(f'Lecture {i}') for i in range(5)]
+        Notes.objects.update(created_at=timezone.now())
+        self.assertEqual(self.list_ids('/api/view_notes/?page_size=2'), [note.pk for note in reversed(notes)])
+
+    def test_cursor_is_stable_across_inserts(self):
+        notes = [self.create_note(f'Lecture {i}') for i in range(6)]
+        first = self.client.get('/api/view_notes/?page_size=3').json()
+        self.create_note('Newer lecture')
+        rest = self.list_ids(first['next'])
+        self.assertEqual([row['id'] for row in first['results']] + rest, [note.pk for note in reversed(notes)])
+
+    def test_filters(self):
+        self.create_note('Lecture one', sem=1)
+        self.create_note('Lecture two', sem=2)
+        response = self.client.get('/api/view_notes/?sem=2')
+        self.assertEqual([row['title'] for row in response.json()['results']], ['Lecture two'])
+        self.assertEqual(self.client.get('/api/view_notes/?sem=x').status_code, 400)
+        self.assertEqual(self.client.get('/api/get_question_paper/').json(), {'next': None, 'results': []})
+
+    def test_invalid_cursor(self):
+        self.assertEqual(self.client.get('/api/view_notes/?cursor=garbage').status_code, 404)
+
+
+class ExportTests(UploadTestCase):
+    def read_lines(self, response):
+        self.assertTrue(response.streaming)
+        return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+    def test_streams_one_json_object_per_line_oldest_first(self):
+        for i in range(5):
+            self.create_note(f'Lecture {i}', sem=i % 2 + 1)
+        response = self.client.get('/api/export_notes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('notes.jsonl', response['Content-Disposition'])
+        self.assertEqual([row['title'] for row in self.read_lines(response)], [f'Lecture {i}' for i in range(5)])
+
+    def test_filters_and_empty_export(self):
+        self.create_note('Lecture one', sem=1)
+        self.create_note('Lecture two', sem=2)
+        rows = self.read_lines(self.client.get('/api/export_notes/?sem=2'))
+        self.assertEqual([row['title'] for row in rows], ['Lecture two'])
+        self.assertEqual(self.read_lines(self.client.get('/api/export_question_papers/')), [])
+
+
+class ChunkedUploadTests(UploadTestCase):
+    def setUp(self):
+        super().setUp()
+        # Staging files of rejected chunks stay until the upload is abandoned
+        shutil.rmtree(os.path.join(self.media_root, 'staging'), ignore_errors=True)
+
+    def start(self, data=b'', **fields):
+        fields = {'kind': 'notes', 'sem': 3, 'title': 'Big notes', 'filename': 'big.pdf', 'total_size': len(data), **fields}
+        response = self.client.post('/api/chunked_upload/', fields, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return f"/api/chunked_upload/{response.json()['id']}/"
+
+    def send(self, url, offset, chunk):
+        return self.client.post(url, {'offset': offset, 'chunk': SimpleUploadedFile('chunk', chunk)}, format='multipart')
+
+    def test_upload_in_chunks_and_resume(self):
+        data = os.urandom(1000)
+        url = self.start(data)
+        self.assertEqual(self.send(url, 0, data[:400]).json()['offset'], 400)
+        # A retried chunk is refused with the offset to resume from
+        response = self.send(url, 0, data[:400])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 400)
+        self.assertEqual(self.client.post(url + 'finalize/').status_code, 400)
+        self.assertEqual(self.client.get(url).json()['offset'], 400)
+        self.assertEqual(self.send(url, 400, data[400:]).json()['offset'], 1000)
+
+        response = self.client.post(url + 'finalize/')
+        self.assertEqual(response.status_code, 201, response.content)
+        note = Notes.objects.get()
+        self.assertEqual((note.title, note.sem, note.file.read()), ('Big notes', 3, data))
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'staging')), [])
+
+    def test_file_io_happens_outside_transactions(self):
+        data = os.urandom(1000)
+        url = self.start(data)
+        depth = len(connection.atomic_blocks)
+        depths = []
+
+        def record(real):
+            def wrapper(*args, **kwargs):
+                depths.append(len(connection.atomic_blocks))
+                return real(*args, **kwargs)
+            return wrapper
+
+        with mock.patch('UploadNotesOrQuestionPaper.views.write_chunk', record(views.write_chunk)), \
+                mock.patch.object(DeduplicatingStorage, 'save', record(DeduplicatingStorage.save)):
+            self.assertEqual(self.send(url, 0, data).status_code, 200)
+            self.assertEqual(self.client.post(url + 'finalize/').status_code, 201)
+        self.assertEqual(depths, [depth, depth])
+
+    def test_upload_removed_during_finalize_releases_file(self):
+        data = os.urandom(1000)
+        url = self.start(data)
+        self.send(url, 0, data)
+        notes_dir = os.path.join(self.media_root, 'notes')
+        stored = set(os.listdir(notes_dir)) if os.path.isdir(notes_dir) else set()
+        save = DeduplicatingStorage.save
+
+        def save_then_abandon(storage, *args, **kwargs):
+            name = save(storage, *args, **kwargs)
+            ChunkedUpload.objects.all().delete()
+            return name
+
+        with mock.patch.object(DeduplicatingStorage, 'save', save_then_abandon):
+            self.assertEqual(self.client.post(url + 'finalize/').status_code, 404)
+        self.assertFalse(Notes.objects.exists())
+        self.assertFalse(StoredBlob.objects.exists())
+        self.assertEqual(set(os.listdir(notes_dir)), stored)
+
+    @override_settings(UPLOAD_QUOTA_BYTES=1500)
+    def test_quota_is_checked_again_when_finalizing(self):
+        data = os.urandom(1000)
+        url = self.start(data)
+        self.send(url, 0, data)
+        save = DeduplicatingStorage.save
+
+        def save_then_use_quota(storage, *args, **kwargs):
+            name = save(storage, *args, **kwargs)
+            UploadUsage.objects.update_or_create(user_id=self.user.id, defaults={'bytes_used': 1000, 'file_count': 1})
+            return name
+
+        with mock.patch.object(DeduplicatingStorage, 'save', save_then_use_quota):
+            self.assertEqual(self.client.post(url + 'finalize/').status_code, 413)
+        self.assertFalse(Notes.objects.exists())
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertFalse(StoredBlob.objects.exists())
+
+    def test_chunk_past_declared_size(self):
+        url = self.start(b'12345')
+        self.assertEqual(self.send(url, 0, b'123456').status_code, 400)
+
+    def test_invalid_upload_fails_before_any_bytes(self):
+        response = self.client.post(
+            '/api/chunked_upload/',
+            {'kind': 'question_paper', 'sem': 3, 'title': 'Big', 'filename': 'big.doc', 'total_size': 10},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(set(response.json()), {'title', 'filename'})
+
+    def test_uploads_are_private_and_can_be_abandoned(self):
+        url = self.start(b'12345')
+        self.send(url, 0, b'12')
+        other = CustomUser.objects.create_user(email='b@example.com', password='pw12345!', username='bob')
+        self.assertEqual(self.client_for(other).get(url).status_code, 404)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertEqual(os.listdir(os.path.join(self.media_root, 'staging')), [])
+
+
+class DeduplicationTests(UploadTestCase):
+    def upload(self, path, title, content, name='upload.pdf'):
+        response = self.client.post(path, {'sem': 1, 'title': title, 'file': SimpleUploadedFile(name, content)})
+        self.assertEqual(response.status_code, 201, response.content)
+        return response
+
+    def test_same_content_is_stored_once(self):
+        content = os.urandom(5000)
+        self.upload('/api/upload_notes/', 'Notes one', content)
+        self.upload('/api/upload_notes/', 'Notes two', content, name='other.pdf')
+        self.upload('/api/upload_question_paper/', 'Paper one', content)
+        first, second = Notes.objects.order_by('id')
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(QuestionPaper.objects.get().file.name, first.file.name)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 3)
+
+    def test_file_is_removed_with_its_last_reference(self):
+        first = self.create_note('Notes one', content=b'same')
+        second = self.create_note('Notes two', content=b'same')
+        path = first.file.path
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+        self.assertFalse(StoredBlob.objects.exists())
+
+    def test_replacing_a_file_releases_the_old_one(self):
+        note = self.create_note('Notes one', content=b'old')
+        old = note.file.name
+        note = Notes.objects.get(pk=note.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            note.file = SimpleUploadedFile('new.txt', b'new')
+            note.save()
+        self.assertFalse(StoredBlob.objects.filter(name=old).exists())
+        self.assertFalse(upload_storage.exists(old))
+        # Saving the same content again, or other fields, keeps the reference
+        new = note.file.name
+        with self.captureOnCommitCallbacks(execute=True):
+            note.file = SimpleUploadedFile('again.pdf', b'new')
+            note.save()
+            note.title = 'Renamed notes'
+            note.save()
+        self.assertEqual(note.file.name, new)
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+        self.assertTrue(upload_storage.exists(new))
+
+    def test_removed_blobs_are_not_revived(self):
+        name = upload_storage.save('notes/x.pdf', ContentFile(b'xyz'))
+        digest = StoredBlob.objects.get(name=name).digest
+        exists = upload_storage.exists
+
+        def delete_concurrently(name):
+            # Runs between the lookup and taking the reference
+            StoredBlob.objects.filter(name=name).delete()
+            return exists(name)
+
+        with mock.patch.object(upload_storage, 'exists', delete_concurrently):
+            self.assertIsNone(upload_storage.reuse(digest))
+        self.assertFalse(StoredBlob.objects.exists())
+
+    def test_missing_file_is_stored_again(self):
+        name = upload_storage.save('notes/x.pdf', ContentFile(b'xyz'))
+        os.remove(upload_storage.path(name))
+        name = upload_storage.save('notes/y.pdf', ContentFile(b'xyz'))
+        self.assertTrue(upload_storage.exists(name))
+        self.assertEqual(StoredBlob.objects.get().name, name)
+
+
+class AsyncListingTests(UploadTestCase):
+    def test_matches_the_sync_listing(self):
+        for i in range(4):
+            self.create_note(f'Lecture {i}')
+        for query in ('?page_size=3', '?sem=1'):
+            sync = self.client.get('/api/view_notes/' + query).json()
+            page = self.client.get('/api/async/view_notes/' + query).json()
+            self.assertEqual(page['results'], sync['results'])
+            self.assertEqual(page['next'], sync['next'] and sync['next'].replace('/api/', '/api/async/'))
+        self.assertEqual(self.client.get('/api/async/get_question_paper/').json(), {'next': None, 'results': []})
+
+    def test_errors(self):
+        self.assertEqual(self.client.get('/api/async/view_notes/?sem=x').status_code, 400)
+        self.assertEqual(self.client.get('/api/async/view_notes/?cursor=garbage').status_code, 404)
+        self.assertEqual(self.client.post('/api/async/view_notes/').status_code, 405)
+        self.assertEqual(APIClient().get('/api/async/view_notes/').status_code, 401)
+
+
+@override_settings(TEXT_EXTRACTION_DB_RETRIES=2, TEXT_EXTRACTION_DB_RETRY_DELAY=0)
+class TextExtractionTests(UploadTestCase):
+    def upload(self, name, content, title='Lecture notes'):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/upload_notes/', {'title': title, 'sem': 1, 'file': SimpleUploadedFile(name, content)})
+        self.assertEqual(response.status_code, 201, response.content)
+        return NoteText.objects.get(note_id=response.json()['id'])
+
+    def test_pdf(self):
+        text = self.upload('lecture.pdf', pdf(['Hello page one.', 'Second page here.']))
+        self.assertEqual((text.status, text.page_count), ('done', 2))
+        self.assertEqual(text.text, 'Hello page one.\nSecond page here.')
+        self.assertEqual(text.char_count, len(text.text))
+
+    def test_docx(self):
+        text = self.upload('lecture.docx', docx(['Intro', 'Dogs are pets.']))
+        self.assertEqual((text.status, text.page_count, text.text), ('done', None, 'Intro\n\nDogs are pets.'))
+
+    def test_unsupported_and_broken_files(self):
+        self.assertEqual(self.upload('lecture.doc', b'binary').status, 'unsupported')
+        with self.assertLogs(level='WARNING'):
+            broken = self.upload('broken.pdf', b'not a pdf', title='Broken notes')
+        self.assertEqual((broken.status, broken.content), ('failed', b''))
+        self.assertTrue(broken.error)
+
+    def test_only_new_files_are_extracted(self):
+        text = self.upload('lecture.doc', b'binary')
+        NoteText.objects.filter(pk=text.pk).update(status='done')
+        with self.captureOnCommitCallbacks(execute=True):
+            note = Notes.objects.get(pk=text.pk)
+            note.title = 'Renamed notes'
+            note.save()
+        self.assertEqual(NoteText.objects.get(pk=text.pk).status, 'done')
+
+    def test_text_is_stored_without_a_transaction(self):
+        text = self.upload('lecture.doc', b'binary')
+        values = extraction.read_upload_text(text.note)
+        values['error'] = 'changed'
+        with CaptureQueriesContext(connection) as queries:
+            extraction.store_upload_text(text.note, values)
+        # update_or_create would open a savepoint and read the row first
+        self.assertFalse([query for query in queries if 'SAVEPOINT' in query['sql']])
+        self.assertTrue(queries[0]['sql'].startswith('UPDATE'))
+        self.assertEqual(NoteText.objects.get(pk=text.pk).error, 'changed')
+
+    def test_locked_database_is_retried(self):
+        store = extraction.store_upload_text
+        attempts = []
+
+        def locked_twice(*args):
+            attempts.append(args)
+            if len(attempts) < 3:
+                raise OperationalError('database is locked')
+            return store(*args)
+
+        with mock.patch.object(extraction, 'store_upload_text', locked_twice):
+            text = self.upload('lecture.docx', docx(['Intro']))
+        self.assertEqual((len(attempts), text.status), (3, 'done'))
+
+    def test_row_is_failed_when_the_database_stays_locked(self):
+        locked = mock.patch.object(extraction, 'store_upload_text', side_effect=OperationalError('database is locked'))
+        with locked, self.assertLogs(extraction.logger, 'ERROR'):
+            text = self.upload('lecture.docx', docx(['Intro']))
+        self.assertEqual((text.status, text.error), ('failed', 'database is locked'))
+
+    def test_backfill_command(self):
+        self.upload('lecture.docx', docx(['Intro']))
+        self.upload('lecture.doc', b'binary', title='Old notes')
+        NoteText.objects.all().delete()
+        out, err = io.StringIO(), io.StringIO()
+        call_command('extract_upload_text', stdout=out, stderr=err)
+        self.assertIn('1 upload(s)', out.getvalue())
+        self.assertIn('cannot be extracted', err.getvalue())
+        self.assertEqual(NoteText.objects.count(), 2)
+
+
+class SearchTests(UploadTestCase):
+    def setUp(self):
+        super().setUp()
+        self.thermo = self.upload('/api/upload_notes/', 'Thermodynamics basics', 3, 'a.docx', docx(['Entropy always increases.', 'Heat engines.']))
+        self.organic = self.upload('/api/upload_notes/', 'Organic chemistry', 2, 'b.docx', docx(['Benzene rings and entropy.']))
+        self.exam = self.upload('/api/upload_question_paper/', 'Physics final exam', 3, 'c.pdf', pdf(['Explain entropy of gases.']))
+
+    def upload(self, path, title, sem, name, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(path, {'title': title, 'sem': sem, 'file': SimpleUploadedFile(name, content)})
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()['id']
+
+    def search(self, **params):
+        response = self.client.get('/api/search/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return [(row['kind'], row['id']) for row in response.json()['results']]
+
+    def test_matches_titles_and_extracted_text(self):
+        self.assertEqual(len(self.search(q='entropy')), 3)
+        # Porter stemming, and every word must match
+        self.assertEqual(self.search(q='thermodynamic entropy'), [('notes', self.thermo)])
+        # Words may match in either the title or the text
+        self.assertEqual(self.search(q='chemistry benzene'), [('notes', self.organic)])
+
+    def test_title_matches_rank_first(self):
+        heat = self.upload('/api/upload_notes/', 'Heat transfer', 3, 'd.docx', docx(['Conduction.']))
+        self.assertEqual(self.search(q='heat'), [('notes', heat), ('notes', self.thermo)])
+
+    def test_filters(self):
+        self.assertEqual(set(self.search(q='entropy', sem=3)), {('notes', self.thermo), ('question_paper', self.exam)})
+        self.assertEqual(self.search(q='entropy', kind='question_paper'), [('question_paper', self.exam)])
+
+    def test_paging(self):
+        first = self.client.get('/api/search/', {'q': 'entropy', 'page_size': 2}).json()
+        self.assertEqual(len(first['results']), 2)
+        second = self.client.get(first['next']).json()
+        self.assertEqual((len(second['results']), second['next']), (1, None))
+        ids = {(row['kind'], row['id']) for row in first['results'] + second['results']}
+        self.assertEqual(len(ids), 3)
+
+    def test_query_syntax_is_searched_literally(self):
+        self.assertEqual(self.search(q='entropy" OR title:*'), [])
+        self.assertEqual(self.search(q='!!!'), [])
+        self.assertEqual(self.client.get('/api/search/', {'q': ''}).status_code, 400)
+        self.assertEqual(APIClient().get('/api/search/', {'q': 'entropy'}).status_code, 401)
+
+    def test_index_follows_edits_and_deletes(self):
+        note = Notes.objects.get(pk=self.organic)
+        note.title = 'Polymer science'
+        note.save()
+        self.assertEqual(self.search(q='chemistry'), [])
+        self.assertEqual(self.search(q='polymer'), [('notes', self.organic)])
+        Notes.objects.get(pk=self.thermo).delete()
+        self.assertNotIn(('notes', self.thermo), self.search(q='entropy'))
+
+    def test_rebuild_command(self):
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM upload_search')
+        self.assertEqual(self.search(q='entropy'), [])
+        out = io.StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Indexed 3 upload(s).', out.getvalue())
+        self.assertEqual(len(self.search(q='entropy')), 3)
+
+
+class BulkUploadTests(UploadTestCase):
+    def setUp(self):
+        super().setUp()
+        # The media root outlives each test's rolled back rows
+        self.notes_dir = os.path.join(self.media_root, 'notes')
+        shutil.rmtree(self.notes_dir, ignore_errors=True)
+
+    def post(self, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/bulk_upload/', data)
+
+    def notes_on_disk(self):
+        return set(os.listdir(self.notes_dir))
+
+    def test_each_file_succeeds_or_fails_alone(self):
+        files = [
+            SimpleUploadedFile('a.docx', docx(['Entropy rises.'])),
+            SimpleUploadedFile('b.txt', b'x'),
+            SimpleUploadedFile('c.pdf', pdf(['Gas laws.'])),
+            SimpleUploadedFile('d.docx', docx(['Entropy rises.'])),
+        ]
+        response = self.post({'file': files, 'title': ['Lecture one', 'Lecture two', 'Shrt', 'Lecture four'], 'sem': ['3', '3', '3', '2']})
+        self.assertEqual(response.status_code, 207, response.content)
+        self.assertEqual([result['status'] for result in response.json()['results']], [201, 400, 400, 201])
+        self.assertEqual(sorted(Notes.objects.values_list('title', 'sem')), [('Lecture four', 2), ('Lecture one', 3)])
+        self.assertEqual(NoteText.objects.filter(status='done').count(), 2)
+        # The two identical files share one stored copy
+        self.assertEqual(StoredBlob.objects.get().ref_count, 2)
+        self.assertEqual(len(self.notes_on_disk()), 1)
+
+    def test_kinds_and_batch_errors(self):
+        response = self.post({'file': [SimpleUploadedFile('q.pdf', pdf(['Q.']))], 'title': ['Paper one'], 'kind': 'question_paper'})
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(QuestionPaper.objects.get().title, 'Paper one')
+        for data in (
+            {'file': [SimpleUploadedFile('q.pdf', b'1')], 'title': ['Paper one', 'Paper two']},
+            {'file': [SimpleUploadedFile('q.doc', b'1')], 'title': ['Bad']},
+            {'title': ['Paper one']},
+        ):
+            self.assertEqual(self.post(data).status_code, 400)
+        self.assertEqual(self.client.post('/api/bulk_upload/', {'title': ['a']}, format='json').status_code, 400)
+        self.assertEqual(Notes.objects.count(), 0)
+
+    @override_settings(BULK_UPLOAD_WORKERS=4)
+    def test_duplicates_within_and_across_batches(self):
+        self.post({'file': [SimpleUploadedFile('old.docx', docx(['Old.']))], 'title': ['Lecture 1']})
+        files = [SimpleUploadedFile(f'n{i}.docx', docx([f'Unique {i}.'])) for i in range(8)]
+        files += [SimpleUploadedFile('dup.docx', docx(['Unique 0.'])), SimpleUploadedFile('old.docx', docx(['Old.']))]
+        response = self.post({'file': files, 'title': [f'Lecture {i}' for i in range(2, 12)]})
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(Notes.objects.count(), 11)
+        self.assertEqual(StoredBlob.objects.count(), 9)
+        self.assertEqual(len(self.notes_on_disk()), 9)
+        self.assertEqual(sorted(StoredBlob.objects.values_list('ref_count', flat=True)), [1] * 7 + [2, 2])
+
+    @override_settings(BULK_UPLOAD_WORKERS=4)
+    def test_failed_write_leaves_no_files_or_references(self):
+        self.post({'file': [SimpleUploadedFile('old.docx', docx(['Old.']))], 'title': ['Lecture 1']})
+        before = self.notes_on_disk()
+        write_file = DeduplicatingStorage.write_file
+
+        def disk_full(storage, name, content):
+            if 'bad' in name:
+                raise OSError('disk full')
+            return write_file(storage, name, content)
+
+        files = [
+            SimpleUploadedFile('old.docx', docx(['Old.'])),
+            SimpleUploadedFile('n1.docx', docx(['N1.'])),
+            SimpleUploadedFile('bad.docx', docx(['Bad.'])),
+        ]
+        with mock.patch.object(DeduplicatingStorage, 'write_file', disk_full), self.assertRaises(OSError):
+            self.post({'file': files, 'title': ['Lecture 2', 'Lecture 3', 'Lecture 4']})
+        self.assertEqual(StoredBlob.objects.get().ref_count, 1)
+        self.assertEqual(Notes.objects.count(), 1)
+        self.assertEqual(self.notes_on_disk(), before)
+
+
+class ConditionalListingTests(UploadTestCase):
+    def get(self, path='/api/view_notes/', **headers):
+        return self.client.get(path, headers=headers)
+
+    def test_unchanged_listing_is_not_modified(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        # Nothing has been uploaded yet, so there is no change time
+        self.assertNotIn('Last-Modified', response)
+        # One read of the listing's version, no rows fetched
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get(If_None_Match=etag).status_code, 304)
+        self.create_note()
+        response = self.get(If_None_Match=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.get(If_Modified_Since=response['Last-Modified']).status_code, 304)
+
+    def test_every_change_bumps_the_version(self):
+        note = self.create_note()
+        etag = self.get()['ETag']
+        note.title = 'Renamed notes'
+        note.save()
+        self.assertEqual(self.get(If_None_Match=etag).status_code, 200)
+        etag = self.get()['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post('/api/bulk_upload/', {'title': ['Lecture 2'], 'file': [SimpleUploadedFile('b.docx', docx(['y']))]})
+        self.assertEqual(self.get(If_None_Match=etag).status_code, 200)
+        etag = self.get()['ETag']
+        note.delete()
+        self.assertEqual(self.get(If_None_Match=etag).status_code, 200)
+
+    def test_listings_are_versioned_separately(self):
+        etag = self.get('/api/get_question_paper/')['ETag']
+        self.create_note()
+        self.assertEqual(self.get('/api/get_question_paper/', If_None_Match=etag).status_code, 304)
+
+    def test_authentication_comes_first(self):
+        etag = self.get()['ETag']
+        self.assertEqual(APIClient().get('/api/view_notes/', headers={'If-None-Match': etag}).status_code, 401)
+
+
+class DownloadTests(UploadTestCase):
+    BODY = b'%PDF-' + bytes(range(256)) * 40
+
+    def setUp(self):
+        super().setUp()
+        self.note = self.create_note(content=self.BODY)
+        self.url = f'/api/download/notes/{self.note.pk}/'
+
+    def get(self, url=None, **headers):
+        response = self.client.get(url or self.url, headers=headers)
+        self.addCleanup(response.close)
+        return response
+
+    def content(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_whole_file(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.content(response), self.BODY)
+        self.assertEqual((response['Accept-Ranges'], response['Content-Length']), ('bytes', str(len(self.BODY))))
+        self.assertIn('Last-Modified', response)
+
+    def test_ranges(self):
+        size = len(self.BODY)
+        response = self.get(Range='bytes=5-9')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(self.content(response), self.BODY[5:10])
+        self.assertEqual((response['Content-Range'], response['Content-Length']), (f'bytes 5-9/{size}', '5'))
+        self.assertEqual(self.content(self.get(Range='bytes=-4')), self.BODY[-4:])
+        self.assertEqual(self.content(self.get(Range='bytes=10000-')), self.BODY[10000:])
+        response = self.get(Range='bytes=99999-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, f'bytes */{size}'))
+        # Several ranges are answered with the whole file
+        self.assertEqual(self.get(Range='bytes=0-1,4-5').status_code, 200)
+
+    def test_if_range(self):
+        last_modified = self.get()['Last-Modified']
+        self.assertEqual(self.get(Range='bytes=5-9', If_Range=last_modified).status_code, 206)
+        self.assertEqual(self.get(Range='bytes=5-9', If_Range=http_date(0)).status_code, 200)
+        self.assertEqual(self.get(Range='bytes=5-9', If_Range='"etag"').status_code, 200)
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-0', 10), (0, 0))
+        self.assertEqual(parse_range('bytes=-20', 10), (0, 9))
+        self.assertEqual(parse_range('bytes=3-100', 10), (3, 9))
+        self.assertEqual(parse_range('bytes=-0', 10), 'unsatisfiable')
+        for header in (None, 'bytes=5-3', 'bytes=-', 'items=0-1'):
+            self.assertIsNone(parse_range(header, 10))
+
+    def test_front_proxy_backends(self):
+        with override_settings(MEDIA_SENDFILE_BACKEND='x-accel-redirect'):
+            response = self.get()
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.note.file.name}')
+        with override_settings(MEDIA_SENDFILE_BACKEND='x-sendfile'):
+            response = self.get()
+        self.assertEqual(response['X-Sendfile'], upload_storage.path(self.note.file.name))
+
+    def test_missing_uploads_and_unknown_kinds(self):
+        self.assertEqual(self.get('/api/download/notes/999/').status_code, 404)
+        self.assertEqual(self.get(f'/api/download/question_paper/{self.note.pk}/').status_code, 404)
+        self.assertEqual(self.get(f'/api/download/bogus/{self.note.pk}/').status_code, 404)
+        self.assertEqual(APIClient().get(self.url).status_code, 401)
+
+    def test_serializers_link_to_the_download_view(self):
+        self.assertEqual(self.client.get('/api/view_notes/').json()['results'][0]['file'], self.url)
+        response = self.client.post('/api/upload_question_paper/', {'sem': 1, 'title': 'Paper one', 'file': SimpleUploadedFile('p.pdf', b'paper')})
+        paper = QuestionPaper.objects.get()
+        self.assertEqual(response.json()['file'], f'/api/download/question_paper/{paper.pk}/')
+        self.assertEqual(self.content(self.get(response.json()['file'])), b'paper')
+
+
+@override_settings(UPLOAD_QUOTA_BYTES=10000)
+class UploadQuotaTests(UploadTestCase):
+    def post(self, path, data):
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(path, data)
+
+    def upload(self, title, size):
+        return self.post('/api/upload_notes/', {'sem': 1, 'title': title, 'file': SimpleUploadedFile(f'{size}.doc', os.urandom(size))})
+
+    def usage(self):
+        return self.client.get('/api/upload_usage/').json()
+
+    def assertUsage(self, bytes_used, file_count):
+        self.assertEqual(self.usage(), {'bytes_used': bytes_used, 'file_count': file_count, 'quota': 10000})
+        recompute_usage(self.user.pk)
+        self.assertEqual(self.usage()['bytes_used'], bytes_used)
+
+    def test_usage_follows_uploads(self):
+        response = self.upload('Lecture one', 3000)
+        self.assertEqual((response.status_code, response.json()['file_size']), (201, 3000))
+        paper = pdf(['Paper one'])
+        response = self.post('/api/upload_question_paper/', {'sem': 1, 'title': 'Paper one', 'file': SimpleUploadedFile('p.pdf', paper)})
+        self.assertEqual(response.status_code, 201)
+        self.assertUsage(3000 + len(paper), 2)
+        note = Notes.objects.get()
+        note.title = 'Renamed notes'
+        note.save()
+        self.assertUsage(3000 + len(paper), 2)
+        note.file = SimpleUploadedFile('new.doc', b'x' * 500)
+        note.save()
+        self.assertUsage(500 + len(paper), 2)
+        QuestionPaper.objects.get().delete()
+        self.assertUsage(500, 1)
+
+    def test_uploads_over_quota_are_refused(self):
+        self.upload('Lecture one', 6000)
+        response = self.upload('Lecture two', 5000)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(response.json()['bytes_used'], 6000)
+        response = self.client.post(
+            '/api/chunked_upload/',
+            {'kind': 'notes', 'sem': 1, 'title': 'Lecture big', 'filename': 'big.doc', 'total_size': 5000},
+            format='json',
+        )
+        self.assertEqual(response.status_code, 413)
+        # A bulk upload is refused whole, even if some files would fit
+        files = [SimpleUploadedFile('a.doc', os.urandom(3000)), SimpleUploadedFile('b.doc', os.urandom(3000))]
+        self.assertEqual(self.post('/api/bulk_upload/', {'file': files, 'title': ['Lecture a', 'Lecture b']}).status_code, 413)
+        self.assertEqual(Notes.objects.count(), 1)
+        self.assertEqual(self.upload('Lecture two', 4000).status_code, 201)
+
+    def test_bulk_uploads_count_every_file(self):
+        files = [SimpleUploadedFile('a.doc', os.urandom(3000)), SimpleUploadedFile('b.doc', os.urandom(2000))]
+        self.assertEqual(self.post('/api/bulk_upload/', {'file': files, 'title': ['Lecture a', 'Lecture b']}).status_code, 201)
+        self.assertUsage(5000, 2)
+
+    def test_delete_subtracts_the_stored_size(self):
+        self.upload('Lecture one', 3000)
+        self.upload('Lecture two', 2000)
+        note = Notes.objects.get(title='Lecture one')
+        note.file_size = 1
+        note.delete()
+        self.assertUsage(2000, 1)
+        Notes.objects.defer('file_size').get().delete()
+        self.assertUsage(0, 0)
+
+    @override_settings(UPLOAD_QUOTA_BYTES=None)
+    def test_no_quota(self):
+        self.assertEqual(self.upload('Lecture one', 20000).status_code, 201)
+        self.assertIsNone(self.usage()['quota'])
+
+    def test_usage_is_removed_with_the_user(self):
+        self.upload('Lecture one', 100)
+        self.user.delete()
+        self.assertFalse(UploadUsage.objects.exists())
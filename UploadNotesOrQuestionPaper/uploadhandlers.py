@@ -0,0 +1,42 @@
+"""Upload handlers that hash file content while it is received.
+
+They replace Django's default handlers in ``FILE_UPLOAD_HANDLERS`` and set
+``content_hash`` on the finished upload, so ``DeduplicatingStorage`` never
+has to read the file a second time.
+"""
+
+import hashlib
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+
+class ContentHashMixin:
+    def new_file(self, *args, **kwargs):
+        # Set up first: the memory handler signals that it took the file by
+        # raising StopFutureHandlers from new_file().
+        self.hasher = hashlib.sha256()
+        super().new_file(*args, **kwargs)
+
+    def receive_data_chunk(self, raw_data, start):
+        remaining = super().receive_data_chunk(raw_data, start)
+        # Only the handler that consumes the chunk (returns None) hashes it.
+        if remaining is None:
+            self.hasher.update(raw_data)
+        return remaining
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)
+        if uploaded is not None:
+            uploaded.content_hash = self.hasher.hexdigest()
+        return uploaded
+
+
+class HashingMemoryFileUploadHandler(ContentHashMixin, MemoryFileUploadHandler):
+    pass
+
+
+class HashingTemporaryFileUploadHandler(ContentHashMixin, TemporaryFileUploadHandler):
+    pass
@@ -0,0 +1,77 @@
+"""Staging helpers for chunked uploads.
+
+Each ``ChunkedUpload`` owns one staging file under
+``settings.CHUNKED_UPLOAD_ROOT``. Chunks are written straight from the
+request's upload handler into that file, and on finalize the file is handed
+to storage as a ``StagedUpload`` so ``FileSystemStorage`` can move it into
+``MEDIA_ROOT`` instead of copying it through Python.
+
+Writers of one staging file are serialized by a lock on the file itself,
+not by a database transaction, so no database lock is held while chunk
+bytes are written.
+"""
+
+import os
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files import File, locks
+
+
+def staging_path(upload):
+    return os.path.join(settings.CHUNKED_UPLOAD_ROOT, f"{upload.pk}.part")
+
+
+@contextmanager
+def open_staging(upload):
+    """Open ``upload``'s staging file for writing, holding an exclusive lock.
+
+    A retried chunk racing its original waits here instead of interleaving
+    its bytes with it.
+    """
+    path = staging_path(upload)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Neither truncate an existing file nor force writes to its end
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+    with open(fd, "r+b") as staged:
+        locks.lock(staged, locks.LOCK_EX)
+        try:
+            yield staged
+        finally:
+            locks.unlock(staged)
+
+
+def write_chunk(staged, offset, chunk):
+    """Write ``chunk`` into the open staging file at ``offset``.
+
+    Anything past the offset is left over from a chunk that was written but
+    never committed, so it is overwritten and the file is truncated to the
+    new end.
+    """
+    staged.seek(offset)
+    for data in chunk.chunks():
+        staged.write(data)
+    staged.truncate()
+
+
+def discard(upload):
+    try:
+        os.remove(staging_path(upload))
+    except FileNotFoundError:
+        pass
+
+
+class StagedUpload(File):
+    """A fully assembled staging file, opened for handing to storage.
+
+    Exposes ``temporary_file_path()`` like Django's ``TemporaryUploadedFile``
+    so file system storage moves the file into place rather than re-reading
+    and re-writing every byte.
+    """
+
+    def __init__(self, upload):
+        self.path = staging_path(upload)
+        super().__init__(open(self.path, "rb"), name=upload.filename)
+
+    def temporary_file_path(self):
+        return self.path
@@ -1,45 +1,358 @@
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 from rest_framework import status
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework.utils.urls import replace_query_param
 from rest_framework.response import Response
-from rest_framework.decorators import api_view,permission_classes
-from .models import Notes,QuestionPaper
-from .serializers import NotesSerializer,QuestionPaperSerializer
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from studybudy.authentication import StatelessJWTAuthentication
+from studybudy.conditional import listing_condition
+from .models import ChunkedUpload, Notes, QuestionPaper
+from .serializers import (
+    ChunkedUploadSerializer,
+    NotesSerializer,
+    QuestionPaperSerializer,
+    BulkUploadSerializer,
+    UploadSearchSerializer,
+    upload_serializer_for,
+)
+from .bulk import bulk_create_uploads
+from .downloads import serve_file
+from .quota import get_usage, quota_exceeded
+from .search import KINDS, search_uploads
+from .uploads import StagedUpload, discard, open_staging, write_chunk
+from .pagination import KeysetPagination, filter_uploads
 from rest_framework.permissions import AllowAny, IsAuthenticated,IsAuthenticatedOrReadOnly
 
 
 @api_view(['POST'])
+@authentication_classes([StatelessJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def create_note(request):
     serializer = NotesSerializer(data=request.data)
     if serializer.is_valid():
+        over_quota = quota_exceeded(request.user.id, serializer.validated_data['file'].size)
+        if over_quota:
+            return over_quota
         # Associate the logged-in user with the note
-        serializer.save(user=request.user)
+        serializer.save(user_id=request.user.id)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(['POST'])
+@authentication_classes([StatelessJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def create_question_paper(request):
     serializer = QuestionPaperSerializer(data=request.data)
     if serializer.is_valid():
+        over_quota = quota_exceeded(request.user.id, serializer.validated_data['file'].size)
+        if over_quota:
+            return over_quota
         # Save the question paper if the data is valid
-        serializer.save(user=request.user)
+        serializer.save(user_id=request.user.id)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
 @api_view(['GET'])
+@authentication_classes([StatelessJWTAuthentication])
 @permission_classes([IsAuthenticated])
+@listing_condition('notes')
 def view_notes(request):
-    notes = Notes.objects.all()
-    serializer = NotesSerializer(notes, many=True)
-    return Response(serializer.data)
+    notes = filter_uploads(Notes.objects.all(), request)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(notes, request)
+    serializer = NotesSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
 
 
 @api_view(['GET'])
+@authentication_classes([StatelessJWTAuthentication])
 @permission_classes([IsAuthenticated])
+@listing_condition('question_papers')
 def get_question_paper(request):
-    question_paper = QuestionPaper.objects.all()
-    serializer = QuestionPaperSerializer(question_paper, many=True)
-    return Response(serializer.data)
+    question_paper = filter_uploads(QuestionPaper.objects.all(), request)
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(question_paper, request)
+    serializer = QuestionPaperSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
 
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _stream_json_lines(queryset, serializer_class):
+    encoder = JSONEncoder()
+    for obj in queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield encoder.encode(serializer_class(obj).data) + "\n"
+
+
+def _export_response(queryset, serializer_class, filename):
+    response = StreamingHttpResponse(
+        _stream_json_lines(queryset.order_by('id'), serializer_class),
+        content_type='application/x-ndjson',
+    )
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@api_view(['GET'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def export_notes(request):
+    # One JSON object per line, streamed so memory stays flat for any table size
+    notes = filter_uploads(Notes.objects.all(), request)
+    return _export_response(notes, NotesSerializer, 'notes.jsonl')
+
+
+@api_view(['GET'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def export_question_papers(request):
+    question_papers = filter_uploads(QuestionPaper.objects.all(), request)
+    return _export_response(question_papers, QuestionPaperSerializer, 'question_papers.jsonl')
+
+
+@api_view(['POST'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def chunked_upload_init(request):
+    serializer = ChunkedUploadSerializer(data=request.data)
+    if serializer.is_valid():
+        # Refuse before any bytes are sent; finalize checks again
+        over_quota = quota_exceeded(request.user.id, serializer.validated_data['total_size'])
+        if over_quota:
+            return over_quota
+        serializer.save(user_id=request.user.id)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@api_view(['GET', 'POST', 'DELETE'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def chunked_upload_detail(request, upload_id):
+    if request.method == 'GET':
+        # Clients resume from the returned offset after a dropped connection
+        upload = get_object_or_404(ChunkedUpload, pk=upload_id, user_id=request.user.id)
+        return Response(ChunkedUploadSerializer(upload).data)
+
+    if request.method == 'DELETE':
+        upload = get_object_or_404(ChunkedUpload, pk=upload_id, user_id=request.user.id)
+        discard(upload)
+        upload.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    chunk = request.FILES.get('chunk')
+    if chunk is None:
+        return Response({'chunk': ['No chunk was submitted.']}, status=status.HTTP_400_BAD_REQUEST)
+    if chunk.size > settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE:
+        return Response(
+            {'chunk': [f'Chunks cannot exceed {settings.CHUNKED_UPLOAD_MAX_CHUNK_SIZE} bytes.']},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        offset = int(request.data.get('offset'))
+    except (TypeError, ValueError):
+        return Response({'offset': ["'offset' must be an integer."]}, status=status.HTTP_400_BAD_REQUEST)
+
+    upload = get_object_or_404(ChunkedUpload, pk=upload_id, user_id=request.user.id)
+    # The staging file's lock, not a transaction, orders chunks of one
+    # upload, so no database lock is held while the chunk is written
+    with open_staging(upload) as staged:
+        # A racing request may have committed a chunk or aborted the upload
+        upload = ChunkedUpload.objects.filter(pk=upload_id).first()
+        if upload is not None:
+            if offset != upload.offset:
+                return Response(
+                    {'error': 'Offset does not match the bytes received so far.', 'offset': upload.offset},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            if upload.offset + chunk.size > upload.total_size:
+                return Response(
+                    {'error': 'Chunk extends past the declared file size.', 'offset': upload.offset},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            write_chunk(staged, upload.offset, chunk)
+            upload.offset += chunk.size
+            upload.save(update_fields=['offset', 'updated_at'])
+    if upload is None:
+        discard(ChunkedUpload(pk=upload_id))
+        return Response({'error': 'Upload not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(ChunkedUploadSerializer(upload).data)
+
+
+@api_view(['POST'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def chunked_upload_finalize(request, upload_id):
+    upload = get_object_or_404(ChunkedUpload, pk=upload_id, user_id=request.user.id)
+    if upload.offset != upload.total_size:
+        return Response(
+            {'error': 'Upload is incomplete.', 'offset': upload.offset},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    over_quota = quota_exceeded(request.user.id, upload.total_size)
+    if over_quota:
+        return over_quota
+    serializer_class = upload_serializer_for(upload.kind)
+    field = serializer_class.Meta.model._meta.get_field('file')
+    try:
+        staged = StagedUpload(upload)
+    except FileNotFoundError:
+        # Moved into storage by a racing finalize
+        return Response({'error': 'Upload is already being finalized.'}, status=status.HTTP_409_CONFLICT)
+    try:
+        serializer = serializer_class(data={'sem': upload.sem, 'title': upload.title, 'file': staged})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        # Hash the file and move it into storage, or take a reference to a
+        # stored copy, before the transaction: SQLite has one write lock
+        # and nothing else could write while a 500 MB file is read
+        name = field.storage.save(
+            field.generate_filename(None, staged.name), staged, max_length=field.max_length
+        )
+    finally:
+        staged.close()
+
+    try:
+        with transaction.atomic():
+            # Deleting the upload claims it, so only one finalize creates the row
+            claimed = ChunkedUpload.objects.filter(pk=upload.pk).delete()[0]
+            # Checked again in case another upload used up the quota meanwhile
+            over_quota = claimed and quota_exceeded(request.user.id, upload.total_size)
+            if claimed and not over_quota:
+                serializer.save(user_id=request.user.id, file=name)
+    except Exception:
+        field.storage.delete(name)
+        raise
+    if not claimed or over_quota:
+        # The staged bytes were moved into storage, so the upload cannot be
+        # finalized again; drop the reference taken above
+        field.storage.delete(name)
+        discard(upload)
+        return over_quota or Response({'error': 'Upload not found.'}, status=status.HTTP_404_NOT_FOUND)
+    discard(upload)
+    return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def search(request):
+    params = UploadSearchSerializer(data=request.query_params)
+    if not params.is_valid():
+        return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+    data = params.validated_data
+    page_size, offset = data['page_size'], data['offset']
+
+    # One extra match tells whether there is a next page
+    matches = search_uploads(
+        data['q'], sem=data.get('sem'), kind=data.get('kind'),
+        limit=page_size + 1, offset=offset,
+    )
+    results = [
+        {'kind': kind, 'score': score, **upload_serializer_for(kind)(upload).data}
+        for kind, upload, score in matches[:page_size]
+    ]
+    next_link = None
+    if len(matches) > page_size:
+        next_link = replace_query_param(
+            request.build_absolute_uri(), 'offset', offset + page_size
+        )
+    return Response({'next': next_link, 'results': results}, status=status.HTTP_200_OK)
+
+
+def _bulk_items(data):
+    """Pair up the repeated ``file``/``title``/``sem`` fields by position."""
+    files = data.getlist('file')
+    titles = data.getlist('title')
+    sems = data.getlist('sem')
+    errors = {}
+    if not files:
+        errors['file'] = ['No files were submitted.']
+    elif len(files) > settings.BULK_UPLOAD_MAX_FILES:
+        errors['file'] = [f'At most {settings.BULK_UPLOAD_MAX_FILES} files can be uploaded at once.']
+    if len(titles) != len(files):
+        errors['title'] = ['Send one title per file.']
+    if sems and len(sems) != len(files):
+        errors['sem'] = ['Send one sem per file, or none.']
+    if errors:
+        return None, errors
+    items = []
+    for index, (file, title) in enumerate(zip(files, titles)):
+        item = {'file': file, 'title': title}
+        if sems:
+            item['sem'] = sems[index]
+        items.append(item)
+    return items, None
+
+
+@api_view(['POST'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def bulk_upload(request):
+    options = BulkUploadSerializer(data=request.data)
+    if not options.is_valid():
+        return Response(options.errors, status=status.HTTP_400_BAD_REQUEST)
+    if not hasattr(request.data, 'getlist'):
+        return Response({'error': 'Send the files as multipart/form-data.'}, status=status.HTTP_400_BAD_REQUEST)
+    items, errors = _bulk_items(request.data)
+    if errors:
+        return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+
+    kind = options.validated_data['kind']
+    serializer_class = upload_serializer_for(kind)
+    results = [None] * len(items)
+    valid = []
+    for index, item in enumerate(items):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            results[index] = {'index': index, 'status': status.HTTP_400_BAD_REQUEST, 'errors': serializer.errors}
+
+    if valid:
+        # The whole batch must fit, so a retry never stores half of it
+        over_quota = quota_exceeded(request.user.id, sum(data['file'].size for _, data in valid))
+        if over_quota:
+            return over_quota
+        model = serializer_class.Meta.model
+        rows = bulk_create_uploads(model, request.user.id, [data for _, data in valid])
+        for (index, _), row in zip(valid, rows):
+            results[index] = {'index': index, 'status': status.HTTP_201_CREATED, 'data': serializer_class(row).data}
+
+    if len(valid) == len(items):
+        response_status = status.HTTP_201_CREATED
+    elif valid:
+        response_status = status.HTTP_207_MULTI_STATUS
+    else:
+        response_status = status.HTTP_400_BAD_REQUEST
+    return Response({'kind': kind, 'results': results}, status=response_status)
+
+
+@api_view(['GET'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def download_upload(request, kind, pk):
+    if kind not in KINDS:
+        return Response({'error': 'Unknown kind.'}, status=status.HTTP_404_NOT_FOUND)
+    model = KINDS[kind][0]
+    upload = get_object_or_404(model.objects.only('id', 'file', 'updated_at'), pk=pk)
+    if not upload.file:
+        return Response({'error': 'This upload has no file.'}, status=status.HTTP_404_NOT_FOUND)
+    return serve_file(request, upload.file, upload.updated_at)
+
+
+@api_view(['GET'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def upload_usage(request):
+    bytes_used, file_count = get_usage(request.user.id)
+    return Response(
+        {'bytes_used': bytes_used, 'file_count': file_count, 'quota': settings.UPLOAD_QUOTA_BYTES},
+        status=status.HTTP_200_OK,
+    )
@@ -1,14 +1,33 @@
 from studybudy import views
+from studybudy import async_views as studybudy_async_views
+from UploadNotesOrQuestionPaper import async_views as notes_async_views
+from feedback.async_views import feedback_list
 from UploadNotesOrQuestionPaper.views import (
     create_note,
     create_question_paper,
     view_notes,
     get_question_paper,
+    export_notes,
+    export_question_papers,
+    chunked_upload_init,
+    chunked_upload_detail,
+    chunked_upload_finalize,
+    search,
+    bulk_upload,
+    download_upload,
+    upload_usage,
 )
-from feedback.views import FeedbackAPI
+from feedback.views import FeedbackAPI, FeedbackStatsAPI
+from summarize.views import create_summary_job, summarize_text, summary_job
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
-from CgCalculator.views import CGPACalculatorView
+from CgCalculator.views import (
+    CGPABatchView,
+    CGPACalculatorView,
+    RequiredSGPAView,
+    SemesterRecordDetailView,
+    SemesterRecordListView,
+)
 
 auth_patterns = [
     path("signup/", views.signup, name="signup"),
@@ -34,10 +53,50 @@ notes_patterns = [
     path("upload_question_paper/", create_question_paper, name="upload_question_paper"),
     path("view_notes/", view_notes, name="view_notes"),
     path("get_question_paper/", get_question_paper, name="get_question_paper"),
+    path("export_notes/", export_notes, name="export_notes"),
+    path(
+        "export_question_papers/",
+        export_question_papers,
+        name="export_question_papers",
+    ),
+    path("chunked_upload/", chunked_upload_init, name="chunked_upload_init"),
+    path(
+        "chunked_upload/<uuid:upload_id>/",
+        chunked_upload_detail,
+        name="chunked_upload_detail",
+    ),
+    path(
+        "chunked_upload/<uuid:upload_id>/finalize/",
+        chunked_upload_finalize,
+        name="chunked_upload_finalize",
+    ),
+    path("search/", search, name="search"),
+    path("bulk_upload/", bulk_upload, name="bulk_upload"),
+    path("download/<str:kind>/<int:pk>/", download_upload, name="download_upload"),
+    path("upload_usage/", upload_usage, name="upload_usage"),
 ]
 
 feedback_patterns = [
     path("feedback/", FeedbackAPI.as_view(), name="feedback"),
+    path("feedback/stats/", FeedbackStatsAPI.as_view(), name="feedback_stats"),
+]
+
+summarize_patterns = [
+    path("summarize/", summarize_text, name="summarize"),
+    path("summarize/jobs/", create_summary_job, name="summary_jobs"),
+    path("summarize/jobs/<int:pk>/", summary_job, name="summary_job"),
+]
+
+# Async (ASGI-native) variants of the read-heavy endpoints above
+async_patterns = [
+    path("async/dashboard/", studybudy_async_views.dashboard, name="async_dashboard"),
+    path("async/view_notes/", notes_async_views.view_notes, name="async_view_notes"),
+    path(
+        "async/get_question_paper/",
+        notes_async_views.get_question_paper,
+        name="async_get_question_paper",
+    ),
+    path("async/feedback/", feedback_list, name="async_feedback"),
 ]
 
 urlpatterns = (
@@ -45,10 +104,24 @@ urlpatterns = (
     + profile_patterns
     + notes_patterns
     + feedback_patterns
+    + summarize_patterns
+    + async_patterns
     + [
         path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     ]
     + [
         path("calculate-cgpa/", CGPACalculatorView.as_view(), name="calculate-cgpa"),
+        path(
+            "calculate-cgpa/batch/",
+            CGPABatchView.as_view(),
+            name="calculate-cgpa-batch",
+        ),
+        path("required-sgpa/", RequiredSGPAView.as_view(), name="required-sgpa"),
+        path("semesters/", SemesterRecordListView.as_view(), name="semesters"),
+        path(
+            "semesters/<int:semester>/",
+            SemesterRecordDetailView.as_view(),
+            name="semester-detail",
+        ),
     ]
 )
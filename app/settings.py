@@ -48,6 +48,17 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    # Number of trusted proxies in front of the app. 0 keys per-IP throttles
+    # on REMOTE_ADDR and ignores X-Forwarded-For, which clients can forge;
+    # behind nginx set it to 1 so the client address nginx appends is used.
+    'NUM_PROXIES': config('NUM_PROXIES', default=0, cast=int),
+    # Used by studybudy.throttling on login and signup
+    'DEFAULT_THROTTLE_RATES': {
+        'login_ip': '20/min',
+        'login_email': '5/min',
+        'signup_ip': '10/hour',
+        'signup_email': '3/hour',
+    },
 }
 
 SIMPLE_JWT = {
@@ -55,6 +66,7 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=10),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_USER_CLASS': 'studybudy.authentication.StudyBuddyTokenUser',
 }
 
 AUTH_USER_MODEL = 'studybudy.CustomUser'
@@ -83,9 +95,46 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # Seconds a write waits for SQLite's single write lock. Requests
+            # and the text extraction threads write concurrently. Transactions
+            # stay DEFERRED, so an atomic() block only takes the lock at its
+            # first write; keep file I/O out of them. The background text
+            # writer uses single autocommitted statements, since a
+            # transaction that reads and then writes fails at once on a busy
+            # lock instead of waiting.
+            'timeout': 20,
+        },
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Per-user dashboard payloads; swap the backend for a shared cache
+    # (Redis, memcached) when running several worker processes.
+    'dashboard': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'dashboard',
+        'TIMEOUT': 300,
+    },
+    # Login/signup throttle history; use a shared backend so limits hold
+    # across worker processes.
+    'throttle': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'throttle',
+    },
+}
+
+DASHBOARD_CACHE_ALIAS = 'dashboard'
+THROTTLE_CACHE_ALIAS = 'throttle'
+
+# How long StatelessJWTAuthentication trusts a cached "account is active"
+# answer before checking the database again.
+ACCOUNT_STATE_CACHE_ALIAS = 'default'
+ACCOUNT_STATE_CACHE_TIMEOUT = 60
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -101,6 +150,24 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing profile, keyed by algorithm. The selected hasher hashes
+# new passwords; the others still verify older hashes, which are upgraded
+# on the next successful login. 'argon2' needs the argon2-cffi package.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2_sha256': 'studybudy.hashers.TunedPBKDF2PasswordHasher',
+    'scrypt': 'studybudy.hashers.TunedScryptPasswordHasher',
+    'argon2': 'studybudy.hashers.TunedArgon2PasswordHasher',
+}
+PASSWORD_HASHER_PROFILE = config('PASSWORD_HASHER_PROFILE', default='pbkdf2_sha256')
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]] + [
+    hasher for name, hasher in PASSWORD_HASHER_PROFILES.items()
+    if name != PASSWORD_HASHER_PROFILE
+]
+# Cost parameters per algorithm; anything not listed keeps Django's default.
+PASSWORD_HASHER_PARAMS = {
+    'scrypt': {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1},
+    'argon2': {'time_cost': 2, 'memory_cost': 19456, 'parallelism': 1},
+}
 
 LANGUAGE_CODE = 'en-us'
 TIME_ZONE = 'UTC'
@@ -116,3 +183,67 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 MEDIA_URL = '/media/'
+
+# Square avatar sizes (in px) rendered in the background for every new
+# profile picture; see studybudy/thumbnails.py.
+PROFILE_PICTURE_VARIANTS = {'small': 64, 'medium': 256}
+PROFILE_PICTURE_VARIANT_FORMAT = 'WEBP'
+PROFILE_PICTURE_WORKERS = 2
+
+# Same as Django's defaults, but they also hash uploads as they stream in
+# so duplicate notes and papers can be stored once.
+FILE_UPLOAD_HANDLERS = [
+    'UploadNotesOrQuestionPaper.uploadhandlers.HashingMemoryFileUploadHandler',
+    'UploadNotesOrQuestionPaper.uploadhandlers.HashingTemporaryFileUploadHandler',
+]
+
+# Largest cohort accepted by one calculate-cgpa/batch/ request
+CGPA_BATCH_MAX_STUDENTS = 10000
+# Largest target x credit-plan grid accepted by one required-sgpa/ request
+REQUIRED_SGPA_MAX_SCENARIOS = 1000
+# Completed (and planned) semesters accepted per required-SGPA request
+REQUIRED_SGPA_MAX_SEMESTERS = 40
+
+# Extractive summarization engines (summarize.engines), by name
+SUMMARIZE_ENGINES = {
+    'tfidf': 'summarize.engines.TfidfEngine',
+    'textrank': 'summarize.engines.TextRankEngine',
+}
+SUMMARIZE_DEFAULT_ENGINE = 'tfidf'
+SUMMARIZE_MAX_TEXT_LENGTH = 1_000_000
+SUMMARIZE_MAX_SENTENCES = 50
+# Summaries kept in each process's in-memory LRU (summarize.cache)
+SUMMARIZE_CACHE_SIZE = 256
+# Processes used by the run_summarize_worker command; keep below the core
+# count so queued summaries cannot starve the API workers
+SUMMARIZE_WORKERS = config('SUMMARIZE_WORKERS', default=2, cast=int)
+
+# Chunked uploads are staged outside MEDIA_ROOT so partial files are never
+# served; keep it on the same volume so finished uploads are moved, not copied.
+CHUNKED_UPLOAD_ROOT = os.path.join(BASE_DIR, 'upload_staging')
+CHUNKED_UPLOAD_MAX_CHUNK_SIZE = 8 * 1024 * 1024
+CHUNKED_UPLOAD_MAX_SIZE = 500 * 1024 * 1024
+
+# Threads extracting text from uploaded notes and question papers
+TEXT_EXTRACTION_WORKERS = 2
+# Retries (doubling the delay, in seconds) when storing extracted text
+# finds the database locked
+TEXT_EXTRACTION_DB_RETRIES = 4
+TEXT_EXTRACTION_DB_RETRY_DELAY = 0.5
+
+# bulk_upload/: files per request and threads writing them to storage
+BULK_UPLOAD_MAX_FILES = 100
+BULK_UPLOAD_WORKERS = 4
+
+# download/: "" sends files from Django (Range supported, sendfile() under
+# gunicorn); "x-accel-redirect" (nginx) or "x-sendfile" (Apache) hands the
+# transfer to the front proxy. MEDIA_SENDFILE_PREFIX is nginx's internal
+# location aliased to MEDIA_ROOT.
+MEDIA_SENDFILE_BACKEND = config('MEDIA_SENDFILE_BACKEND', default='')
+MEDIA_SENDFILE_PREFIX = '/protected-media/'
+
+# Bytes of notes and question papers each user may store (default 1 GiB);
+# set it empty for no limit
+UPLOAD_QUOTA_BYTES = config(
+    'UPLOAD_QUOTA_BYTES', default=str(1024 * 1024 * 1024), cast=lambda value: int(value) if value else None
+)
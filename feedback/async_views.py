@@ -0,0 +1,17 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from studybudy.authentication import async_jwt_required
+
+from .models import Feedback
+from .serializers import FeedbackSerializer
+
+
+@require_GET
+@async_jwt_required
+async def feedback_list(request):
+    feedbacks = [
+        FeedbackSerializer(feedback).data
+        async for feedback in Feedback.objects.aiterator()
+    ]
+    return JsonResponse(feedbacks, safe=False)
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:14
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+
+
+def backfill_rollups(apps, schema_editor):
+    Feedback = apps.get_model('feedback', 'Feedback')
+    FeedbackRollup = apps.get_model('feedback', 'FeedbackRollup')
+    rollups = {}
+    counts = (
+        Feedback.objects.annotate(day=TruncDate('created_at'))
+        .values('day', 'rating')
+        .annotate(n=Count('id'))
+    )
+    for row in counts:
+        rollup = rollups.setdefault(row['day'], FeedbackRollup(day=row['day']))
+        rollup.count += row['n']
+        rollup.rating_sum += row['rating'] * row['n']
+        if 1 <= row['rating'] <= 5:
+            field = f"rating_{row['rating']}"
+            setattr(rollup, field, getattr(rollup, field) + row['n'])
+    FeedbackRollup.objects.bulk_create(rollups.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('feedback', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedbackRollup',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('rating_sum', models.PositiveIntegerField(default=0)),
+                ('rating_1', models.PositiveIntegerField(default=0)),
+                ('rating_2', models.PositiveIntegerField(default=0)),
+                ('rating_3', models.PositiveIntegerField(default=0)),
+                ('rating_4', models.PositiveIntegerField(default=0)),
+                ('rating_5', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
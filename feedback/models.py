@@ -11,3 +11,40 @@ class Feedback(models.Model):
 
     def __str__(self):
         return f"Feedback by {self.user.username if self.user else 'Anonymous'} - {self.rating} Stars"
+
+
+RATINGS = range(1, 6)
+
+
+class FeedbackRollup(models.Model):
+    """Feedback counts for one day (in ``TIME_ZONE``).
+
+    Kept up to date by the signals in ``signals.py`` on every insert, update
+    and delete, so statistics read one row per day instead of every
+    feedback row.
+    """
+
+    day = models.DateField(primary_key=True)
+    count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['-day']
+
+    @property
+    def mean(self):
+        if not self.count:
+            return None
+        return round(self.rating_sum / self.count, 2)
+
+    @property
+    def histogram(self):
+        return {str(rating): getattr(self, f'rating_{rating}') for rating in RATINGS}
+
+    def __str__(self):
+        return f"{self.day}: {self.count} feedback, mean {self.mean}"
@@ -5,4 +5,11 @@ class FeedbackSerializer(serializers.ModelSerializer):
     class Meta:
         model = Feedback
         fields = '__all__'
+        # Always set by the view from the authenticated user
+        read_only_fields = ['user']
 
+
+
+class FeedbackStatsSerializer(serializers.Serializer):
+    # Days of per-day statistics to return, newest first
+    days = serializers.IntegerField(min_value=1, max_value=366, default=30)
@@ -0,0 +1,67 @@
+import datetime
+from functools import partial
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from studybudy.conditional import bump_listing_version
+from studybudy.counters import apply_counter_delta, remember_loaded_values
+from .models import RATINGS, Feedback, FeedbackRollup
+
+# Listing version for conditional GET of FeedbackAPI
+post_save.connect(partial(bump_listing_version, "feedback"), sender=Feedback, weak=False)
+post_delete.connect(partial(bump_listing_version, "feedback"), sender=Feedback, weak=False)
+
+
+def _contribution(feedback):
+    return timezone.localdate(feedback.created_at), feedback.rating
+
+
+def _counts(rating, sign):
+    counts = {'count': sign, 'rating_sum': sign * rating}
+    if rating in RATINGS:
+        counts[f'rating_{rating}'] = sign
+    return counts
+
+
+def _apply_delta(day, rating, sign, create=True):
+    apply_counter_delta(FeedbackRollup, {'day': day}, create=create, **_counts(rating, sign))
+
+
+# What each row currently contributes to the rollups
+remember_loaded_values(Feedback, '_stored_contribution', ('rating', 'created_at'), _contribution)
+
+
+@receiver(post_save, sender=Feedback)
+def add_feedback_to_rollup(sender, instance, created, **kwargs):
+    stored = None if created else getattr(instance, '_stored_contribution', None)
+    contribution = _contribution(instance)
+    if not created and stored is None:
+        # Loaded with deferred fields; the old rating is no longer known.
+        # created_at never changes, so only this day can be affected.
+        recompute_rollup(contribution[0])
+    elif stored != contribution:
+        if stored is not None:
+            _apply_delta(*stored, -1, create=False)
+        _apply_delta(*contribution, 1)
+    instance._stored_contribution = contribution
+
+
+@receiver(post_delete, sender=Feedback)
+def remove_feedback_from_rollup(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored_contribution', None) or _contribution(instance)
+    _apply_delta(*stored, -1, create=False)
+
+
+def recompute_rollup(day):
+    """Rebuild the rollup of one day from its feedback."""
+    start = timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+    end = start + datetime.timedelta(days=1)
+    counts = _counts(0, 0)
+    for rating in RATINGS:
+        counts[f'rating_{rating}'] = 0
+    for rating in Feedback.objects.filter(created_at__gte=start, created_at__lt=end).values_list('rating', flat=True):
+        for field, value in _counts(rating, 1).items():
+            counts[field] += value
+    FeedbackRollup.objects.update_or_create(day=day, defaults=counts)
@@ -1,3 +1,106 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from studybudy.models import CustomUser
+from .models import Feedback, FeedbackRollup
+from .signals import recompute_rollup
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class FeedbackTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.user = CustomUser.objects.create_user(email='a@example.com', password='pw12345!', username='alice')
+        self.client = self.client_for(self.user)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+
+class AsyncFeedbackListTests(FeedbackTestCase):
+    def test_matches_the_sync_listing(self):
+        Feedback.objects.create(user=self.user, comment='Helpful', rating=4)
+        Feedback.objects.create(comment='Anonymous', rating=2)
+        response = self.client.get('/api/async/feedback/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.client.get('/api/feedback/').json())
+
+    def test_requires_a_token(self):
+        self.assertEqual(APIClient().get('/api/async/feedback/').status_code, 401)
+
+
+class ConditionalFeedbackListTests(FeedbackTestCase):
+    def test_not_modified_until_feedback_changes(self):
+        etag = self.client.get('/api/feedback/')['ETag']
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get('/api/feedback/', headers={'If-None-Match': etag}).status_code, 304)
+        self.assertEqual(self.client.post('/api/feedback/', {'comment': 'Nice', 'rating': 4}, format='json').status_code, 201)
+        response = self.client.get('/api/feedback/', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        Feedback.objects.get().delete()
+        self.assertEqual(self.client.get('/api/feedback/', headers={'If-None-Match': etag}).status_code, 200)
+
+
+class FeedbackStatsTests(FeedbackTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = CustomUser.objects.create_user(
+            email='admin@example.com', password='pw12345!', username='admin', is_staff=True
+        )
+        self.admin_client = self.client_for(self.admin)
+
+    def stats(self, **params):
+        response = self.admin_client.get('/api/feedback/stats/', params)
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def assertRollupsMatchFeedback(self):
+        stored = list(FeedbackRollup.objects.order_by('day').values())
+        for rollup in FeedbackRollup.objects.all():
+            recompute_rollup(rollup.day)
+        self.assertEqual(list(FeedbackRollup.objects.order_by('day').values()), stored)
+
+    def test_admins_only(self):
+        self.assertEqual(self.client.get('/api/feedback/stats/').status_code, 403)
+        self.assertEqual(APIClient().get('/api/feedback/stats/').status_code, 401)
+
+    def test_overall_and_daily_stats(self):
+        for rating in (5, 4, 4, 1):
+            self.assertEqual(self.client.post('/api/feedback/', {'comment': 'c', 'rating': rating}, format='json').status_code, 201)
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now() - timedelta(days=2)):
+            Feedback.objects.create(comment='Old', rating=2)
+        # The admin's user row, the overall aggregate and the days
+        with self.assertNumQueries(3):
+            stats = self.stats()
+        self.assertEqual(stats['overall'], {'count': 5, 'mean': 3.2, 'histogram': {'1': 1, '2': 1, '3': 0, '4': 2, '5': 1}})
+        self.assertEqual([(day['count'], day['mean']) for day in stats['days']], [(4, 3.5), (1, 2.0)])
+        self.assertEqual(len(self.stats(days=1)['days']), 1)
+        self.assertEqual(self.admin_client.get('/api/feedback/stats/', {'days': 0}).status_code, 400)
+
+    def test_rollups_follow_edits_and_deletes(self):
+        for rating in (5, 1, 2):
+            Feedback.objects.create(comment='c', rating=rating)
+        feedback = Feedback.objects.get(rating=1)
+        feedback.rating = 3
+        feedback.save()
+        feedback = Feedback.objects.defer('rating').get(rating=2)
+        feedback.rating = 5
+        feedback.save()
+        # The stored rating is removed, not an unsaved edit
+        feedback = Feedback.objects.get(pk=feedback.pk)
+        feedback.rating = 1
+        feedback.delete()
+        overall = self.stats()['overall']
+        self.assertEqual(overall['histogram'], {'1': 0, '2': 0, '3': 1, '4': 0, '5': 1})
+        self.assertEqual(overall['count'], 2)
+        self.assertRollupsMatchFeedback()
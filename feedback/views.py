@@ -1,12 +1,18 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Feedback
-from .serializers import FeedbackSerializer
-from rest_framework.permissions import AllowAny,IsAuthenticated
+from django.db.models import Sum
+from .models import RATINGS, Feedback, FeedbackRollup
+from .serializers import FeedbackSerializer, FeedbackStatsSerializer
+from rest_framework.permissions import AllowAny,IsAdminUser,IsAuthenticated
+from django.utils.decorators import method_decorator
+from studybudy.authentication import StatelessJWTAuthentication
+from studybudy.conditional import listing_condition
 
 class FeedbackAPI(APIView):
+    authentication_classes = [StatelessJWTAuthentication]
     permission_classes = [IsAuthenticated, AllowAny]
+    @method_decorator(listing_condition("feedback"))
     def get(self, request):
         feedbacks = Feedback.objects.all()
         serializer = FeedbackSerializer(feedbacks, many=True)
@@ -15,6 +21,41 @@ class FeedbackAPI(APIView):
     def post(self, request):
         serializer = FeedbackSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user if request.user.is_authenticated else None)
+            serializer.save(user_id=request.user.id if request.user.is_authenticated else None)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+def _stats(count, rating_sum, histogram):
+    return {
+        'count': count,
+        'mean': round(rating_sum / count, 2) if count else None,
+        'histogram': histogram,
+    }
+
+
+class FeedbackStatsAPI(APIView):
+    # Default JWTAuthentication: is_staff must come from the user row,
+    # not from token claims
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        params = FeedbackStatsSerializer(data=request.query_params)
+        if not params.is_valid():
+            return Response(params.errors, status=status.HTTP_400_BAD_REQUEST)
+        # Rollups hold one row per day, so neither query depends on how much
+        # feedback there is
+        fields = ['rating_sum'] + [f'rating_{rating}' for rating in RATINGS]
+        totals = FeedbackRollup.objects.aggregate(
+            count=Sum('count'), **{field: Sum(field) for field in fields}
+        )
+        overall = _stats(
+            totals['count'] or 0,
+            totals['rating_sum'] or 0,
+            {str(rating): totals[f'rating_{rating}'] or 0 for rating in RATINGS},
+        )
+        days = [
+            {'day': rollup.day, **_stats(rollup.count, rollup.rating_sum, rollup.histogram)}
+            for rollup in FeedbackRollup.objects.filter(count__gt=0)[:params.validated_data['days']]
+        ]
+        return Response({'overall': overall, 'days': days}, status=status.HTTP_200_OK)
@@ -0,0 +1,26 @@
+"""Async (ASGI-native) variants of read-heavy StudyBuddy views.
+
+These are plain Django async views rather than DRF views, so under ASGI
+they run on the event loop without a thread per request. Authentication
+uses the same JWT access tokens as the DRF endpoints.
+
+Available endpoints:
+    GET /async/dashboard/ - Get user profile data
+"""
+
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+
+from .authentication import async_jwt_required
+from .dashboard import aget_dashboard_payload
+
+
+@require_GET
+@async_jwt_required
+async def dashboard(request):
+    """Async counterpart of :func:`studybudy.views.dashboard`.
+
+    Returns:
+        JsonResponse: The same profile payload as the sync dashboard.
+    """
+    return JsonResponse(await aget_dashboard_payload(request.user))
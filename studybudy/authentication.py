@@ -0,0 +1,166 @@
+"""JWT authentication for StudyBuddy.
+
+Classes
+- StudyBuddyRefreshToken: Refresh token that also carries the user's
+    email, username and active flag, so access tokens derived from it can
+    stand in for the user row.
+- StudyBuddyTokenUser: Lightweight user built from those claims.
+- StatelessJWTAuthentication: DRF authentication class that returns a
+    StudyBuddyTokenUser instead of loading ``CustomUser`` on every request.
+
+Functions
+- is_account_active: Short-TTL cached check used to reject tokens of
+    deactivated or deleted accounts.
+- aauthenticate / async_jwt_required: Token authentication for the async
+    views, which run outside DRF.
+
+Notes
+- Views authenticated with StatelessJWTAuthentication get a token user, not
+    a model instance: use ``request.user.id`` (e.g. ``user_id=``) when
+    saving rows that point at the user.
+- Claims are copied when the token is issued, so a changed username shows
+    up in token users after the next login.
+"""
+
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import JsonResponse
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import (
+    JWTAuthentication,
+    JWTStatelessUserAuthentication,
+)
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .models import CustomUser
+
+
+class StudyBuddyRefreshToken(RefreshToken):
+    """Refresh token carrying the claims needed to build a token user."""
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token["email"] = user.email
+        token["username"] = user.username
+        token["is_active"] = user.is_active
+        return token
+
+
+class StudyBuddyTokenUser(TokenUser):
+    """Token-backed user exposing ``email`` and ``is_active`` claims."""
+
+    @cached_property
+    def id(self):
+        # simplejwt stores the claim as a string; rows saved with
+        # ``user_id=request.user.id`` must serialize it as the integer pk
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def is_active(self):
+        return self.token.get("is_active", True)
+
+
+def _account_state_key(user_id):
+    return f"account-active:{user_id}"
+
+
+def is_account_active(user_id):
+    """Return whether ``user_id`` still exists and is active.
+
+    The answer is cached for ``settings.ACCOUNT_STATE_CACHE_TIMEOUT``
+    seconds, and dropped as soon as the user row changes (see
+    ``studybudy.signals``), so at most one cheap query per user per TTL
+    is needed to honour deactivation and deletion.
+
+    Args:
+        user_id: The token's user id claim.
+
+    Returns:
+        bool: True if the account may still authenticate.
+    """
+    cache = caches[settings.ACCOUNT_STATE_CACHE_ALIAS]
+    key = _account_state_key(user_id)
+    active = cache.get(key)
+    if active is None:
+        active = CustomUser.objects.filter(pk=user_id, is_active=True).exists()
+        cache.set(key, active, settings.ACCOUNT_STATE_CACHE_TIMEOUT)
+    return active
+
+
+def forget_account_state(user_id):
+    caches[settings.ACCOUNT_STATE_CACHE_ALIAS].delete(_account_state_key(user_id))
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """Authenticate from the access token alone.
+
+    Returns a StudyBuddyTokenUser built from the token's claims instead of
+    querying ``CustomUser``. Deactivated and deleted accounts are still
+    rejected through the cached :func:`is_account_active` check.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if not user.is_active or not is_account_active(user.id):
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+        return user
+
+
+async def aauthenticate(request):
+    """Return the active user for the request's access token, or None.
+
+    Args:
+        request: Plain Django ``HttpRequest`` with an
+            ``Authorization: Bearer <token>`` header.
+
+    Returns:
+        CustomUser | None: The token's user if the token is valid and the
+        account is active.
+    """
+    authenticator = JWTAuthentication()
+    header = authenticator.get_header(request)
+    if header is None:
+        return None
+    raw_token = authenticator.get_raw_token(header)
+    if raw_token is None:
+        return None
+    try:
+        token = authenticator.get_validated_token(raw_token)
+        user_id = token[api_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        return None
+    return await CustomUser.objects.filter(
+        **{api_settings.USER_ID_FIELD: user_id}, is_active=True
+    ).afirst()
+
+
+def async_jwt_required(view):
+    """Decorate an async view so it only runs for a JWT-authenticated user.
+
+    Sets ``request.user`` on success and answers 401 otherwise, mirroring
+    the ``IsAuthenticated`` default of the DRF views.
+    """
+
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        user = await aauthenticate(request)
+        if user is None:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided or are invalid."},
+                status=401,
+            )
+        request.user = user
+        return await view(request, *args, **kwargs)
+
+    return wrapped
@@ -0,0 +1,67 @@
+"""Conditional GET for listing endpoints.
+
+Each listing has a ``ListingVersion`` row whose counter is bumped, with an
+``F()`` update in the same transaction as the change, whenever a row behind
+the listing is saved or deleted. The listing's ETag and Last-Modified are
+derived from that row, so a client polling an unchanged listing gets
+``304 Not Modified`` after one primary-key read, before any rows are
+fetched or serialized.
+
+Functions
+- bump_listing_version: Record that a listing changed.
+- listing_condition: View decorator adding ETag/Last-Modified and 304s.
+"""
+
+from functools import partial
+
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+from .counters import apply_counter_delta
+from .models import ListingVersion
+
+
+def bump_listing_version(name, **kwargs):
+    """Increment the version of listing ``name``.
+
+    Accepts and ignores signal arguments, so it can be connected directly
+    with ``partial(bump_listing_version, name)``.
+
+    Args:
+        name (str): The listing, e.g. ``"notes"``.
+    """
+    apply_counter_delta(ListingVersion, {"name": name}, values={"updated_at": timezone.now()}, version=1)
+
+
+def _listing_state(name, request):
+    # Both condition() callbacks need the row; read it once per request
+    cache = request.__dict__.setdefault("_listing_versions", {})
+    if name not in cache:
+        cache[name] = ListingVersion.objects.filter(name=name).first()
+    return cache[name]
+
+
+def _etag(name, request, *args, **kwargs):
+    state = _listing_state(name, request)
+    return f"{name}.{state.version if state else 0}"
+
+
+def _last_modified(name, request, *args, **kwargs):
+    state = _listing_state(name, request)
+    return state.updated_at if state else None
+
+
+def listing_condition(name):
+    """Return a view decorator for conditional GETs of listing ``name``.
+
+    The ETag does not depend on query parameters: clients cache per URL, and
+    every filtered or paginated view of a listing changes whenever its
+    version does.
+
+    Args:
+        name (str): The listing whose version validates the response.
+    """
+    return condition(
+        etag_func=partial(_etag, name),
+        last_modified_func=partial(_last_modified, name),
+    )
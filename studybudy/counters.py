@@ -0,0 +1,63 @@
+"""Denormalized counters kept current by signals.
+
+Totals such as a user's upload usage, a user's CGPA totals, the daily
+feedback rollups and the listing versions are single rows updated with
+``F()`` expressions in the same transaction as the change they count, so
+reading them never needs an aggregate over the rows behind them.
+
+Functions
+- apply_counter_delta: Add to the counter columns of one row, creating it if needed.
+- remember_loaded_values: Keep what each row counted when it was loaded.
+"""
+
+from django.db.models import F
+from django.db.models.signals import post_init
+
+
+def apply_counter_delta(model, lookup, create=True, values=None, **deltas):
+    """Add ``deltas`` to the row of ``model`` matching ``lookup``.
+
+    Args:
+        model: The counter model.
+        lookup (dict): Field values identifying the row, e.g. ``{"user_id": 1}``.
+        create (bool): Create a missing row, starting from ``deltas``. Pass
+            False where the row's owner may be being deleted.
+        values (dict): Fields set, rather than added to, on every update.
+        **deltas: Amount to add to each counter field (may be negative).
+    """
+    if not any(deltas.values()):
+        return
+    changes = {field: F(field) + value for field, value in deltas.items()}
+    changes.update(values or {})
+    updated = model.objects.filter(**lookup).update(**changes)
+    if not updated and create:
+        _, created = model.objects.get_or_create(**lookup, defaults={**deltas, **(values or {})})
+        if not created:
+            # Created concurrently between the update and get_or_create
+            apply_counter_delta(model, lookup, create=False, values=values, **deltas)
+
+
+def remember_loaded_values(sender, attr, fields, snapshot):
+    """Store ``snapshot(instance)`` as ``instance.<attr>`` on every ``sender`` row.
+
+    Counter signals use it to take back what a row counted as stored, not
+    its unsaved in-memory edits. The snapshot is None when any of
+    ``fields`` is deferred or unset; the old values are then unknown and the
+    counter has to be recomputed.
+
+    ``_state.adding`` is only cleared after post_init, so loaded rows cannot
+    be told from new ones here: new instances get a snapshot too, and
+    post_save handlers must ignore it when ``created``. They should store a
+    fresh snapshot once the counter is updated.
+
+    Args:
+        sender: The model whose rows are counted.
+        attr (str): Instance attribute holding the snapshot.
+        fields (tuple): Fields the snapshot is computed from.
+        snapshot: Callable returning what an instance counts.
+    """
+    def remember(sender, instance, **kwargs):
+        loaded = all(instance.__dict__.get(field) is not None for field in fields)
+        setattr(instance, attr, snapshot(instance) if loaded else None)
+
+    post_init.connect(remember, sender=sender, weak=False)
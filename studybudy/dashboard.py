@@ -0,0 +1,84 @@
+"""Dashboard payload shared by the sync and async dashboard views.
+
+Payloads are cached per user in the ``settings.DASHBOARD_CACHE_ALIAS``
+cache (local memory by default; point the alias at Redis or memcached to
+share it between workers). ``studybudy.signals`` drops a user's entry
+whenever the user row is saved or deleted, or new picture variants finish.
+"""
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import CustomUser
+from .thumbnails import variant_urls
+
+
+def build_dashboard_payload(user):
+    """Return the profile dict served by the dashboard endpoints.
+
+    Args:
+        user (CustomUser): The authenticated user.
+
+    Returns:
+        dict: JSON-ready profile data (id, username, email, profile
+        picture and resized variant URLs, name, gender, phone number and
+        date of birth).
+    """
+    return {
+        "id": user.id,
+        "profile_picture": user.profile_picture.url if user.profile_picture else None,
+        "profile_picture_variants": variant_urls(user.profile_picture),
+        "username": user.username,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "gender": user.gender,
+        "phone_number": str(user.phone_number) if user.phone_number else None,
+        "date_of_birth": user.date_of_birth,
+    }
+
+
+def _cache():
+    return caches[settings.DASHBOARD_CACHE_ALIAS]
+
+
+def dashboard_cache_key(user_id):
+    return f"dashboard:{user_id}"
+
+
+def get_dashboard_payload(user):
+    """Return the dashboard payload for ``user``, from the cache if possible.
+
+    Args:
+        user (CustomUser | StudyBuddyTokenUser): The authenticated user. A
+            token user is only resolved to its row on a cache miss.
+
+    Returns:
+        dict: See :func:`build_dashboard_payload`.
+    """
+    key = dashboard_cache_key(user.pk)
+    payload = _cache().get(key)
+    if payload is None:
+        if not isinstance(user, CustomUser):
+            user = CustomUser.objects.get(pk=user.pk)
+        payload = build_dashboard_payload(user)
+        _cache().set(key, payload)
+    return payload
+
+
+async def aget_dashboard_payload(user):
+    """Async counterpart of :func:`get_dashboard_payload`."""
+    key = dashboard_cache_key(user.pk)
+    payload = await _cache().aget(key)
+    if payload is None:
+        if not isinstance(user, CustomUser):
+            user = await CustomUser.objects.aget(pk=user.pk)
+        # Variant URLs check storage, which blocks; keep it off the event loop
+        payload = await sync_to_async(build_dashboard_payload)(user)
+        await _cache().aset(key, payload)
+    return payload
+
+
+def invalidate_dashboard(user_id):
+    _cache().delete(dashboard_cache_key(user_id))
@@ -0,0 +1,48 @@
+"""Password hashers with cost parameters taken from settings.
+
+``settings.PASSWORD_HASHER_PROFILE`` picks which of these hashes new
+passwords; the others stay in ``PASSWORD_HASHERS`` so existing hashes still
+verify. Django's ``check_password`` re-hashes a password with the preferred
+hasher (or its new parameters) on the next successful login, so changing
+the profile or its ``PASSWORD_HASHER_PARAMS`` migrates users transparently.
+
+Classes
+- TunedPBKDF2PasswordHasher: PBKDF2-SHA256 (Django's default algorithm).
+- TunedScryptPasswordHasher: scrypt, memory-hard and much cheaper in CPU
+    time per login than PBKDF2 at comparable strength.
+- TunedArgon2PasswordHasher: Argon2id; requires the optional
+    ``argon2-cffi`` package.
+"""
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+class SettingsParamsMixin:
+    """Override hasher cost attributes from ``PASSWORD_HASHER_PARAMS``.
+
+    Parameters are looked up by the hasher's ``algorithm`` name, e.g.
+    ``{"scrypt": {"work_factor": 2**14}}``; missing ones keep Django's
+    defaults.
+    """
+
+    def __init__(self):
+        params = getattr(settings, "PASSWORD_HASHER_PARAMS", {})
+        for name, value in params.get(self.algorithm, {}).items():
+            setattr(self, name, value)
+
+
+class TunedPBKDF2PasswordHasher(SettingsParamsMixin, PBKDF2PasswordHasher):
+    pass
+
+
+class TunedScryptPasswordHasher(SettingsParamsMixin, ScryptPasswordHasher):
+    pass
+
+
+class TunedArgon2PasswordHasher(SettingsParamsMixin, Argon2PasswordHasher):
+    pass
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from studybudy.models import CustomUser
+from studybudy.thumbnails import generate_variants
+
+
+class Command(BaseCommand):
+    help = "Render resized variants for every existing profile picture."
+
+    def handle(self, *args, **options):
+        users = CustomUser.objects.exclude(profile_picture="").exclude(profile_picture=None)
+        done = 0
+        for user in users.only("id", "profile_picture").iterator():
+            try:
+                generate_variants(user.profile_picture.storage, user.profile_picture.name)
+            except Exception as exc:  # keep going for the remaining users
+                self.stderr.write(f"{user.profile_picture.name}: {exc}")
+                continue
+            done += 1
+        self.stdout.write(f"Generated variants for {done} profile picture(s).")
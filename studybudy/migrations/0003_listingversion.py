@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studybudy', '0002_alter_customuser_username'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ListingVersion',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('version', models.PositiveBigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -8,6 +8,7 @@ Classes
 - CustomUser: Custom user model that extends Django's AbstractUser to use an
     email-based login and store additional profile fields (phone number,
     date of birth, profile picture, etc.).
+- ListingVersion: Change counter of a listing, used for conditional GET.
 
 Notes
 - The project sets `AUTH_USER_MODEL = 'studybudy.CustomUser'` in
@@ -103,3 +104,18 @@ class CustomUser(AbstractUser):
         """Return a compact string representation for debugging/logging."""
         return f"<{self.email}>"
 
+
+class ListingVersion(models.Model):
+    """Change counter of one listing endpoint.
+
+    Bumped by signals whenever a row behind the listing is created, changed
+    or deleted (see ``conditional.py``), so a listing's ETag and
+    Last-Modified come from a single primary-key read.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -25,6 +25,7 @@ from rest_framework import serializers
 from rest_framework.validators import UniqueValidator
 
 from studybudy.models import GenderChoices
+from studybudy.thumbnails import variant_urls
 
 CustomUser = get_user_model()
 
@@ -218,6 +219,8 @@ class UpdateProfileSerializer(serializers.ModelSerializer):
         username: Cannot be changed after signup
         email: Cannot be changed after signup
         gender_display: Human-readable gender choice
+        profile_picture_variants: URLs of the resized avatars, None until
+            they have been generated in the background
 
     Note:
         Use PATCH for partial updates and PUT for full updates.
@@ -233,6 +236,7 @@ class UpdateProfileSerializer(serializers.ModelSerializer):
         choices=GenderChoices.choices, required=False, allow_null=True
     )
     gender_display = serializers.CharField(source="get_gender_display", read_only=True)
+    profile_picture_variants = serializers.SerializerMethodField()
 
     class Meta:
         model = CustomUser
@@ -242,6 +246,7 @@ class UpdateProfileSerializer(serializers.ModelSerializer):
             "email",
             "username",
             "profile_picture",
+            "profile_picture_variants",
             "phone_number",
             "gender",
             "gender_display",
@@ -249,6 +254,9 @@ class UpdateProfileSerializer(serializers.ModelSerializer):
         ]
         extra_kwargs = {"username": {"read_only": True}, "email": {"read_only": True}}
 
+    def get_profile_picture_variants(self, obj):
+        return variant_urls(obj.profile_picture)
+
 
 class ResetPasswordRequestSerializer(serializers.Serializer):
     """Serializer for initiating a password reset request.
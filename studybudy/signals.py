@@ -1,13 +1,80 @@
-from django.db.models.signals import pre_save
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
 from django.dispatch import receiver
-import os
+from .authentication import forget_account_state
+from .dashboard import invalidate_dashboard
 from .models import CustomUser
+from .thumbnails import delete_variants, schedule_variants
+
+# Marks a profile picture that was deferred when the user row was loaded
+_NOT_LOADED = object()
+
+
+def _picture_name(value):
+    return getattr(value, "name", value) or ""
+
+
+@receiver(post_init, sender=CustomUser)
+def remember_profile_picture(sender, instance, **kwargs):
+    # Remember the picture as loaded so saves can tell whether it changed
+    # without reading the row back.
+    if "profile_picture" in instance.__dict__:
+        instance._loaded_profile_picture = _picture_name(instance.__dict__["profile_picture"])
+    else:
+        instance._loaded_profile_picture = _NOT_LOADED
+
 
 @receiver(pre_save, sender=CustomUser)
-def delete_old_profile_picture(sender, instance, **kwargs):
-    if instance.pk:
-        old_profile_picture = sender.objects.get(pk=instance.pk).profile_picture
-        if old_profile_picture:
-            if old_profile_picture != instance.profile_picture:
-                if os.path.isfile(old_profile_picture.path):
-                    os.remove(old_profile_picture.path)
\ No newline at end of file
+def delete_old_profile_picture(sender, instance, update_fields=None, **kwargs):
+    instance._replaced_profile_picture = ""
+    if instance._state.adding:
+        return
+    if update_fields is not None and "profile_picture" not in update_fields:
+        return
+    old_name = getattr(instance, "_loaded_profile_picture", _NOT_LOADED)
+    if old_name is _NOT_LOADED:
+        old_name = _picture_name(
+            sender.objects.filter(pk=instance.pk)
+            .values_list("profile_picture", flat=True)
+            .first()
+        )
+    if old_name and old_name != _picture_name(instance.profile_picture):
+        instance._replaced_profile_picture = old_name
+
+
+@receiver(post_save, sender=CustomUser)
+def remove_replaced_profile_picture(sender, instance, update_fields=None, **kwargs):
+    old_name = getattr(instance, "_replaced_profile_picture", "")
+    storage = instance.profile_picture.storage
+    if old_name:
+        # Only delete once the new picture is committed; a rolled back save
+        # keeps the old file.
+        def remove_old_picture():
+            storage.delete(old_name)
+            delete_variants(storage, old_name)
+
+        transaction.on_commit(remove_old_picture)
+        instance._replaced_profile_picture = ""
+    if update_fields is None or "profile_picture" in update_fields:
+        new_name = _picture_name(instance.profile_picture)
+        if new_name and new_name != instance._loaded_profile_picture:
+            schedule_variants(
+                instance.profile_picture, on_done=partial(invalidate_dashboard, instance.pk)
+            )
+        instance._loaded_profile_picture = new_name
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_cached_dashboard(sender, instance, **kwargs):
+    # After commit, so a concurrent request cannot re-cache the old row
+    transaction.on_commit(partial(invalidate_dashboard, instance.pk))
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def forget_cached_account_state(sender, instance, **kwargs):
+    # Deactivation and deletion take effect for stateless token auth at once
+    transaction.on_commit(partial(forget_account_state, instance.pk))
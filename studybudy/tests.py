@@ -1,3 +1,351 @@
-from django.test import TestCase
+import asyncio
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.hashers import get_hasher
+from django.core.cache import caches
+from django.core.management import call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from PIL import Image
+from rest_framework.test import APIClient, APIRequestFactory
+
+from . import dashboard, thumbnails
+from .authentication import StatelessJWTAuthentication, StudyBuddyRefreshToken, StudyBuddyTokenUser
+from .counters import apply_counter_delta
+from .dashboard import dashboard_cache_key
+from .models import CustomUser, ListingVersion
+
+
+def image(name='me.png', size=(800, 600), color='red'):
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'PNG')
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type='image/png')
+
+
+class InlineExecutor:
+    def submit(self, fn, *args):
+        fn(*args)
+
+
+class StudyBuddyTestCase(TestCase):
+    """Logged-in API client, with profile pictures in a temporary MEDIA_ROOT.
+
+    Profile picture variants are rendered inline once the save commits.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.media_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.media_root, ignore_errors=True)
+        test_settings = override_settings(
+            MEDIA_ROOT=cls.media_root,
+            PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+        )
+        test_settings.enable()
+        cls.addClassCleanup(test_settings.disable)
+        super().setUpClass()
+
+    def setUp(self):
+        # Dashboards, account states and throttles live in the caches
+        for cache in caches.all():
+            cache.clear()
+        executor = mock.patch.object(thumbnails, '_executor', InlineExecutor())
+        executor.start()
+        self.addCleanup(executor.stop)
+        self.user = CustomUser.objects.create_user(email='a@example.com', password='pw12345!', username='alice')
+        self.client = self.client_for(self.user)
+
+    def access_token(self, user):
+        return StudyBuddyRefreshToken.for_user(user).access_token
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.access_token(user)}')
+        return client
+
+
+class AsyncDashboardTests(StudyBuddyTestCase):
+    def test_matches_the_sync_dashboard(self):
+        self.user.phone_number = '+919876543210'
+        self.user.save()
+        response = self.client.get('/api/async/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), self.client.get('/api/dashboard/').json())
+
+    def test_payload_is_built_off_the_event_loop(self):
+        build = dashboard.build_dashboard_payload
+        loops = []
+
+        def build_and_check(user):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return build(user)
+
+        with mock.patch.object(dashboard, 'build_dashboard_payload', build_and_check):
+            self.assertEqual(self.client.get('/api/async/dashboard/').status_code, 200)
+        self.assertEqual(loops, [None])
+
+    def test_requires_a_valid_token(self):
+        self.assertEqual(APIClient().get('/api/async/dashboard/').status_code, 401)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION='Bearer not-a-token')
+        self.assertEqual(client.get('/api/async/dashboard/').status_code, 401)
+
+
+class ProfilePictureCleanupTests(StudyBuddyTestCase):
+    def set_picture(self, picture):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch('/api/update_profile/', {'profile_picture': picture}, format='multipart')
+        self.assertEqual(response.status_code, 200, response.content)
+        return CustomUser.objects.get(pk=self.user.pk)
+
+    def test_saves_without_a_new_picture_do_not_read_the_row_back(self):
+        user = self.set_picture(image())
+        path = user.profile_picture.path
+        with CaptureQueriesContext(connection) as queries:
+            user.first_name = 'Alice'
+            user.save()
+        self.assertEqual(len(queries), 1)
+        with CaptureQueriesContext(connection) as queries:
+            user.save(update_fields=['last_login'])
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(os.path.exists(path))
+
+    def test_replaced_picture_is_deleted_after_commit(self):
+        path = self.set_picture(image('a.png')).profile_picture.path
+        self.set_picture(image('b.png', color='blue'))
+        self.assertFalse(os.path.exists(path))
+
+    def test_rolled_back_save_keeps_the_picture(self):
+        user = self.set_picture(image())
+        path = user.profile_picture.path
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            user.profile_picture = None
+            user.save()
+            raise RuntimeError
+        self.assertTrue(os.path.exists(path))
+
+    def test_deferred_picture_is_read_before_clearing_it(self):
+        path = self.set_picture(image()).profile_picture.path
+        user = CustomUser.objects.only('id').get(pk=self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            user.profile_picture = None
+            user.save()
+        self.assertFalse(os.path.exists(path))
+
+
+class ProfilePictureVariantTests(StudyBuddyTestCase):
+    def test_variants_are_rendered_after_upload(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/api/update_profile/', {'profile_picture': image(size=(1200, 800))}, format='multipart')
+        variants = self.client.get('/api/dashboard/').json()['profile_picture_variants']
+        self.assertEqual(set(variants), {'small', 'medium'})
+        self.assertTrue(all(variants.values()))
+        picture = CustomUser.objects.get(pk=self.user.pk).profile_picture
+        for variant, size in (('small', 64), ('medium', 256)):
+            with Image.open(picture.storage.path(thumbnails.variant_name(picture.name, variant))) as rendered:
+                self.assertEqual(rendered.size, (size, size))
+
+    def test_variants_are_removed_with_the_picture(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/api/update_profile/', {'profile_picture': image()}, format='multipart')
+        user = CustomUser.objects.get(pk=self.user.pk)
+        small = user.profile_picture.storage.path(thumbnails.variant_name(user.profile_picture.name, 'small'))
+        self.assertTrue(os.path.exists(small))
+        with self.captureOnCommitCallbacks(execute=True):
+            user.profile_picture = None
+            user.save()
+        self.assertFalse(os.path.exists(small))
+
+    def test_variant_names_keep_the_original_extension(self):
+        self.assertNotEqual(
+            thumbnails.variant_name('profile_pictures/me.jpg', 'small'),
+            thumbnails.variant_name('profile_pictures/me.png', 'small'),
+        )
+
+    def test_backfill_command(self):
+        with self.captureOnCommitCallbacks(execute=False):
+            self.client.patch('/api/update_profile/', {'profile_picture': image()}, format='multipart')
+        self.assertIsNone(self.client.get('/api/dashboard/').json()['profile_picture_variants']['small'])
+        out = StringIO()
+        call_command('generate_profile_picture_variants', stdout=out)
+        self.assertIn('1 profile picture', out.getvalue())
+        caches['dashboard'].clear()
+        self.assertIsNotNone(self.client.get('/api/dashboard/').json()['profile_picture_variants']['small'])
+
+
+class DashboardCacheTests(StudyBuddyTestCase):
+    def test_repeated_requests_are_served_from_the_cache(self):
+        first = self.client.get('/api/dashboard/').json()
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.get('/api/dashboard/').json()
+        self.assertEqual(second, first)
+        self.assertEqual(len(queries), 0)
+
+    def test_profile_updates_invalidate_the_cache(self):
+        self.client.get('/api/dashboard/')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch('/api/update_profile/', {'first_name': 'Zed'}, format='json')
+        self.assertEqual(self.client.get('/api/dashboard/').json()['first_name'], 'Zed')
+        self.assertEqual(self.client.get('/api/async/dashboard/').json()['first_name'], 'Zed')
+
+    def test_deleted_users_are_evicted(self):
+        self.client.get('/api/dashboard/')
+        key = dashboard_cache_key(self.user.pk)
+        self.assertIsNotNone(caches['dashboard'].get(key))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        self.assertIsNone(caches['dashboard'].get(key))
+
+
+class StatelessAuthenticationTests(StudyBuddyTestCase):
+    def authenticate(self, token):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        return StatelessJWTAuthentication().authenticate(request)[0]
+
+    def test_token_user_is_built_from_claims(self):
+        token = self.access_token(self.user)
+        self.authenticate(token)
+        with CaptureQueriesContext(connection) as queries:
+            user = self.authenticate(token)
+        self.assertEqual(len(queries), 0)
+        self.assertIsInstance(user, StudyBuddyTokenUser)
+        self.assertEqual((user.id, user.email, user.is_active), (self.user.pk, 'a@example.com', True))
+
+    def test_rows_are_saved_with_the_integer_user_id(self):
+        response = self.client.post('/api/feedback/', {'comment': 'Useful', 'rating': 4, 'user': 999}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['user'], self.user.pk)
+
+    def test_deactivated_and_deleted_accounts_are_rejected(self):
+        self.assertEqual(self.client.get('/api/dashboard/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        self.assertEqual(self.client.get('/api/dashboard/').status_code, 401)
+
+        other = CustomUser.objects.create_user(email='b@example.com', password='pw12345!', username='bob')
+        client = self.client_for(other)
+        self.assertEqual(client.get('/api/dashboard/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertEqual(client.get('/api/dashboard/').status_code, 401)
+
+
+# Cheap parameters; the tests only check which hasher and parameters are used
+FAST_HASHER_PARAMS = {
+    'pbkdf2_sha256': {'iterations': 1000},
+    'scrypt': {'work_factor': 2 ** 10, 'block_size': 8, 'parallelism': 1},
+}
+PBKDF2_FIRST = override_settings(
+    PASSWORD_HASHERS=['studybudy.hashers.TunedPBKDF2PasswordHasher', 'studybudy.hashers.TunedScryptPasswordHasher'],
+    PASSWORD_HASHER_PARAMS=FAST_HASHER_PARAMS,
+)
+SCRYPT_FIRST = override_settings(
+    PASSWORD_HASHERS=['studybudy.hashers.TunedScryptPasswordHasher', 'studybudy.hashers.TunedPBKDF2PasswordHasher'],
+    PASSWORD_HASHER_PARAMS=FAST_HASHER_PARAMS,
+)
+
+
+class PasswordHasherProfileTests(StudyBuddyTestCase):
+    def login(self, email, password):
+        return APIClient().post('/api/login/', {'email': email, 'password': password}, format='json')
+
+    @SCRYPT_FIRST
+    def test_parameters_come_from_settings(self):
+        self.assertEqual(get_hasher('scrypt').work_factor, 2 ** 10)
+        self.assertEqual(get_hasher('pbkdf2_sha256').iterations, 1000)
+
+    def test_login_rehashes_with_the_preferred_hasher(self):
+        with PBKDF2_FIRST:
+            self.user.set_password('pw12345!')
+            self.user.save()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+        with SCRYPT_FIRST:
+            self.assertEqual(self.login('a@example.com', 'wrong').status_code, 401)
+            self.user.refresh_from_db()
+            self.assertTrue(self.user.password.startswith('pbkdf2_sha256$'))
+            self.assertEqual(self.login('a@example.com', 'pw12345!').status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith(f'scrypt${2 ** 10}$'), self.user.password)
+
+    @SCRYPT_FIRST
+    def test_unknown_email_costs_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.login('nobody@example.com', 'pw12345!').status_code, 401)
+        self.assertEqual(len(queries), 1)
+
+    def test_disabled_account(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.login('a@example.com', 'pw12345!').status_code, 403)
+
+
+class AuthThrottleTests(StudyBuddyTestCase):
+    def login(self, email, **extra):
+        return APIClient().post('/api/login/', {'email': email, 'password': 'wrong'}, format='json', **extra)
+
+    def test_login_attempts_are_limited_per_email(self):
+        codes = [self.login(email).status_code for email in ['a@example.com', ' A@example.com'] * 3]
+        self.assertEqual(codes, [401] * 5 + [429])
+        # Refused before the user is looked up or a password is hashed
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.login('a@example.com').status_code, 429)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(self.login('b@example.com').status_code, 401)
+
+    def test_login_attempts_are_limited_per_ip(self):
+        codes = [self.login(f'user{i}@example.com').status_code for i in range(21)]
+        self.assertEqual(codes[-1], 429)
+
+    def test_forwarded_for_header_is_not_trusted(self):
+        codes = [
+            self.login(f'user{i}@example.com', HTTP_X_FORWARDED_FOR=f'10.0.0.{i}').status_code
+            for i in range(21)
+        ]
+        self.assertEqual(codes[-1], 429)
+
+    def test_signups_are_limited_per_email(self):
+        client = APIClient()
+        codes = [
+            client.post('/api/signup/', {'email': 'new@example.com'}, format='json').status_code
+            for _ in range(4)
+        ]
+        self.assertEqual(codes[-1], 429)
+
+
+class CounterDeltaTests(TestCase):
+    def version(self):
+        return ListingVersion.objects.filter(name='test').values_list('version', flat=True).first()
+
+    def test_creates_then_updates_the_row(self):
+        apply_counter_delta(ListingVersion, {'name': 'test'}, values={'updated_at': timezone.now()}, version=2)
+        self.assertEqual(self.version(), 2)
+        apply_counter_delta(ListingVersion, {'name': 'test'}, values={'updated_at': timezone.now()}, version=-1)
+        self.assertEqual(self.version(), 1)
+
+    def test_no_change_and_no_create(self):
+        with self.assertNumQueries(0):
+            apply_counter_delta(ListingVersion, {'name': 'test'}, version=0)
+        apply_counter_delta(ListingVersion, {'name': 'test'}, create=False, version=1)
+        self.assertIsNone(self.version())
+
+    def test_row_created_concurrently_is_updated(self):
+        get_or_create = ListingVersion.objects.get_or_create
+
+        def created_elsewhere(**kwargs):
+            ListingVersion.objects.create(name='test', version=5, updated_at=timezone.now())
+            return get_or_create(**kwargs)
+
+        with mock.patch.object(ListingVersion.objects, 'get_or_create', created_elsewhere):
+            apply_counter_delta(ListingVersion, {'name': 'test'}, values={'updated_at': timezone.now()}, version=1)
+        self.assertEqual(self.version(), 6)
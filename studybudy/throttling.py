@@ -0,0 +1,55 @@
+"""Throttles for the public authentication endpoints.
+
+``login`` and ``signup`` are open to anonymous clients, so credential
+stuffing would otherwise cost a full password hash per attempt. These
+throttles use DRF's sliding-window ``SimpleRateThrottle`` (a per-key log of
+request timestamps) and are checked before the view body runs, i.e. before
+any database access or hashing.
+
+Each endpoint is limited per client IP and per submitted email address;
+rates live in ``REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']``. History is kept
+in the ``settings.THROTTLE_CACHE_ALIAS`` cache: local memory by default,
+or a shared cache such as Redis so the limits hold across worker processes.
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class CachedRateThrottle(SimpleRateThrottle):
+    cache = caches[settings.THROTTLE_CACHE_ALIAS]
+
+
+class IPRateThrottle(CachedRateThrottle):
+    """Limit requests per client IP address."""
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self.get_ident(request)}
+
+
+class EmailRateThrottle(CachedRateThrottle):
+    """Limit requests per submitted email, whichever IP they come from."""
+
+    def get_cache_key(self, request, view):
+        data = request.data
+        email = data.get("email") if hasattr(data, "get") else None
+        if not isinstance(email, str) or not email.strip():
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": email.strip().lower()}
+
+
+class LoginIPRateThrottle(IPRateThrottle):
+    scope = "login_ip"
+
+
+class LoginEmailRateThrottle(EmailRateThrottle):
+    scope = "login_email"
+
+
+class SignupIPRateThrottle(IPRateThrottle):
+    scope = "signup_ip"
+
+
+class SignupEmailRateThrottle(EmailRateThrottle):
+    scope = "signup_email"
@@ -0,0 +1,126 @@
+"""Resized variants of user profile pictures.
+
+Uploaded profile pictures are often multi-megabyte camera photos, while
+clients only render small avatars. After a new picture is committed, a
+background thread pool renders square variants (``PROFILE_PICTURE_VARIANTS``)
+next to it, e.g. ``profile_pictures/variants/me_jpg_small.webp``, so requests
+never pay for image decoding.
+
+Functions
+- variant_name: Storage name of one variant of a picture.
+- variant_urls: URLs of the variants that have been generated so far.
+- schedule_variants: Queue variant generation once the transaction commits.
+- generate_variants: Render and store every variant (runs in the pool).
+- delete_variants: Remove the variants of a replaced picture.
+"""
+
+import logging
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+_EXTENSIONS = {"WEBP": ".webp", "JPEG": ".jpg"}
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PROFILE_PICTURE_WORKERS,
+    thread_name_prefix="profile-picture-variants",
+)
+
+
+def variant_name(picture_name, variant):
+    """Return the storage name of ``variant`` for ``picture_name``.
+
+    Args:
+        picture_name (str): Storage name of the original picture.
+        variant (str): A key of ``settings.PROFILE_PICTURE_VARIANTS``.
+
+    Returns:
+        str: e.g. ``profile_pictures/variants/me_jpg_small.webp``.
+    """
+    directory, filename = posixpath.split(picture_name)
+    # Keep the original extension in the stem so me.jpg and me.png differ.
+    stem = filename.replace(".", "_")
+    extension = _EXTENSIONS[settings.PROFILE_PICTURE_VARIANT_FORMAT]
+    return posixpath.join(directory, "variants", f"{stem}_{variant}{extension}")
+
+
+def variant_urls(picture):
+    """Return ``{variant: url}`` for a profile picture.
+
+    Variants that have not been generated yet map to None, so clients can
+    fall back to the original picture.
+
+    Args:
+        picture (FieldFile): The user's ``profile_picture``.
+
+    Returns:
+        dict | None: Variant URLs, or None if the user has no picture.
+    """
+    if not picture:
+        return None
+    urls = {}
+    for variant in settings.PROFILE_PICTURE_VARIANTS:
+        name = variant_name(picture.name, variant)
+        urls[variant] = picture.storage.url(name) if picture.storage.exists(name) else None
+    return urls
+
+
+def generate_variants(storage, picture_name):
+    """Render every configured variant of ``picture_name`` into ``storage``.
+
+    Args:
+        storage (Storage): Storage holding the original picture.
+        picture_name (str): Storage name of the original picture.
+    """
+    sizes = settings.PROFILE_PICTURE_VARIANTS
+    image_format = settings.PROFILE_PICTURE_VARIANT_FORMAT
+    with storage.open(picture_name, "rb") as original:
+        image = Image.open(original)
+        # Let JPEG decode at reduced scale; we never need the full resolution.
+        image.draft("RGB", (max(sizes.values()) * 2,) * 2)
+        image = ImageOps.exif_transpose(image).convert("RGB")
+        for variant, size in sizes.items():
+            resized = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+            buffer = BytesIO()
+            resized.save(buffer, image_format, quality=80)
+            name = variant_name(picture_name, variant)
+            storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+
+
+def _generate_in_background(storage, picture_name, on_done):
+    try:
+        generate_variants(storage, picture_name)
+    except Exception:
+        logger.exception("Could not generate variants for %s", picture_name)
+        return
+    if on_done is not None:
+        on_done()
+
+
+def schedule_variants(picture, on_done=None):
+    """Generate variants of ``picture`` off the request path.
+
+    Generation is queued once the surrounding transaction commits, so a
+    rolled back upload never gets variants.
+
+    Args:
+        picture (FieldFile): The newly saved profile picture.
+        on_done (callable, optional): Called once the variants are stored.
+    """
+    storage, name = picture.storage, picture.name
+    transaction.on_commit(
+        lambda: _executor.submit(_generate_in_background, storage, name, on_done)
+    )
+
+
+def delete_variants(storage, picture_name):
+    for variant in settings.PROFILE_PICTURE_VARIANTS:
+        storage.delete(variant_name(picture_name, variant))
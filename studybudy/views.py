@@ -6,7 +6,11 @@ manage profile picture). All views return JSON responses and use JWT for auth.
 
 Authentication:
     - Most endpoints require JWT authentication via Authorization header
-    - Login and signup endpoints are publicly accessible
+    - dashboard authenticates statelessly from the access token claims
+      (see studybudy.authentication) and only reads the user row on a
+      dashboard cache miss
+    - Login and signup endpoints are publicly accessible but throttled per
+      IP and per email (see studybudy.throttling)
     - Token refresh endpoint requires a valid refresh token
 
 Available endpoints:
@@ -20,9 +24,14 @@ Available endpoints:
     DELETE /delete_profile_picture/ - Remove profile picture
 """
 
-from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+    throttle_classes,
+)
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework_simplejwt.exceptions import TokenError
@@ -34,11 +43,21 @@ from studybudy.serializers import (
     UpdateProfileSerializer,
 )
 
+from .authentication import StatelessJWTAuthentication, StudyBuddyRefreshToken
+from .dashboard import get_dashboard_payload
 from .models import CustomUser
+from .throttling import (
+    LoginEmailRateThrottle,
+    LoginIPRateThrottle,
+    SignupEmailRateThrottle,
+    SignupIPRateThrottle,
+)
 
 
 @api_view(["POST"])
+@authentication_classes([])
 @permission_classes([AllowAny])
+@throttle_classes([SignupIPRateThrottle, SignupEmailRateThrottle])
 def signup(request):
     """Create a new user account.
 
@@ -51,6 +70,7 @@ def signup(request):
         Status codes:
             201: User created successfully
             400: Invalid data provided
+            429: Too many signups from this IP or for this email
 
     Example request:
         POST /signup/
@@ -68,7 +88,9 @@ def signup(request):
 
 
 @api_view(["POST"])
+@authentication_classes([])
 @permission_classes([AllowAny])
+@throttle_classes([LoginIPRateThrottle, LoginEmailRateThrottle])
 def login(request):
     """Authenticate user and return JWT tokens.
 
@@ -82,6 +104,7 @@ def login(request):
             200: Login successful
             401: Invalid credentials
             403: Account disabled
+            429: Too many attempts from this IP or for this email
 
     Example request:
         POST /login/
@@ -99,20 +122,27 @@ def login(request):
     serializer.is_valid(raise_exception=True)
     email = serializer.validated_data["email"]  # type: ignore
     password = serializer.validated_data["password"]  # type: ignore
-    user = authenticate(request=request, email=email, password=password)
+    # One lookup and at most one hash per attempt. check_password also
+    # re-hashes the password if PASSWORD_HASHER_PROFILE has changed.
+    user = CustomUser.objects.filter(email=email).first()
     if user is None:
-        user = CustomUser.objects.filter(email=email).first()
-        if user is None or not user.check_password(password):
-            return Response(
-                {"success": False, "error": "Invalid_Credentials"},
-                status=status.HTTP_401_UNAUTHORIZED,
-            )
-    if not getattr(user, "is_active", True):
+        # Hash anyway so unknown emails cost as much as wrong passwords.
+        make_password(password)
+        return Response(
+            {"success": False, "error": "Invalid_Credentials"},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    if not user.check_password(password):
+        return Response(
+            {"success": False, "error": "Invalid_Credentials"},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+    if not user.is_active:
         return Response(
             {"success": False, "error": "Account disabled"},
             status=status.HTTP_403_FORBIDDEN,
         )
-    refresh = RefreshToken.for_user(user)
+    refresh = StudyBuddyRefreshToken.for_user(user)
     return Response(
         {
             "success": True,
@@ -191,6 +221,7 @@ def logout(request):
 
 
 @api_view(["GET"])
+@authentication_classes([StatelessJWTAuthentication])
 @permission_classes([IsAuthenticated])
 def dashboard(request):
     """Retrieve user's profile data.
@@ -199,7 +230,8 @@ def dashboard(request):
         request: HTTP request object (must be authenticated)
 
     Returns:
-        Response: JSON containing user profile data
+        Response: JSON containing user profile data, served from the
+        per-user dashboard cache when possible
         Status codes:
             200: Profile data retrieved successfully
 
@@ -208,22 +240,7 @@ def dashboard(request):
         - Profile picture URL (if exists)
         - Personal info (name, gender, phone, DOB)
     """
-    user = request.user
-    profile_picture_url = user.profile_picture.url if user.profile_picture else None
-    return Response(
-        {
-            "id": user.id,
-            "profile_picture": profile_picture_url,
-            "username": user.username,
-            "email": user.email,
-            "first_name": user.first_name,
-            "last_name": user.last_name,
-            "gender": user.gender,
-            "phone_number": user.phone_number,
-            "date_of_birth": user.date_of_birth,
-        },
-        status=status.HTTP_200_OK,
-    )
+    return Response(get_dashboard_payload(request.user), status=status.HTTP_200_OK)
 
 
 @api_view(["PUT", "PATCH"])
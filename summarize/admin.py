@@ -1,3 +1,5 @@
 from django.contrib import admin
+from .models import summarize_model
 
 # Register your models here.
+admin.site.register(summarize_model)
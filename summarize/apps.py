@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SummarizeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'summarize'
+
+    def ready(self):
+        import summarize.signals  # noqa: F401
@@ -0,0 +1,184 @@
+"""Summary lookup by content hash.
+
+The same lecture notes are often summarized many times. A summary is keyed
+by the SHA-256 of the normalized text plus the algorithm and sentence count,
+and ``summarize_model`` has a unique constraint on that key. Each process
+also keeps the most recently used summaries in an in-memory LRU, so a
+repeated request is answered without touching the database. The LRU holds
+only the fields a response needs, never the source text, and rows are
+loaded without their text.
+
+Normalization only removes differences that cannot change the summary:
+line endings, trailing spaces, runs of spaces and tabs, and runs of blank
+lines. Paragraph breaks are sentence boundaries, so they are kept.
+
+Classes
+- CachedSummary: The response fields of a finished summary.
+- SummaryCache: Thread-safe LRU of finished summaries.
+
+Functions
+- normalize_text: Canonical form of a text for hashing.
+- content_hash: Hash key of a text.
+- find_summary: Return the row stored under a key, without its text.
+- get_or_create_summary: Return the stored summary or compute and store it.
+- get_or_create_job: Return the stored summary or queue a job for it.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .engines import get_engine
+from .models import summarize_model
+
+_SPACES = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n(?:[ \t\f\v]*\n)+")
+
+
+def normalize_text(text):
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    text = _SPACES.sub(" ", text)
+    text = _BLANK_LINES.sub("\n\n", text)
+    return "\n".join(line.strip() for line in text.strip().split("\n"))
+
+
+def content_hash(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class CachedSummary(namedtuple("CachedSummary", "id summary algorithm sentences date")):
+    """What ``SummarySerializer`` needs of a finished summary."""
+
+    @classmethod
+    def from_record(cls, record):
+        return cls(record.pk, record.summary, record.algorithm, record.sentences, record.date)
+
+
+class SummaryCache:
+    """A size-bounded, least-recently-used map of key to ``CachedSummary``."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            record = self._entries.get(key)
+            if record is not None:
+                self._entries.move_to_end(key)
+            return record
+
+    def set(self, key, record):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = record
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+summary_cache = SummaryCache(settings.SUMMARIZE_CACHE_SIZE)
+
+
+def cache_key(record):
+    return (record.content_hash, record.algorithm, record.sentences)
+
+
+def _rows(key):
+    content, algorithm, sentences = key
+    # The text can be a million characters; nothing here needs it
+    return summarize_model.objects.defer("text").filter(
+        content_hash=content, algorithm=algorithm, sentences=sentences
+    )
+
+
+def find_summary(key):
+    """Return the row stored under ``key``, without its text, or None."""
+    return _rows(key).first()
+
+
+def _remember(key, record):
+    # Unfinished jobs change later, so only finished summaries are cached
+    cached = CachedSummary.from_record(record)
+    summary_cache.set(key, cached)
+    return cached
+
+
+def _create(key, text, **fields):
+    content, algorithm, sentences = key
+    try:
+        with transaction.atomic():
+            return summarize_model.objects.create(
+                text=text,
+                content_hash=content,
+                algorithm=algorithm,
+                sentences=sentences,
+                **fields,
+            ), True
+    except IntegrityError:
+        # The same text was submitted concurrently; use that row.
+        return _rows(key).get(), False
+
+
+def get_or_create_summary(text, algorithm, sentences):
+    """Return ``(CachedSummary, created)`` for summarizing ``text`` now.
+
+    Looks in the in-process LRU, then the database, and only runs the
+    engine when neither has a finished summary. A job that is still queued
+    is completed in place.
+    """
+    key = (content_hash(text), algorithm, sentences)
+    cached = summary_cache.get(key)
+    if cached is not None:
+        return cached, False
+    record = find_summary(key)
+    if record is not None and record.status == summarize_model.Status.DONE:
+        return _remember(key, record), False
+
+    summary = get_engine(algorithm).summarize(text, sentences=sentences)
+    created = False
+    if record is None:
+        record, created = _create(key, text, summary=summary)
+    if record.status != summarize_model.Status.DONE:
+        record.summary = summary
+        record.status = summarize_model.Status.DONE
+        record.error = ''
+        record.finished_at = timezone.now()
+        record.save(update_fields=['summary', 'status', 'error', 'finished_at'])
+    return _remember(key, record), created
+
+
+def get_or_create_job(text, algorithm, sentences):
+    """Return ``(record, created)`` for a queued summarization of ``text``.
+
+    Text that is already summarized or queued returns the existing row;
+    a failed job is queued again.
+    """
+    key = (content_hash(text), algorithm, sentences)
+    record = find_summary(key)
+    if record is None:
+        return _create(key, text, status=summarize_model.Status.PENDING)
+    if record.status == summarize_model.Status.FAILED:
+        summarize_model.objects.filter(
+            pk=record.pk, status=summarize_model.Status.FAILED
+        ).update(
+            status=summarize_model.Status.PENDING, error='', started_at=None, finished_at=None,
+            claimed_by='', heartbeat_at=None,
+        )
+        record.refresh_from_db()
+    return record, False
@@ -0,0 +1,214 @@
+"""Extractive summarization engines.
+
+An engine splits the text into sentences, scores every sentence, and returns
+the ``k`` best-scoring ones in their original order. Everything runs locally
+on the CPU with the standard library. Sentence-by-term matrices are sparse
+(most terms appear in a handful of sentences), so they are held as one
+``{term: weight}`` dict per sentence, and only non-zero entries are ever
+touched.
+
+Engines are looked up by name in ``settings.SUMMARIZE_ENGINES`` (name to
+dotted path), so another algorithm can be plugged in without touching the
+views.
+
+Classes
+- SummarizationEngine: Base class; subclasses implement ``score``.
+- TfidfEngine: Similarity of each sentence to the document's TF-IDF centroid.
+- TextRankEngine: PageRank over the sentence similarity graph.
+
+Functions
+- split_sentences: Split text into sentences.
+- get_engine: Return the engine registered under a name.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from operator import mul
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# A sentence ends at ., ! or ? (plus a closing quote or bracket, which stays
+# with the sentence) followed by whitespace and an upper-case letter, digit
+# or opening quote, or at a blank line.
+_SENTENCE_BOUNDARY = re.compile(r"""(?:(?<=[.!?])|(?<=[.!?]["')\]]))\s+(?=["'(\[]?[A-Z0-9])|\n\s*\n""")
+_WORD = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+STOP_WORDS = frozenset(
+    """
+    a about above after again against all also am an and any are as at be because been
+    before being below between both but by can could did do does doing down during each
+    few for from further had has have having he her here hers herself him himself his how
+    i if in into is it its itself just me more most my myself no nor not now of off on
+    once only or other our ours ourselves out over own same she should so some such than
+    that the their theirs them themselves then there these they this those through to too
+    under until up very was we were what when where which while who whom why will with
+    would you your yours yourself yourselves
+    """.split()
+)
+
+
+def split_sentences(text):
+    """Split ``text`` into stripped, non-empty sentences."""
+    sentences = []
+    for sentence in _SENTENCE_BOUNDARY.split(text):
+        sentence = " ".join(sentence.split())
+        if sentence:
+            sentences.append(sentence)
+    return sentences
+
+
+def tokenize(sentence):
+    return [word for word in _WORD.findall(sentence.lower()) if word not in STOP_WORDS]
+
+
+def tfidf_vectors(token_lists):
+    """Return one sparse, L2-normalised TF-IDF vector per sentence.
+
+    Uses sublinear term frequency (``1 + log tf``) and smoothed IDF
+    (``log((1 + n) / (1 + df)) + 1``).
+    """
+    counts = [Counter(tokens) for tokens in token_lists]
+    document_frequency = Counter()
+    for count in counts:
+        document_frequency.update(count.keys())
+    n = len(counts)
+    idf = {
+        term: math.log((1 + n) / (1 + df)) + 1
+        for term, df in document_frequency.items()
+    }
+
+    vectors = []
+    for count in counts:
+        vector = {term: (1 + math.log(tf)) * idf[term] for term, tf in count.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if norm:
+            vector = {term: weight / norm for term, weight in vector.items()}
+        vectors.append(vector)
+    return vectors
+
+
+class SummarizationEngine:
+    """Pick the top ``k`` sentences by ``score``."""
+
+    name = None
+
+    def score(self, token_lists):
+        """Return one score per sentence; higher is more representative."""
+        raise NotImplementedError
+
+    def select(self, text, sentences):
+        """Return the indices of the chosen sentences and all the sentences."""
+        all_sentences = split_sentences(text)
+        if len(all_sentences) <= sentences:
+            return list(range(len(all_sentences))), all_sentences
+        scores = self.score([tokenize(sentence) for sentence in all_sentences])
+        best = heapq.nlargest(sentences, range(len(scores)), key=scores.__getitem__)
+        return sorted(best), all_sentences
+
+    def summarize(self, text, sentences=5):
+        chosen, all_sentences = self.select(text, sentences)
+        return " ".join(all_sentences[index] for index in chosen)
+
+
+class TfidfEngine(SummarizationEngine):
+    """Score sentences by cosine similarity to the document centroid.
+
+    Linear in the number of tokens, so it is the default.
+    """
+
+    name = "tfidf"
+
+    def score(self, token_lists):
+        vectors = tfidf_vectors(token_lists)
+        centroid = defaultdict(float)
+        for vector in vectors:
+            for term, weight in vector.items():
+                centroid[term] += weight
+        return [
+            sum(weight * centroid[term] for term, weight in vector.items())
+            for vector in vectors
+        ]
+
+
+class TextRankEngine(SummarizationEngine):
+    """Rank sentences with PageRank over their TF-IDF cosine similarities.
+
+    The similarity matrix ``W = X Xᵀ`` (``X`` being the sparse, normalised
+    sentence-by-term matrix) is never built: ``W v`` is computed as
+    ``X (Xᵀ v)``, two sparse matrix-vector products. Each iteration is
+    therefore linear in the number of tokens, rather than in the number of
+    sentence pairs that share a term, which grows quadratically on long
+    documents.
+    """
+
+    name = "textrank"
+    damping = 0.85
+    max_iterations = 50
+    tolerance = 1e-6
+
+    def score(self, token_lists):
+        vectors = tfidf_vectors(token_lists)
+        n = len(vectors)
+
+        # X row by row (sentence -> terms) and column by column (term -> sentences)
+        term_ids = {}
+        row_terms, row_weights = [], []
+        column_rows, column_weights = [], []
+        for i, vector in enumerate(vectors):
+            terms = []
+            for term, weight in vector.items():
+                t = term_ids.get(term)
+                if t is None:
+                    t = term_ids[term] = len(column_rows)
+                    column_rows.append([])
+                    column_weights.append([])
+                terms.append(t)
+                column_rows[t].append(i)
+                column_weights[t].append(weight)
+            row_terms.append(terms)
+            row_weights.append(list(vector.values()))
+        # Rows are unit length, so each sentence's self-similarity is 1 (or 0
+        # for a sentence without terms); it is not an edge.
+        self_similarity = [1.0 if weights else 0.0 for weights in row_weights]
+
+        def similarity_times(v):
+            column_of = [
+                sum(map(mul, weights, map(v.__getitem__, rows)))
+                for rows, weights in zip(column_rows, column_weights)
+            ]
+            at = column_of.__getitem__
+            return [
+                sum(map(mul, weights, map(at, terms))) - self_loop * value
+                for terms, weights, self_loop, value
+                in zip(row_terms, row_weights, self_similarity, v)
+            ]
+
+        out_weight = similarity_times([1.0] * n)
+        scores = [1.0] * n
+        base = 1 - self.damping
+        for _ in range(self.max_iterations):
+            shares = [
+                score / weight if weight > 1e-12 else 0.0
+                for score, weight in zip(scores, out_weight)
+            ]
+            new_scores = [base + self.damping * value for value in similarity_times(shares)]
+            delta = max(abs(new - old) for new, old in zip(new_scores, scores))
+            scores = new_scores
+            if delta < self.tolerance:
+                break
+        return scores
+
+
+@lru_cache(maxsize=None)
+def get_engine(name=None):
+    """Return the engine registered as ``name`` in ``SUMMARIZE_ENGINES``.
+
+    Defaults to ``settings.SUMMARIZE_DEFAULT_ENGINE``. Raises ``KeyError``
+    for an unknown name.
+    """
+    name = name or settings.SUMMARIZE_DEFAULT_ENGINE
+    return import_string(settings.SUMMARIZE_ENGINES[name])()
@@ -0,0 +1,106 @@
+"""Queue operations for summarization jobs.
+
+Jobs are ``summarize_model`` rows with ``status`` ``pending``. The
+``run_summarize_worker`` command claims them with a conditional UPDATE, so
+several workers can share a queue without running a job twice. It runs the
+engine in a process pool (see ``run_engine``) and records the outcome.
+
+Each claimed job records the worker that claimed it, and that worker
+refreshes the job's ``heartbeat_at`` while it runs. Only jobs whose
+heartbeat has stopped, because their worker died, are queued again, so a
+slow job is never run twice.
+"""
+
+import os
+import socket
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import summarize_model
+
+Status = summarize_model.Status
+
+
+def run_engine(engine_path, text, sentences):
+    """Summarize ``text`` with the engine at ``engine_path``.
+
+    Runs in a pool process, so it takes a dotted path rather than a
+    registry name and does not touch the database.
+    """
+    return import_string(engine_path)().summarize(text, sentences=sentences)
+
+
+def worker_id():
+    """Return a name for this worker process that no other worker shares."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def claim_jobs(limit, worker=''):
+    """Mark up to ``limit`` of the oldest pending jobs running and return them.
+
+    ``worker`` (see ``worker_id``) is recorded as the jobs' owner.
+    """
+    claimed = []
+    if limit <= 0:
+        return claimed
+    candidates = (
+        summarize_model.objects.filter(status=Status.PENDING)
+        .order_by('date', 'id')
+        .values_list('pk', flat=True)[:limit]
+    )
+    for pk in list(candidates):
+        now = timezone.now()
+        # Another worker may have claimed it since the SELECT
+        if summarize_model.objects.filter(pk=pk, status=Status.PENDING).update(
+            status=Status.RUNNING, started_at=now, claimed_by=worker, heartbeat_at=now
+        ):
+            claimed.append(
+                summarize_model.objects.only('text', 'algorithm', 'sentences', 'claimed_by').get(pk=pk)
+            )
+    return claimed
+
+
+def engine_path(job):
+    path = settings.SUMMARIZE_ENGINES.get(job.algorithm)
+    if path is None:
+        raise LookupError(f"Unknown summarization algorithm {job.algorithm!r}.")
+    return path
+
+
+def _owned(job):
+    # A job requeued and claimed by another worker is no longer ours to finish
+    return summarize_model.objects.filter(pk=job.pk, status=Status.RUNNING, claimed_by=job.claimed_by)
+
+
+def complete_job(job, summary):
+    _owned(job).update(status=Status.DONE, summary=summary, error='', finished_at=timezone.now())
+
+
+def fail_job(job, error):
+    _owned(job).update(
+        status=Status.FAILED, error=str(error) or error.__class__.__name__, finished_at=timezone.now()
+    )
+
+
+def send_heartbeat(worker, jobs):
+    """Record that ``worker`` is still running ``jobs``."""
+    if jobs:
+        summarize_model.objects.filter(
+            pk__in=[job.pk for job in jobs], status=Status.RUNNING, claimed_by=worker
+        ).update(heartbeat_at=timezone.now())
+
+
+def requeue_stale_jobs(minutes):
+    """Return running jobs with no heartbeat for ``minutes`` to the queue.
+
+    Their worker died; jobs of live workers keep a fresh heartbeat however
+    long they run.
+    """
+    cutoff = timezone.now() - timedelta(minutes=minutes)
+    return summarize_model.objects.filter(status=Status.RUNNING, heartbeat_at__lt=cutoff).update(
+        status=Status.PENDING, started_at=None, claimed_by='', heartbeat_at=None
+    )
@@ -0,0 +1,89 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from summarize.jobs import (
+    claim_jobs,
+    complete_job,
+    engine_path,
+    fail_job,
+    requeue_stale_jobs,
+    run_engine,
+    send_heartbeat,
+    worker_id,
+)
+
+# Seconds between heartbeats for running jobs, and between sweeps for jobs
+# abandoned by dead workers
+HEARTBEAT_INTERVAL = 60
+
+
+class Command(BaseCommand):
+    help = "Run queued summarization jobs in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.SUMMARIZE_WORKERS,
+            help="Number of summarization processes (default: SUMMARIZE_WORKERS).",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Seconds to wait for new jobs when the queue is empty (default: 2).",
+        )
+        parser.add_argument(
+            "--stale-minutes",
+            type=int,
+            default=5,
+            help="Requeue running jobs whose worker has sent no heartbeat for this long (default: 5).",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit once the queue is empty instead of polling for new jobs.",
+        )
+
+    def handle(self, *args, **options):
+        workers = max(1, options["workers"])
+        poll_interval = options["poll_interval"]
+        self.stdout.write(f"Summarize worker started with {workers} process(es).")
+        worker = worker_id()
+        processed = 0
+        next_heartbeat = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            running = {}
+            while True:
+                # Once a minute is enough to notice a dead worker's jobs
+                if time.monotonic() >= next_heartbeat:
+                    send_heartbeat(worker, running.values())
+                    requeue_stale_jobs(options["stale_minutes"])
+                    next_heartbeat = time.monotonic() + HEARTBEAT_INTERVAL
+                for job in claim_jobs(workers - len(running), worker):
+                    try:
+                        path = engine_path(job)
+                    except LookupError as error:
+                        fail_job(job, error)
+                        continue
+                    running[pool.submit(run_engine, path, job.text, job.sentences)] = job
+
+                if not running:
+                    if options["once"]:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+
+                done, _ = wait(running, timeout=poll_interval, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    error = future.exception()
+                    if error is None:
+                        complete_job(job, future.result())
+                    else:
+                        fail_job(job, error)
+                    processed += 1
+        self.stdout.write(f"Processed {processed} summarization job(s).")
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summarize', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summarize_model',
+            name='algorithm',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='summarize_model',
+            name='content_hash',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='summarize_model',
+            name='sentences',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='summarize_model',
+            constraint=models.UniqueConstraint(fields=('content_hash', 'algorithm', 'sentences'), name='unique_summary_per_content'),
+        ),
+    ]
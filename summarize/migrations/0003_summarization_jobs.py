@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summarize', '0002_summary_cache_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summarize_model',
+            name='error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='summarize_model',
+            name='finished_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='summarize_model',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='summarize_model',
+            name='status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='done', max_length=10),
+        ),
+        migrations.AlterField(
+            model_name='summarize_model',
+            name='summary',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddIndex(
+            model_name='summarize_model',
+            index=models.Index(fields=['status', 'date'], name='summary_status_date_idx'),
+        ),
+    ]
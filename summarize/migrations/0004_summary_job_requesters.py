@@ -0,0 +1,20 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summarize', '0003_summarization_jobs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summarize_model',
+            name='requested_by',
+            field=models.ManyToManyField(blank=True, related_name='summary_jobs', to=settings.AUTH_USER_MODEL),
+        ),
+    ]
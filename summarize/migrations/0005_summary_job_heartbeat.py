@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-18 20:59
+
+from django.db import migrations, models
+
+
+def start_heartbeats(apps, schema_editor):
+    # Jobs already running get one from their start, so a dead worker's
+    # jobs are still requeued
+    summarize_model = apps.get_model('summarize', 'summarize_model')
+    summarize_model.objects.filter(status='running').update(heartbeat_at=models.F('started_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('summarize', '0004_summary_job_requesters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='summarize_model',
+            name='claimed_by',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='summarize_model',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(start_heartbeats, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,52 @@
+from django.conf import settings
 from django.db import models
 import datetime
 
 # Create your models here.
 class summarize_model(models.Model):
+    """A summary, or a summarization job until its status is ``done``.
+
+    Jobs are created ``pending`` by the jobs endpoint and run by the
+    ``run_summarize_worker`` management command.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'pending', 'Pending'
+        RUNNING = 'running', 'Running'
+        DONE = 'done', 'Done'
+        FAILED = 'failed', 'Failed'
+
     text = models.TextField()
-    summary = models.TextField()
+    summary = models.TextField(blank=True)
     date = models.DateTimeField(auto_now_add=True)
+    # sha256 of the normalized text (see summarize.cache); null on rows
+    # saved before summaries were cached
+    content_hash = models.CharField(max_length=64, null=True, blank=True, editable=False)
+    algorithm = models.CharField(max_length=32, blank=True, default='')
+    sentences = models.PositiveSmallIntegerField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.DONE)
+    error = models.TextField(blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # The worker running the job, and when it last reported it alive; a
+    # running job whose heartbeat stops is returned to the queue
+    claimed_by = models.CharField(max_length=100, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    # Users who queued this job; only they can poll it. Shared because jobs
+    # for the same text are deduplicated.
+    requested_by = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='summary_jobs', blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker claims the oldest pending jobs first
+            models.Index(fields=['status', 'date'], name='summary_status_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_hash', 'algorithm', 'sentences'],
+                name='unique_summary_per_content',
+            ),
+        ]
 
     def __str__(self):
         return self.text
\ No newline at end of file
@@ -0,0 +1,30 @@
+from django.conf import settings
+from rest_framework import serializers
+from .models import summarize_model
+
+
+class SummarizeRequestSerializer(serializers.Serializer):
+    text = serializers.CharField(max_length=settings.SUMMARIZE_MAX_TEXT_LENGTH)
+    algorithm = serializers.ChoiceField(
+        choices=list(settings.SUMMARIZE_ENGINES),
+        default=settings.SUMMARIZE_DEFAULT_ENGINE,
+    )
+    sentences = serializers.IntegerField(
+        min_value=1, max_value=settings.SUMMARIZE_MAX_SENTENCES, default=5
+    )
+
+
+class SummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = summarize_model
+        # The source text can be very long; clients already have it
+        fields = ['id', 'summary', 'algorithm', 'sentences', 'date']
+
+
+class SummaryJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = summarize_model
+        fields = [
+            'id', 'status', 'summary', 'error', 'algorithm', 'sentences',
+            'date', 'started_at', 'finished_at',
+        ]
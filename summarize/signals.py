@@ -0,0 +1,13 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import cache_key, summary_cache
+from .models import summarize_model
+
+
+@receiver(post_save, sender=summarize_model)
+@receiver(post_delete, sender=summarize_model)
+def evict_cached_summary(sender, instance, **kwargs):
+    # Only this process's LRU; other workers serve the old row until evicted
+    if instance.content_hash:
+        summary_cache.discard(cache_key(instance))
@@ -1,3 +1,214 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
 
-# Create your tests here.
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from studybudy.models import CustomUser
+from .cache import CachedSummary, SummaryCache, _create, content_hash, normalize_text, summary_cache
+from .engines import get_engine, split_sentences
+from .jobs import claim_jobs, complete_job, requeue_stale_jobs, send_heartbeat
+from .models import summarize_model
+
+TEXT = (
+    "Dogs are great pets. Cats are great pets too. The stock market fell today. "
+    "Dogs and cats are common pets. Markets recover."
+)
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class SummarizeTestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        summary_cache.clear()
+        self.user = CustomUser.objects.create_user(email='a@example.com', password='pw12345!', username='alice')
+        self.client = self.client_for(self.user)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+        return client
+
+
+class EngineTests(TestCase):
+    def test_split_sentences(self):
+        self.assertEqual(
+            split_sentences('First one. Second one!  "Third?" 4th line\n\nlast part'),
+            ['First one.', 'Second one!', '"Third?"', '4th line', 'last part'],
+        )
+        self.assertEqual(split_sentences('e.g. not a break. Next'), ['e.g. not a break.', 'Next'])
+
+    def test_engines_pick_representative_sentences_in_order(self):
+        for name in ('tfidf', 'textrank'):
+            with self.subTest(engine=name):
+                summary = get_engine(name).summarize(TEXT, sentences=2)
+                chosen = split_sentences(summary)
+                self.assertEqual(len(chosen), 2)
+                self.assertNotIn('The stock market fell today.', chosen)
+                sentences = split_sentences(TEXT)
+                self.assertEqual(chosen, sorted(chosen, key=sentences.index))
+
+    def test_short_text_is_returned_whole(self):
+        self.assertEqual(get_engine('tfidf').summarize('Only one sentence.', sentences=3), 'Only one sentence.')
+
+    def test_unknown_engine(self):
+        with self.assertRaises(KeyError):
+            get_engine('nope')
+
+
+class SummarizeAPITests(SummarizeTestCase):
+    def test_summarize(self):
+        for algorithm in ('tfidf', 'textrank'):
+            response = self.client.post('/api/summarize/', {'text': TEXT, 'sentences': 2, 'algorithm': algorithm}, format='json')
+            self.assertEqual(response.status_code, 201, response.content)
+            self.assertEqual(response.json()['summary'], get_engine(algorithm).summarize(TEXT, sentences=2))
+        self.assertEqual(summarize_model.objects.count(), 2)
+
+    def test_invalid_requests(self):
+        for data in ({'text': TEXT, 'algorithm': 'nope'}, {'text': '   '}, {'text': TEXT, 'sentences': 0}):
+            self.assertEqual(self.client.post('/api/summarize/', data, format='json').status_code, 400)
+        self.assertEqual(APIClient().post('/api/summarize/', {'text': TEXT}, format='json').status_code, 401)
+
+
+class SummaryCacheTests(SummarizeTestCase):
+    MESSY = TEXT.replace('. ', '.  ', 2).replace('today. ', 'today.\r\n\r\n\r\n') + '\n'
+
+    def test_normalization_cannot_change_the_summary(self):
+        self.assertEqual(content_hash(self.MESSY), content_hash(TEXT.replace('today. ', 'today.\n\n')))
+        self.assertNotEqual(content_hash(TEXT), content_hash(TEXT.replace('today. ', 'today.\n\n')))
+        for name in ('tfidf', 'textrank'):
+            engine = get_engine(name)
+            self.assertEqual(engine.summarize(self.MESSY, 2), engine.summarize(normalize_text(self.MESSY), 2))
+
+    def test_repeated_text_is_answered_from_the_cache(self):
+        response = self.client.post('/api/summarize/', {'text': TEXT, 'sentences': 2}, format='json')
+        self.assertEqual(response.status_code, 201)
+        with self.assertNumQueries(0):
+            repeated = self.client.post('/api/summarize/', {'text': TEXT + '\n', 'sentences': 2}, format='json')
+        self.assertEqual((repeated.status_code, repeated.json()), (200, response.json()))
+        summary_cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.post('/api/summarize/', {'text': TEXT, 'sentences': 2}, format='json').status_code, 200)
+        self.assertEqual(self.client.post('/api/summarize/', {'text': TEXT, 'sentences': 3}, format='json').status_code, 201)
+        self.assertEqual(summarize_model.objects.count(), 2)
+
+    def test_cache_holds_no_source_text(self):
+        response = self.client.post('/api/summarize/', {'text': TEXT, 'sentences': 2}, format='json')
+        cached = summary_cache.get((content_hash(TEXT), 'tfidf', 2))
+        self.assertIsInstance(cached, CachedSummary)
+        self.assertNotIn(TEXT, cached)
+        self.assertEqual(response.json()['summary'], cached.summary)
+        summary_cache.clear()
+        with self.assertNumQueries(1) as queries:
+            self.client.post('/api/summarize/', {'text': TEXT, 'sentences': 2}, format='json')
+        self.assertNotIn('"text"', queries.captured_queries[0]['sql'])
+
+    def test_concurrent_insert_returns_the_existing_row(self):
+        key = (content_hash(TEXT), 'tfidf', 2)
+        existing, created = _create(key, TEXT, summary='First')
+        self.assertTrue(created)
+        self.assertEqual(_create(key, TEXT, summary='Second'), (existing, False))
+
+    def test_lru_eviction(self):
+        cache = SummaryCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertEqual((cache.get('a'), cache.get('b'), cache.get('c')), (1, None, 3))
+        disabled = SummaryCache(maxsize=0)
+        disabled.set('a', 1)
+        self.assertIsNone(disabled.get('a'))
+
+
+class SummaryJobTests(SummarizeTestCase):
+    def queue(self, client=None, **data):
+        client = client or self.client
+        return client.post('/api/summarize/jobs/', {'text': TEXT, 'sentences': 2, **data}, format='json')
+
+    def run_worker(self):
+        call_command('run_summarize_worker', '--once', '--workers', '1', stdout=StringIO())
+
+    def test_queue_and_poll(self):
+        response = self.queue()
+        self.assertEqual(response.status_code, 202, response.content)
+        self.assertEqual(response.json()['status'], 'pending')
+        url = response['Location']
+        self.assertEqual(self.queue().json()['id'], response.json()['id'])
+        self.run_worker()
+        job = self.client.get(url).json()
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['summary'], get_engine('tfidf').summarize(TEXT, sentences=2))
+        # Finished jobs are plain cached summaries
+        self.assertEqual(self.queue().status_code, 200)
+        self.assertEqual(self.client.post('/api/summarize/', {'text': TEXT, 'sentences': 2}, format='json').status_code, 200)
+
+    def test_sync_request_completes_a_pending_job(self):
+        url = self.queue()['Location']
+        self.assertEqual(self.client.post('/api/summarize/', {'text': TEXT, 'sentences': 2}, format='json').status_code, 200)
+        self.assertEqual(self.client.get(url).json()['status'], 'done')
+
+    def test_failed_jobs_are_queued_again(self):
+        job = summarize_model.objects.create(
+            text=TEXT, algorithm='retired', sentences=2, content_hash='h', status=summarize_model.Status.PENDING
+        )
+        self.run_worker()
+        job.refresh_from_db()
+        self.assertEqual(job.status, summarize_model.Status.FAILED)
+        self.assertIn('retired', job.error)
+        summarize_model.objects.filter(pk=job.pk).update(algorithm='tfidf', content_hash=content_hash(TEXT))
+        self.assertEqual(self.queue().json()['status'], 'pending')
+
+    def test_jobs_are_only_visible_to_requesters(self):
+        url = self.queue()['Location']
+        other = self.client_for(CustomUser.objects.create_user(email='b@example.com', password='pw12345!', username='bob'))
+        self.assertEqual(other.get(url).status_code, 404)
+        self.assertEqual(self.queue(client=other)['Location'], url)
+        self.assertEqual(other.get(url).status_code, 200)
+        self.assertEqual(self.client.get('/api/summarize/jobs/999/').status_code, 404)
+
+    def test_claimed_jobs_are_not_claimed_twice(self):
+        self.queue()
+        self.assertEqual(len(claim_jobs(5)), 1)
+        self.assertEqual(claim_jobs(5), [])
+
+    def test_only_jobs_without_a_heartbeat_are_requeued(self):
+        long_ago = timezone.now() - timedelta(hours=2)
+        self.queue()
+        slow = claim_jobs(1, 'worker-a')[0]
+        summarize_model.objects.filter(pk=slow.pk).update(started_at=long_ago, heartbeat_at=long_ago)
+        send_heartbeat('worker-a', [slow])
+        abandoned = summarize_model.objects.create(
+            text='b', content_hash='b', status=summarize_model.Status.RUNNING, started_at=long_ago,
+            claimed_by='worker-b', heartbeat_at=long_ago,
+        )
+        self.assertEqual(requeue_stale_jobs(5), 1)
+        self.assertEqual(
+            dict(summarize_model.objects.values_list('pk', 'status').filter(pk__in=[slow.pk, abandoned.pk])),
+            {slow.pk: 'running', abandoned.pk: 'pending'},
+        )
+        self.assertEqual(summarize_model.objects.get(pk=abandoned.pk).claimed_by, '')
+
+    def test_heartbeats_only_cover_the_workers_own_jobs(self):
+        self.queue()
+        job = claim_jobs(1, 'worker-a')[0]
+        long_ago = timezone.now() - timedelta(hours=2)
+        summarize_model.objects.filter(pk=job.pk).update(heartbeat_at=long_ago)
+        send_heartbeat('worker-b', [job])
+        self.assertEqual(requeue_stale_jobs(5), 1)
+
+    def test_requeued_jobs_are_finished_by_their_new_worker_only(self):
+        self.queue()
+        old = claim_jobs(1, 'worker-a')[0]
+        summarize_model.objects.filter(pk=old.pk).update(heartbeat_at=timezone.now() - timedelta(hours=2))
+        requeue_stale_jobs(5)
+        new = claim_jobs(1, 'worker-b')[0]
+        complete_job(old, 'stale result')
+        self.assertEqual(summarize_model.objects.get(pk=new.pk).status, 'running')
+        complete_job(new, 'fresh result')
+        self.assertEqual(summarize_model.objects.get(pk=new.pk).summary, 'fresh result')
@@ -1,3 +1,54 @@
-from django.shortcuts import render
+from rest_framework import status
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from studybudy.authentication import StatelessJWTAuthentication
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from .cache import get_or_create_job, get_or_create_summary
+from .models import summarize_model
+from .serializers import SummarizeRequestSerializer, SummaryJobSerializer, SummarySerializer
 
-# Create your views here.
+
+@api_view(['POST'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def summarize_text(request):
+    serializer = SummarizeRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    record, created = get_or_create_summary(data['text'], data['algorithm'], data['sentences'])
+    return Response(
+        SummarySerializer(record).data,
+        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+    )
+
+
+@api_view(['POST'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def create_summary_job(request):
+    serializer = SummarizeRequestSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    job, created = get_or_create_job(data['text'], data['algorithm'], data['sentences'])
+    job.requested_by.add(request.user.id)
+    # A summary that already exists is returned as a finished job
+    return Response(
+        SummaryJobSerializer(job).data,
+        status=status.HTTP_200_OK if job.status == summarize_model.Status.DONE else status.HTTP_202_ACCEPTED,
+        headers={'Location': reverse('summary_job', args=[job.pk])},
+    )
+
+
+@api_view(['GET'])
+@authentication_classes([StatelessJWTAuthentication])
+@permission_classes([IsAuthenticated])
+def summary_job(request, pk):
+    # Jobs of other users are reported as missing rather than forbidden
+    job = get_object_or_404(summarize_model.objects.defer('text'), pk=pk, requested_by=request.user.id)
+    return Response(SummaryJobSerializer(job).data, status=status.HTTP_200_OK)